@@ -0,0 +1 @@
+"""Benchmarks for the asynchronous Python client for Withings."""
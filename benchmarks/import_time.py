@@ -0,0 +1,131 @@
+"""Benchmark for the time it takes to import the package.
+
+Every run imports in a fresh interpreter, so nothing is cached in sys.modules.
+Run with ``uv run python -m benchmarks.import_time --runs 20``.
+"""
+
+from __future__ import annotations
+
+import argparse
+from dataclasses import asdict, dataclass
+import json
+from pathlib import Path
+import statistics
+import subprocess
+import sys
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+STATEMENTS = {
+    "package": "import aiowithings",
+    "exceptions": "from aiowithings import WithingsError",
+    "models": "from aiowithings import MeasurementGroup",
+    "client": "from aiowithings import WithingsClient",
+}
+
+HEAVY_MODULES = (
+    "aiohttp",
+    "yarl",
+    "importlib.metadata",
+    "aiowithings.models",
+    "aiowithings.withings",
+)
+
+_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+{statement}
+seconds = time.perf_counter() - start
+heavy = [name for name in {heavy!r} if name in sys.modules]
+print(json.dumps({{"seconds": seconds, "loaded": heavy}}))
+"""
+
+
+@dataclass(slots=True)
+class ImportTimeResult:
+    """Result of importing a statement in a number of fresh interpreters."""
+
+    name: str
+    statement: str
+    seconds: list[float]
+    loaded: list[str]
+
+    @property
+    def median(self) -> float:
+        """Return the median import time in seconds."""
+        return statistics.median(self.seconds)
+
+    @property
+    def minimum(self) -> float:
+        """Return the fastest import time in seconds."""
+        return min(self.seconds)
+
+
+def measure(name: str, statement: str, runs: int) -> ImportTimeResult:
+    """Time statement in runs fresh interpreters."""
+    script = _SCRIPT.format(statement=statement, heavy=HEAVY_MODULES)
+    seconds: list[float] = []
+    loaded: list[str] = []
+    for _ in range(runs):
+        output = subprocess.run(  # noqa: S603
+            [sys.executable, "-c", script],
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout
+        result = json.loads(output)
+        seconds.append(result["seconds"])
+        loaded = result["loaded"]
+    return ImportTimeResult(name, statement, seconds, loaded)
+
+
+def run(names: Sequence[str], *, runs: int = 10) -> list[ImportTimeResult]:
+    """Run the selected import benchmarks."""
+    return [measure(name, STATEMENTS[name], runs) for name in names]
+
+
+def format_results(results: Sequence[ImportTimeResult]) -> str:
+    """Format results as a plain text table."""
+    lines = [f"{'import':<12} {'median ms':>10} {'min ms':>10}  heavy modules loaded"]
+    lines.extend(
+        f"{result.name:<12} {result.median * 1000:>10.2f} "
+        f"{result.minimum * 1000:>10.2f}  {', '.join(result.loaded) or '-'}"
+        for result in results
+    )
+    return "\n".join(lines)
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    """Run the import benchmarks from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument(
+        "--imports",
+        nargs="+",
+        choices=list(STATEMENTS),
+        default=list(STATEMENTS),
+        help="imports to time, defaults to all",
+    )
+    parser.add_argument(
+        "--output",
+        type=Path,
+        help="write the results as JSON, to compare between releases",
+    )
+    args = parser.parse_args(argv)
+
+    results = run(args.imports, runs=args.runs)
+    print(format_results(results))  # noqa: T201
+    if args.output:
+        args.output.write_text(
+            json.dumps(
+                [{**asdict(result), "median": result.median} for result in results],
+                indent=2,
+            ),
+            encoding="utf-8",
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""Micro-benchmarks for parsing Withings responses into models.
+
+Run with ``uv run python -m benchmarks.parsing --sizes 10 1000 100000``.
+"""
+
+from __future__ import annotations
+
+import argparse
+from dataclasses import asdict, dataclass
+import gc
+import json
+from pathlib import Path
+import time
+import tracemalloc
+from typing import TYPE_CHECKING, Any
+
+from aiowithings import MeasurementGroup, SleepSummary, aggregate_measurements
+from aiowithings.helpers import aggregate_sleep_summary
+from aiowithings.serialization import decode_models, encode_models
+
+from .payloads import (
+    PAYLOAD_GENERATORS,
+    generate_measurement_group,
+    generate_records,
+    generate_sleep_summary,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Sequence
+
+DEFAULT_SIZES = (10, 1000, 100_000)
+AGGREGATE_BENCHMARKS = ("aggregate_measurements", "aggregate_sleep_summary")
+
+
+@dataclass(slots=True)
+class BenchmarkResult:
+    """Result of a single benchmark run."""
+
+    name: str
+    records: int
+    seconds: float
+    peak_memory: int
+
+    @property
+    def throughput(self) -> float:
+        """Return the number of records processed per second."""
+        return self.records / self.seconds if self.seconds else float("inf")
+
+
+def measure(name: str, records: int, func: Callable[[], Any]) -> BenchmarkResult:
+    """Time func, then run it again under tracemalloc for the peak memory.
+
+    Timing and memory are measured in separate runs because tracemalloc
+    slows down allocations considerably.
+    """
+    gc.collect()
+    start = time.perf_counter()
+    func()
+    seconds = time.perf_counter() - start
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func()
+        _, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return BenchmarkResult(name, records, seconds, peak_memory)
+
+
+def benchmark_model(name: str, size: int, *, seed: int = 0) -> BenchmarkResult:
+    """Benchmark from_api of a model over size synthetic records."""
+    model, generator = PAYLOAD_GENERATORS[name]
+    records = generate_records(generator, size, seed=seed)
+    return measure(
+        f"{model.__name__}.from_api",
+        size,
+        lambda: [model.from_api(record) for record in records],
+    )
+
+
+def benchmark_codec(name: str, size: int, *, seed: int = 0) -> BenchmarkResult:
+    """Benchmark decoding size cached models, to compare with from_api."""
+    model, generator = PAYLOAD_GENERATORS[name]
+    models = [
+        model.from_api(record)
+        for record in generate_records(generator, size, seed=seed)
+    ]
+    data = encode_models(model, models)
+    return measure(
+        f"{model.__name__} decode_models",
+        size,
+        lambda: decode_models(model, data),
+    )
+
+
+def benchmark_aggregate(name: str, size: int, *, seed: int = 0) -> BenchmarkResult:
+    """Benchmark one of the aggregation helpers over size synthetic records."""
+    if name == "aggregate_measurements":
+        groups = [
+            MeasurementGroup.from_api(record)
+            for record in generate_records(generate_measurement_group, size, seed=seed)
+        ]
+        return measure(name, size, lambda: aggregate_measurements(groups))
+    summaries = [
+        SleepSummary.from_api(record)
+        for record in generate_records(generate_sleep_summary, size, seed=seed)
+    ]
+    return measure(name, size, lambda: aggregate_sleep_summary(summaries))
+
+
+def run(
+    names: Sequence[str],
+    sizes: Sequence[int],
+    *,
+    seed: int = 0,
+    codec: bool = False,
+) -> list[BenchmarkResult]:
+    """Run the selected benchmarks for every size.
+
+    With codec, decoding cached models is benchmarked next to every model.
+    """
+    results: list[BenchmarkResult] = []
+    for size in sizes:
+        for name in names:
+            if name in AGGREGATE_BENCHMARKS:
+                results.append(benchmark_aggregate(name, size, seed=seed))
+            else:
+                results.append(benchmark_model(name, size, seed=seed))
+                if codec:
+                    results.append(benchmark_codec(name, size, seed=seed))
+    return results
+
+
+def format_results(results: Sequence[BenchmarkResult]) -> str:
+    """Format results as a plain text table."""
+    lines = [
+        f"{'benchmark':<40} {'records':>10} {'seconds':>10} "
+        f"{'records/s':>14} {'peak MiB':>10}"
+    ]
+    lines.extend(
+        f"{result.name:<40} {result.records:>10} {result.seconds:>10.4f} "
+        f"{result.throughput:>14,.0f} {result.peak_memory / 2**20:>10.2f}"
+        for result in results
+    )
+    return "\n".join(lines)
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    """Run the parser benchmarks from the command line."""
+    choices = [*PAYLOAD_GENERATORS, *AGGREGATE_BENCHMARKS]
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=DEFAULT_SIZES,
+        help="number of records per benchmark, from 10 up to 1000000",
+    )
+    parser.add_argument(
+        "--benchmarks",
+        nargs="+",
+        choices=choices,
+        default=choices,
+        help="benchmarks to run, defaults to all",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--codec",
+        action="store_true",
+        help="also benchmark decoding models serialized with encode_models",
+    )
+    parser.add_argument(
+        "--output",
+        type=Path,
+        help="write the results as JSON, to compare between releases",
+    )
+    args = parser.parse_args(argv)
+
+    results = run(args.benchmarks, args.sizes, seed=args.seed, codec=args.codec)
+    print(format_results(results))  # noqa: T201
+    if args.output:
+        args.output.write_text(
+            json.dumps(
+                [
+                    {**asdict(result), "throughput": result.throughput}
+                    for result in results
+                ],
+                indent=2,
+            ),
+            encoding="utf-8",
+        )
+
+
+if __name__ == "__main__":
+    main()
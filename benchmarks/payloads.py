@@ -0,0 +1,275 @@
+"""Synthetic Withings API payloads of configurable size."""
+
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+from random import Random
+from typing import TYPE_CHECKING, Any
+
+from aiowithings import (
+    Activity,
+    Device,
+    Goals,
+    MeasurementGroup,
+    SleepSeries,
+    SleepSummary,
+    WebhookCall,
+    Workout,
+)
+from aiowithings.models import NotificationConfiguration
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+START_TIMESTAMP = 1609459200
+DAY = 86400
+MEASUREMENT_TYPES = (1, 4, 5, 6, 8, 9, 10, 11, 12, 54, 71, 73, 76, 77, 88, 91)
+SLEEP_SERIES_FIELDS = ("hr", "rr", "snoring", "sdnn_1", "rmssd", "mvt_score")
+
+
+def _hash(random: Random) -> str:
+    return f"{random.getrandbits(160):040x}"
+
+
+def generate_device(random: Random, index: int) -> dict[str, Any]:
+    """Generate a device as returned by v2/user getdevice."""
+    device_id = _hash(random)
+    return {
+        "type": random.choice(["Scale", "Sleep Monitor", "Activity Tracker"]),
+        "battery": random.choice(["low", "medium", "high", "unknown"]),
+        "model": "Body+",
+        "model_id": random.choice([5, 13, 93]),
+        "timezone": "Europe/Amsterdam",
+        "first_session_date": START_TIMESTAMP + index,
+        "last_session_date": START_TIMESTAMP + index * DAY,
+        "deviceid": device_id,
+        "hash_deviceid": device_id,
+    }
+
+
+def generate_goals(random: Random, _index: int) -> dict[str, Any]:
+    """Generate goals as returned by v2/user getgoals."""
+    return {
+        "steps": random.randrange(5000, 15000),
+        "sleep": random.randrange(21600, 36000),
+        "weight": {"value": random.randrange(50000, 120000), "unit": -3},
+    }
+
+
+def generate_measurement_group(random: Random, index: int) -> dict[str, Any]:
+    """Generate a measurement group as returned by measure getmeas."""
+    timestamp = START_TIMESTAMP + index * 3600
+    device_id = _hash(random)
+    return {
+        "grpid": index,
+        "attrib": random.choice([0, 0, 0, 1, 2, 8]),
+        "date": timestamp,
+        "created": timestamp + 30,
+        "modified": timestamp + 30,
+        "category": 1,
+        "deviceid": device_id,
+        "hash_deviceid": device_id,
+        "measures": [
+            {
+                "value": random.randrange(1000, 150000),
+                "type": measurement_type,
+                "unit": -3,
+                "algo": 3,
+                "fm": 3,
+            }
+            for measurement_type in random.sample(MEASUREMENT_TYPES, 4)
+        ],
+        "modelid": 5,
+        "model": "Body+",
+        "comment": None,
+    }
+
+
+def generate_notification_configuration(
+    random: Random,
+    index: int,
+) -> dict[str, Any]:
+    """Generate a notification configuration as returned by notify list."""
+    return {
+        "appli": random.choice([1, 4, 16, 44, 46, 50, 51]),
+        "callbackurl": f"https://example.com/webhook/{index}",
+        "expires": 2147483647,
+        "comment": "Benchmark subscription",
+    }
+
+
+def generate_webhook_call(random: Random, index: int) -> dict[str, Any]:
+    """Generate the form data of a webhook call."""
+    timestamp = START_TIMESTAMP + index * 60
+    return {
+        "userid": random.randrange(1, 1_000_000),
+        "appli": random.choice([1, 4, 16, 44]),
+        "startdate": timestamp,
+        "enddate": timestamp + 3600,
+    }
+
+
+def generate_sleep_series(
+    random: Random,
+    index: int,
+    *,
+    start: int | None = None,
+    points: int = 60,
+) -> dict[str, Any]:
+    """Generate a sleep series as returned by v2/sleep get."""
+    if start is None:
+        start = START_TIMESTAMP + index * 3600
+    series: dict[str, Any] = {
+        "startdate": start,
+        "state": random.randrange(0, 4),
+        "enddate": start + points * 60,
+        "model": "Aura Sensor V2",
+        "hash_deviceid": _hash(random),
+        "model_id": 63,
+    }
+    for field in SLEEP_SERIES_FIELDS:
+        series[field] = {
+            str(start + point * 60): random.randrange(0, 120) for point in range(points)
+        }
+    return series
+
+
+def generate_sleep_summary(random: Random, index: int) -> dict[str, Any]:
+    """Generate a sleep summary as returned by v2/sleep getsummary."""
+    start = START_TIMESTAMP + index * DAY
+    night = datetime.fromtimestamp(start, tz=UTC) + timedelta(days=1)
+    return {
+        "id": index,
+        "timezone": "Europe/Paris",
+        "model": 32,
+        "model_id": 63,
+        "hash_deviceid": _hash(random),
+        "startdate": start,
+        "enddate": start + 28800,
+        "date": night.date().isoformat(),
+        "data": {
+            "wakeupduration": random.randrange(0, 3600),
+            "wakeupcount": random.randrange(0, 5),
+            "remsleepduration": random.randrange(0, 7200),
+            "total_sleep_time": random.randrange(14400, 32400),
+            "sleep_efficiency": random.random(),
+            "sleep_latency": random.randrange(0, 1800),
+            "wakeup_latency": random.randrange(0, 1800),
+            "waso": random.randrange(0, 3600),
+            "nb_rem_episodes": random.randrange(0, 6),
+            "out_of_bed_count": random.randrange(0, 3),
+            "lightsleepduration": random.randrange(0, 14400),
+            "deepsleepduration": random.randrange(0, 7200),
+            "hr_average": random.randrange(45, 90),
+            "hr_min": random.randrange(40, 60),
+            "hr_max": random.randrange(80, 140),
+            "rr_average": random.randrange(10, 20),
+            "rr_min": random.randrange(8, 12),
+            "rr_max": random.randrange(16, 24),
+            "breathing_disturbances_intensity": random.randrange(0, 30),
+            "snoring": random.randrange(0, 3600),
+            "snoringepisodecount": random.randrange(0, 40),
+            "sleep_score": random.randrange(0, 100),
+            "apnea_hypopnea_index": random.randrange(0, 30),
+        },
+        "created": start + 30000,
+        "modified": start + 30000,
+    }
+
+
+def generate_activity(random: Random, index: int) -> dict[str, Any]:
+    """Generate an activity as returned by v2/measure getactivity."""
+    day = datetime.fromtimestamp(START_TIMESTAMP + index * DAY, tz=UTC)
+    return {
+        "steps": random.randrange(0, 25000),
+        "distance": random.random() * 20000,
+        "elevation": random.randrange(0, 100),
+        "soft": random.randrange(0, 10000),
+        "moderate": random.randrange(0, 3600),
+        "intense": random.randrange(0, 3600),
+        "active": random.randrange(0, 7200),
+        "calories": random.random() * 1000,
+        "totalcalories": random.random() * 3000,
+        "hr_average": random.randrange(60, 100),
+        "hr_min": random.randrange(40, 60),
+        "hr_max": random.randrange(100, 180),
+        "hr_zone_0": random.randrange(0, 10000),
+        "hr_zone_1": random.randrange(0, 3600),
+        "hr_zone_2": random.randrange(0, 1800),
+        "hr_zone_3": random.randrange(0, 600),
+        "deviceid": None,
+        "hash_deviceid": None,
+        "timezone": "Europe/Amsterdam",
+        "date": day.date().isoformat(),
+        "modified": START_TIMESTAMP + index * DAY + 80000,
+        "brand": 18,
+        "modelid": 1055,
+        "model": "GoogleFit tracker",
+        "is_tracker": False,
+    }
+
+
+def generate_workout(random: Random, index: int) -> dict[str, Any]:
+    """Generate a workout as returned by v2/measure getworkouts."""
+    start = START_TIMESTAMP + index * 7200
+    day = datetime.fromtimestamp(start, tz=UTC)
+    return {
+        "id": index,
+        "category": random.choice([1, 2, 3, 4, 6, 7, 16, 36]),
+        "timezone": "Europe/Amsterdam",
+        "model": 1055,
+        "attrib": 0,
+        "startdate": start,
+        "enddate": start + 3600,
+        "date": day.date().isoformat(),
+        "deviceid": None,
+        "data": {
+            "calories": random.randrange(0, 1000),
+            "intensity": random.randrange(0, 100),
+            "hr_average": random.randrange(60, 160),
+            "hr_min": random.randrange(50, 80),
+            "hr_max": random.randrange(120, 190),
+            "hr_zone_0": random.randrange(0, 1000),
+            "hr_zone_1": random.randrange(0, 1000),
+            "hr_zone_2": random.randrange(0, 1000),
+            "hr_zone_3": random.randrange(0, 1000),
+            "pause_duration": random.randrange(0, 600),
+            "steps": random.randrange(0, 10000),
+            "distance": random.randrange(0, 20000),
+            "elevation": random.randrange(0, 200),
+            "spo2_average": random.randrange(0, 100),
+        },
+        "modified": start + 4000,
+    }
+
+
+PAYLOAD_GENERATORS: dict[str, tuple[type[Any], Callable[[Random, int], Any]]] = {
+    "device": (Device, generate_device),
+    "goals": (Goals, generate_goals),
+    "measurement_group": (MeasurementGroup, generate_measurement_group),
+    "notification_configuration": (
+        NotificationConfiguration,
+        generate_notification_configuration,
+    ),
+    "webhook_call": (WebhookCall, generate_webhook_call),
+    "sleep_series": (SleepSeries, generate_sleep_series),
+    "sleep_summary": (SleepSummary, generate_sleep_summary),
+    "activity": (Activity, generate_activity),
+    "workout": (Workout, generate_workout),
+}
+
+
+def generate_records(
+    generator: Callable[[Random, int], Any],
+    count: int,
+    *,
+    seed: int = 0,
+) -> list[Any]:
+    """Generate a deterministic list of count records."""
+    random = Random(seed)  # noqa: S311
+    return [generator(random, index) for index in range(count)]
+
+
+def build_response(key: str, records: list[Any], **extra: Any) -> dict[str, Any]:
+    """Wrap records in a Withings response envelope."""
+    return {"status": 0, "body": {key: records, **extra}}
@@ -0,0 +1,112 @@
+"""Local stub of the Withings API serving synthetic responses."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from typing import Any
+
+from aiohttp import web
+
+from .payloads import (
+    build_response,
+    generate_activity,
+    generate_device,
+    generate_goals,
+    generate_measurement_group,
+    generate_records,
+    generate_sleep_series,
+    generate_sleep_summary,
+    generate_workout,
+)
+
+LATENCY_KEY = web.AppKey("latency", float)
+RESPONSES_KEY = web.AppKey("responses", dict[tuple[str, str], bytes])
+
+
+def _encode(response: dict[str, Any]) -> bytes:
+    return json.dumps(response).encode()
+
+
+def build_responses(records: int, *, seed: int = 0) -> dict[tuple[str, str], bytes]:
+    """Build the encoded response for every endpoint and action."""
+
+    def generate(generator: Any) -> list[Any]:
+        return generate_records(generator, records, seed=seed)
+
+    return {
+        ("measure", "getmeas"): _encode(
+            build_response(
+                "measuregrps",
+                generate(generate_measurement_group),
+                updatetime=0,
+                timezone="Europe/Amsterdam",
+                more=0,
+                offset=0,
+            )
+        ),
+        ("v2/sleep", "get"): _encode(
+            build_response("series", generate(generate_sleep_series))
+        ),
+        ("v2/sleep", "getsummary"): _encode(
+            build_response(
+                "series",
+                generate(generate_sleep_summary),
+                more=False,
+                offset=0,
+            )
+        ),
+        ("v2/measure", "getactivity"): _encode(
+            build_response(
+                "activities",
+                generate(generate_activity),
+                more=False,
+                offset=0,
+            )
+        ),
+        ("v2/measure", "getworkouts"): _encode(
+            build_response(
+                "series",
+                generate(generate_workout),
+                more=False,
+                offset=0,
+            )
+        ),
+        ("v2/user", "getdevice"): _encode(
+            build_response("devices", generate(generate_device))
+        ),
+        ("v2/user", "getgoals"): _encode(
+            build_response("goals", generate_records(generate_goals, 1, seed=seed)[0])
+        ),
+    }
+
+
+async def handle(request: web.Request) -> web.Response:
+    """Serve the prepared response for the endpoint and action."""
+    data = await request.post()
+    key = (request.match_info["endpoint"], str(data.get("action")))
+    latency = request.app[LATENCY_KEY]
+    if latency:
+        await asyncio.sleep(latency)
+    body = request.app[RESPONSES_KEY].get(key)
+    if body is None:
+        body = _encode({"status": 503, "error": "Invalid params"})
+    return web.Response(body=body, content_type="application/json")
+
+
+def create_app(
+    *,
+    latency: float = 0.0,
+    records: int = 100,
+    seed: int = 0,
+) -> web.Application:
+    """Create the stub application.
+
+    Every response holds records synthetic records, served after latency
+    seconds to mimic the round trip to the real service.
+    """
+    app = web.Application()
+    app[LATENCY_KEY] = latency
+    app[RESPONSES_KEY] = build_responses(records, seed=seed)
+    app.router.add_post("/{endpoint:.+}", handle)
+    return app
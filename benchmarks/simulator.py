@@ -0,0 +1,566 @@
+"""Stateful local simulator of the Withings API.
+
+The simulator serves the endpoints the client uses for any number of
+synthetic users. It paginates with ``more`` and ``offset``, enforces a per
+minute request quota with status 601 and can inject latency and faults, so
+load tests and scaling experiments can run offline.
+
+Run with ``uv run python -m benchmarks.simulator --latency 0.05 --error-rate 0.01``
+and authenticate with ``simulated-<user id>`` for any numeric user id.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import UTC, date, datetime
+import json
+from random import Random
+import time
+from typing import TYPE_CHECKING, Any, Self
+
+from aiohttp import web
+
+from aiowithings import WithingsClient
+
+from .payloads import (
+    DAY,
+    generate_activity,
+    generate_device,
+    generate_goals,
+    generate_measurement_group,
+    generate_sleep_series,
+    generate_sleep_summary,
+    generate_workout,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from aiohttp import ClientSession
+    from multidict import MultiDictProxy
+
+DEFAULT_END = int(datetime(2024, 1, 1, tzinfo=UTC).timestamp())
+
+STATUS_INVALID_TOKEN = 401
+STATUS_INVALID_PARAMS = 503
+STATUS_TOO_MANY_REQUESTS = 601
+FAULT_STATUSES = (215, 522, 2555)
+
+
+@dataclass(slots=True)
+class SimulatorConfig:
+    """Behaviour of the simulator."""
+
+    days: int = 365
+    """Days of history generated for every user."""
+    page_size: int = 100
+    """Maximum number of records in a single page."""
+    requests_per_minute: int = 600
+    """App wide quota, requests above it are answered with status 601."""
+    latency: float = 0.0
+    """Seconds added to every request."""
+    latency_jitter: float = 0.0
+    """Maximum random seconds added on top of latency."""
+    error_rate: float = 0.0
+    """Fraction of requests answered with a random Withings error status."""
+    html_error_rate: float = 0.0
+    """Fraction of requests answered with a non-JSON error page."""
+    timeout_rate: float = 0.0
+    """Fraction of requests that stall for timeout_delay seconds."""
+    timeout_delay: float = 30.0
+    sleep_series_points: int = 8
+    """Data points per field in every sleep series."""
+
+
+@dataclass(slots=True)
+class SimulatorStats:
+    """Counters of what the simulator served."""
+
+    requests: int = 0
+    throttled: int = 0
+    errors: int = 0
+    html_errors: int = 0
+    timeouts: int = 0
+    per_endpoint: dict[str, int] = field(default_factory=dict)
+
+
+@dataclass(slots=True)
+class SimulatedUser:
+    """History of a single synthetic user."""
+
+    user_id: int
+    devices: list[dict[str, Any]]
+    goals: dict[str, Any]
+    measurement_groups: list[dict[str, Any]]
+    sleep_series: list[dict[str, Any]]
+    sleep_summaries: list[dict[str, Any]]
+    activities: list[dict[str, Any]]
+    workouts: list[dict[str, Any]]
+    subscriptions: list[dict[str, Any]] = field(default_factory=list)
+
+    @classmethod
+    def generate(cls, user_id: int, config: SimulatorConfig, *, seed: int) -> Self:
+        """Generate a deterministic history ending at DEFAULT_END."""
+        random = Random(seed * 1_000_003 + user_id)  # noqa: S311
+        start = DEFAULT_END - config.days * DAY
+        devices = [generate_device(random, index) for index in range(2)]
+        for device in devices:
+            device["first_session_date"] = start
+            device["last_session_date"] = DEFAULT_END
+        measurement_groups = []
+        sleep_series = []
+        sleep_summaries = []
+        activities = []
+        workouts = []
+        for day in range(config.days):
+            day_start = start + day * DAY
+            measurement_groups.append(
+                _measurement_group(random, user_id, day, day_start)
+            )
+            sleep_series.append(
+                generate_sleep_series(
+                    random,
+                    day,
+                    start=day_start - 7200,
+                    points=config.sleep_series_points,
+                )
+            )
+            sleep_summaries.append(_sleep_summary(random, day, day_start))
+            activities.append(_activity(random, day, day_start))
+            if day % 3 == 0:
+                workouts.append(_workout(random, user_id, day, day_start))
+        return cls(
+            user_id=user_id,
+            devices=devices,
+            goals=generate_goals(random, 0),
+            measurement_groups=measurement_groups,
+            sleep_series=sleep_series,
+            sleep_summaries=sleep_summaries,
+            activities=activities,
+            workouts=workouts,
+        )
+
+
+def _measurement_group(
+    random: Random, user_id: int, day: int, day_start: int
+) -> dict[str, Any]:
+    measurement_group = generate_measurement_group(random, day)
+    measurement_group["grpid"] = user_id * 1_000_000 + day
+    measurement_group["date"] = day_start + 25200
+    measurement_group["created"] = measurement_group["modified"] = day_start + 25260
+    return measurement_group
+
+
+def _sleep_summary(random: Random, day: int, day_start: int) -> dict[str, Any]:
+    summary = generate_sleep_summary(random, day)
+    summary["startdate"] = day_start - 7200
+    summary["enddate"] = day_start + 21600
+    summary["date"] = _to_date(day_start).isoformat()
+    summary["created"] = summary["modified"] = day_start + 25000
+    return summary
+
+
+def _activity(random: Random, day: int, day_start: int) -> dict[str, Any]:
+    activity = generate_activity(random, day)
+    activity["date"] = _to_date(day_start).isoformat()
+    activity["modified"] = day_start + 80000
+    return activity
+
+
+def _workout(random: Random, user_id: int, day: int, day_start: int) -> dict[str, Any]:
+    workout = generate_workout(random, day)
+    workout["id"] = user_id * 1_000_000 + day
+    workout["startdate"] = day_start + 64800
+    workout["enddate"] = day_start + 68400
+    workout["date"] = _to_date(day_start).isoformat()
+    workout["modified"] = day_start + 70000
+    return workout
+
+
+def _to_date(timestamp: int) -> date:
+    return datetime.fromtimestamp(timestamp, tz=UTC).date()
+
+
+def _parse_date(value: str) -> date:
+    """Parse the date part of a ymd parameter."""
+    return date.fromisoformat(value[:10])
+
+
+def _success(body: dict[str, Any]) -> web.Response:
+    return web.json_response({"status": 0, "body": body})
+
+
+def _status(status: int, error: str) -> web.Response:
+    return web.json_response({"status": status, "error": error})
+
+
+class WithingsSimulator:
+    """Stateful local simulator of the Withings API."""
+
+    def __init__(
+        self,
+        config: SimulatorConfig | None = None,
+        *,
+        seed: int = 0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize the simulator.
+
+        Users are generated on their first request, so the number of users is
+        only bounded by memory.
+        """
+        self.config = config or SimulatorConfig()
+        self.stats = SimulatorStats()
+        self._seed = seed
+        self._clock = clock
+        self._random = Random(seed)  # noqa: S311
+        self._users: dict[int, SimulatedUser] = {}
+        self._quota_window: deque[float] = deque()
+        self._runner: web.AppRunner | None = None
+        self.port: int | None = None
+        self._handlers: dict[
+            tuple[str, str],
+            Callable[[SimulatedUser, MultiDictProxy[Any]], web.Response],
+        ] = {
+            ("measure", "getmeas"): self._get_measurements,
+            ("v2/sleep", "get"): self._get_sleep,
+            ("v2/sleep", "getsummary"): self._get_sleep_summary,
+            ("v2/measure", "getactivity"): self._get_activities,
+            ("v2/measure", "getworkouts"): self._get_workouts,
+            ("v2/user", "getdevice"): self._get_devices,
+            ("v2/user", "getgoals"): self._get_goals,
+            ("notify", "subscribe"): self._subscribe,
+            ("notify", "list"): self._list_subscriptions,
+            ("notify", "revoke"): self._revoke,
+        }
+
+    @staticmethod
+    def token_for(user_id: int) -> str:
+        """Return the access token of a user."""
+        return f"simulated-{user_id}"
+
+    def user(self, user_id: int) -> SimulatedUser:
+        """Return a user, generating its history when needed."""
+        if (user := self._users.get(user_id)) is None:
+            user = self._users[user_id] = SimulatedUser.generate(
+                user_id, self.config, seed=self._seed
+            )
+        return user
+
+    def create_app(self) -> web.Application:
+        """Create the aiohttp application serving the simulator."""
+        app = web.Application()
+        app.router.add_post("/{endpoint:.+}", self._handle)
+        return app
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> int:
+        """Start serving and return the port."""
+        self._runner = web.AppRunner(self.create_app())
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+        self.port = self._runner.addresses[0][1]
+        return self.port
+
+    async def stop(self) -> None:
+        """Stop serving."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def client(self, user_id: int, session: ClientSession) -> WithingsClient:
+        """Return a client authenticated as user_id, talking to the simulator."""
+        if self.port is None:
+            msg = "Simulator is not started"
+            raise RuntimeError(msg)
+        client = WithingsClient(
+            session=session,
+            api_host="127.0.0.1",
+            api_scheme="http",
+            api_port=self.port,
+        )
+        client.authenticate(self.token_for(user_id))
+        return client
+
+    async def __aenter__(self) -> Self:
+        """Start the simulator."""
+        await self.start()
+        return self
+
+    async def __aexit__(self, *_exc_info: object) -> None:
+        """Stop the simulator."""
+        await self.stop()
+
+    def _within_quota(self) -> bool:
+        now = self._clock()
+        window = self._quota_window
+        while window and window[0] <= now - 60:
+            window.popleft()
+        if len(window) >= self.config.requests_per_minute:
+            return False
+        window.append(now)
+        return True
+
+    async def _handle(self, request: web.Request) -> web.StreamResponse:
+        config = self.config
+        endpoint = request.match_info["endpoint"]
+        data = await request.post()
+        action = str(data.get("action"))
+        self.stats.requests += 1
+        key = f"{endpoint} {action}"
+        self.stats.per_endpoint[key] = self.stats.per_endpoint.get(key, 0) + 1
+
+        latency = config.latency + self._random.random() * config.latency_jitter
+        if latency:
+            await asyncio.sleep(latency)
+
+        if not self._within_quota():
+            self.stats.throttled += 1
+            return _status(STATUS_TOO_MANY_REQUESTS, "Too many requests")
+
+        roll = self._random.random()
+        if roll < config.timeout_rate:
+            self.stats.timeouts += 1
+            await asyncio.sleep(config.timeout_delay)
+        roll -= config.timeout_rate
+        if 0 <= roll < config.html_error_rate:
+            self.stats.html_errors += 1
+            return web.Response(
+                status=502,
+                text="<html><body><h1>502 Bad Gateway</h1></body></html>",
+                content_type="text/html",
+            )
+        roll -= config.html_error_rate
+        if 0 <= roll < config.error_rate:
+            self.stats.errors += 1
+            return _status(self._random.choice(FAULT_STATUSES), "Simulated error")
+
+        authorization = request.headers.get("Authorization", "")
+        token = authorization.removeprefix("Bearer ")
+        user_id = token.removeprefix("simulated-")
+        if token == authorization or not user_id.isdigit():
+            return _status(STATUS_INVALID_TOKEN, "Invalid token")
+        user = self.user(int(user_id))
+
+        handler = self._handlers.get((endpoint, action))
+        if handler is None:
+            return _status(STATUS_INVALID_PARAMS, "Invalid params")
+        return handler(user, data)
+
+    def _paginate(
+        self,
+        records: list[dict[str, Any]],
+        key: str,
+        data: MultiDictProxy[Any],
+        **extra: Any,
+    ) -> web.Response:
+        offset = int(data.get("offset", 0))
+        page = records[offset : offset + self.config.page_size]
+        more = offset + len(page) < len(records)
+        return _success(
+            {
+                key: page,
+                "more": more,
+                "offset": offset + len(page) if more else 0,
+                **extra,
+            }
+        )
+
+    def _get_measurements(
+        self,
+        user: SimulatedUser,
+        data: MultiDictProxy[Any],
+    ) -> web.Response:
+        groups = user.measurement_groups
+        if "lastupdate" in data:
+            last_update = int(data["lastupdate"])
+            groups = [group for group in groups if group["modified"] >= last_update]
+        else:
+            start = int(data.get("startdate", 0))
+            end = int(data.get("enddate", DEFAULT_END))
+            groups = [group for group in groups if start <= group["date"] <= end]
+        if "meastypes" in data:
+            types = {int(value) for value in str(data["meastypes"]).split(",")}
+            groups = [
+                {
+                    **group,
+                    "measures": [
+                        measure
+                        for measure in group["measures"]
+                        if measure["type"] in types
+                    ],
+                }
+                for group in groups
+            ]
+            groups = [group for group in groups if group["measures"]]
+        groups = sorted(groups, key=lambda group: group["date"], reverse=True)
+        return self._paginate(
+            groups,
+            "measuregrps",
+            data,
+            updatetime=DEFAULT_END,
+            timezone="Europe/Amsterdam",
+        )
+
+    def _get_sleep(
+        self,
+        user: SimulatedUser,
+        data: MultiDictProxy[Any],
+    ) -> web.Response:
+        start = int(data.get("startdate", 0))
+        end = int(data.get("enddate", DEFAULT_END))
+        fields = str(data.get("data_fields", "")).split(",")
+        series = [
+            {
+                key: value
+                for key, value in sleep_series.items()
+                if not isinstance(value, dict) or key in fields
+            }
+            for sleep_series in user.sleep_series
+            if start <= sleep_series["startdate"] <= end
+        ]
+        return _success({"series": series})
+
+    def _filter_by_day(
+        self,
+        records: list[dict[str, Any]],
+        data: MultiDictProxy[Any],
+    ) -> list[dict[str, Any]]:
+        if "lastupdate" in data:
+            last_update = int(data["lastupdate"])
+            return [record for record in records if record["modified"] >= last_update]
+        start = _parse_date(str(data.get("startdateymd", "1970-01-01")))
+        end = _parse_date(str(data.get("enddateymd", "9999-12-31")))
+        return [
+            record
+            for record in records
+            if start <= date.fromisoformat(record["date"]) <= end
+        ]
+
+    def _get_sleep_summary(
+        self,
+        user: SimulatedUser,
+        data: MultiDictProxy[Any],
+    ) -> web.Response:
+        return self._paginate(
+            self._filter_by_day(user.sleep_summaries, data), "series", data
+        )
+
+    def _get_activities(
+        self,
+        user: SimulatedUser,
+        data: MultiDictProxy[Any],
+    ) -> web.Response:
+        return self._paginate(
+            self._filter_by_day(user.activities, data), "activities", data
+        )
+
+    def _get_workouts(
+        self,
+        user: SimulatedUser,
+        data: MultiDictProxy[Any],
+    ) -> web.Response:
+        return self._paginate(self._filter_by_day(user.workouts, data), "series", data)
+
+    def _get_devices(
+        self,
+        user: SimulatedUser,
+        _data: MultiDictProxy[Any],
+    ) -> web.Response:
+        return _success({"devices": user.devices})
+
+    def _get_goals(
+        self,
+        user: SimulatedUser,
+        _data: MultiDictProxy[Any],
+    ) -> web.Response:
+        return _success({"goals": user.goals})
+
+    def _subscribe(
+        self,
+        user: SimulatedUser,
+        data: MultiDictProxy[Any],
+    ) -> web.Response:
+        user.subscriptions.append(
+            {
+                "appli": int(data["appli"]),
+                "callbackurl": str(data["callbackurl"]),
+                "expires": 2147483647,
+                "comment": "",
+            }
+        )
+        return _success({})
+
+    def _list_subscriptions(
+        self,
+        user: SimulatedUser,
+        data: MultiDictProxy[Any],
+    ) -> web.Response:
+        profiles = user.subscriptions
+        if "appli" in data:
+            profiles = [
+                profile
+                for profile in profiles
+                if profile["appli"] == int(data["appli"])
+            ]
+        return _success({"profiles": profiles})
+
+    def _revoke(
+        self,
+        user: SimulatedUser,
+        data: MultiDictProxy[Any],
+    ) -> web.Response:
+        user.subscriptions = [
+            profile
+            for profile in user.subscriptions
+            if profile["appli"] != int(data["appli"])
+            or profile["callbackurl"] != data["callbackurl"]
+        ]
+        return _success({})
+
+
+async def _serve(config: SimulatorConfig, host: str, port: int, seed: int) -> None:
+    simulator = WithingsSimulator(config, seed=seed)
+    port = await simulator.start(host, port)
+    print(  # noqa: T201
+        f"Serving the Withings simulator on http://{host}:{port}, "
+        f"authenticate with {json.dumps(simulator.token_for(1))}"
+    )
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await simulator.stop()
+
+
+def main() -> None:
+    """Serve the simulator from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--requests-per-minute", type=int, default=600)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--latency-jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--html-error-rate", type=float, default=0.0)
+    parser.add_argument("--timeout-rate", type=float, default=0.0)
+    args = parser.parse_args()
+    config = SimulatorConfig(
+        days=args.days,
+        page_size=args.page_size,
+        requests_per_minute=args.requests_per_minute,
+        latency=args.latency,
+        latency_jitter=args.latency_jitter,
+        error_rate=args.error_rate,
+        html_error_rate=args.html_error_rate,
+        timeout_rate=args.timeout_rate,
+    )
+    asyncio.run(_serve(config, args.host, args.port, args.seed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,301 @@
+"""End-to-end throughput benchmark against a local stub of the Withings API.
+
+Run with ``uv run python -m benchmarks.throughput --concurrency 16``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from functools import partial
+import re
+import statistics
+import time
+from typing import TYPE_CHECKING, Any
+
+from aiohttp import ClientSession, TCPConnector, web
+from aioresponses import CallbackResult, aioresponses
+
+from aiowithings import TraceEvent, TraceEventType, WithingsClient
+
+from .server import build_responses, create_app
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable, Sequence
+
+    from yarl import URL
+
+START = datetime(2021, 1, 1, tzinfo=UTC)
+END = datetime(2022, 1, 1, tzinfo=UTC)
+
+OPERATIONS: dict[str, Callable[[WithingsClient], Awaitable[Any]]] = {
+    "measure": lambda client: client.get_measurement_in_period(START, END),
+    "sleep": lambda client: client.get_sleep(START, END),
+    "sleep_summary": lambda client: client.get_sleep_summary_in_period(
+        START.date(), END.date()
+    ),
+    "activities": lambda client: client.get_activities_in_period(
+        START.date(), END.date()
+    ),
+    "workouts": lambda client: client.get_workouts_in_period(START.date(), END.date()),
+    "devices": lambda client: client.get_devices(),
+    "goals": lambda client: client.get_goals(),
+}
+
+PHASES: dict[str, TraceEventType | None] = {
+    "send": TraceEventType.RESPONSE_HEADERS,
+    "read": TraceEventType.BODY_READ,
+    "decode": TraceEventType.STATUS_DISPATCHED,
+    "parse": None,
+}
+
+
+@dataclass(slots=True)
+class OperationResult:
+    """Latencies of all requests of a single operation."""
+
+    name: str
+    latencies: list[float]
+    seconds: float
+
+    @property
+    def requests_per_second(self) -> float:
+        """Return the sustained number of requests per second."""
+        return len(self.latencies) / self.seconds
+
+    def percentile(self, percentile: int) -> float:
+        """Return the latency percentile in seconds."""
+        if len(self.latencies) == 1:
+            return self.latencies[0]
+        return statistics.quantiles(self.latencies, n=100, method="inclusive")[
+            percentile - 1
+        ]
+
+
+async def _drive(
+    client: WithingsClient,
+    name: str,
+    *,
+    requests: int,
+    concurrency: int,
+) -> OperationResult:
+    operation = OPERATIONS[name]
+    remaining = iter(range(requests))
+    latencies: list[float] = []
+
+    async def worker() -> None:
+        for _ in remaining:
+            start = time.perf_counter()
+            await operation(client)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    async with asyncio.TaskGroup() as task_group:
+        for _ in range(concurrency):
+            task_group.create_task(worker())
+    return OperationResult(name, latencies, time.perf_counter() - start)
+
+
+# pylint: disable-next=too-many-arguments
+async def run(  # noqa: PLR0913
+    names: Sequence[str],
+    *,
+    requests: int = 200,
+    concurrency: int = 8,
+    latency: float = 0.0,
+    records: int = 100,
+    seed: int = 0,
+) -> list[OperationResult]:
+    """Serve the stub locally and drive the client against it."""
+    runner = web.AppRunner(create_app(latency=latency, records=records, seed=seed))
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    host, port = runner.addresses[0][:2]
+    try:
+        async with (
+            ClientSession(connector=TCPConnector(limit=concurrency)) as session,
+            WithingsClient(
+                session=session,
+                api_host=host,
+                api_scheme="http",
+                api_port=port,
+            ) as client,
+        ):
+            client.authenticate("benchmark")
+            return [
+                await _drive(
+                    client,
+                    name,
+                    requests=requests,
+                    concurrency=concurrency,
+                )
+                for name in names
+            ]
+    finally:
+        await runner.cleanup()
+
+
+def _respond(
+    responses: dict[tuple[str, str], bytes],
+    url: URL,
+    **kwargs: Any,
+) -> CallbackResult:
+    """Return the prepared response for the endpoint and action of a request."""
+    return CallbackResult(body=responses[(url.path[1:], kwargs["data"]["action"])])
+
+
+def _time_phases(events: list[TraceEvent], finished: float) -> dict[str, float]:
+    """Return the time of every phase of a traced request.
+
+    A phase ends at its trace event, or when the call finished for the parse
+    phase, which has none.
+    """
+    marks = {event.event_type: event.timestamp for event in events}
+    previous = events[0].timestamp
+    phases: dict[str, float] = {}
+    for phase, event_type in PHASES.items():
+        mark = finished if event_type is None else marks.get(event_type, finished)
+        phases[phase] = mark - previous
+        previous = mark
+    return phases
+
+
+async def _time_operations(
+    client: WithingsClient,
+    events: list[TraceEvent],
+    iterations: int,
+) -> dict[tuple[str, str], dict[str, float]]:
+    """Return the total time of every phase over all calls, per endpoint."""
+    totals: dict[tuple[str, str], dict[str, float]] = {}
+    for operation in OPERATIONS.values():
+        for _ in range(iterations):
+            events.clear()
+            await operation(client)
+            phases = _time_phases(events, time.monotonic())
+            endpoint = (events[0].endpoint, events[0].action or "")
+            total = totals.setdefault(endpoint, dict.fromkeys(PHASES, 0.0))
+            for phase, seconds in phases.items():
+                total[phase] += seconds
+    return totals
+
+
+async def _breakdown(
+    *,
+    records: int,
+    iterations: int,
+    seed: int,
+) -> dict[tuple[str, str], dict[str, float]]:
+    responses = build_responses(records, seed=seed)
+    events: list[TraceEvent] = []
+    with aioresponses() as mocked:
+        mocked.post(
+            re.compile(r".*"), callback=partial(_respond, responses), repeat=True
+        )
+        async with WithingsClient(tracers=[events.append]) as client:
+            client.authenticate("benchmark")
+            totals = await _time_operations(client, events, iterations)
+    return {
+        endpoint: {
+            **{phase: total / iterations for phase, total in phases.items()},
+            "bytes": len(responses[endpoint]),
+        }
+        for endpoint, phases in totals.items()
+    }
+
+
+def breakdown(
+    *,
+    records: int = 100,
+    iterations: int = 100,
+    seed: int = 0,
+) -> dict[tuple[str, str], dict[str, float]]:
+    """Time the phases of requests of the client against a mocked transport.
+
+    Every operation runs through the full request path of the client, with
+    the responses of the stub served by aioresponses instead of a socket.
+    The phases are split on the trace events of the requests. Returns the
+    mean time in seconds per call of sending the request up to the response
+    headers, reading the body, decoding the JSON and checking the status,
+    and parsing the models, for every endpoint and action.
+    """
+    return asyncio.run(_breakdown(records=records, iterations=iterations, seed=seed))
+
+
+def format_results(results: Sequence[OperationResult]) -> str:
+    """Format results as a plain text table, latencies in milliseconds."""
+    lines = [
+        f"{'operation':<16} {'requests':>9} {'req/s':>10} "
+        f"{'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}"
+    ]
+    lines.extend(
+        f"{result.name:<16} {len(result.latencies):>9} "
+        f"{result.requests_per_second:>10.1f} "
+        f"{result.percentile(50) * 1000:>9.2f} "
+        f"{result.percentile(95) * 1000:>9.2f} "
+        f"{result.percentile(99) * 1000:>9.2f}"
+        for result in results
+    )
+    return "\n".join(lines)
+
+
+def format_breakdown(phases: dict[tuple[str, str], dict[str, float]]) -> str:
+    """Format the phase breakdown as a plain text table in microseconds."""
+    lines = [
+        f"{'endpoint':<24} {'bytes':>10} {'send us':>9} {'read us':>9} "
+        f"{'decode us':>11} {'parse us':>11}"
+    ]
+    lines.extend(
+        f"{' '.join(endpoint):<24} {phase['bytes']:>10.0f} {phase['send'] * 1e6:>9.1f} "
+        f"{phase['read'] * 1e6:>9.1f} {phase['decode'] * 1e6:>11.1f} "
+        f"{phase['parse'] * 1e6:>11.1f}"
+        for endpoint, phase in phases.items()
+    )
+    return "\n".join(lines)
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    """Run the throughput benchmark from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--operations",
+        nargs="+",
+        choices=list(OPERATIONS),
+        default=list(OPERATIONS),
+    )
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=0.0,
+        help="simulated server latency in seconds",
+    )
+    parser.add_argument(
+        "--records",
+        type=int,
+        default=100,
+        help="number of records in every response",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    results = asyncio.run(
+        run(
+            args.operations,
+            requests=args.requests,
+            concurrency=args.concurrency,
+            latency=args.latency,
+            records=args.records,
+            seed=args.seed,
+        )
+    )
+    print(format_results(results))  # noqa: T201
+    print()  # noqa: T201
+    print(format_breakdown(breakdown(records=args.records, seed=args.seed)))  # noqa: T201
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,15 @@
 """Asynchronous Python client for Withings."""
 
+from __future__ import annotations
+
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
 from .const import AUTHORIZATION_URL, TOKEN_URL
 from .exceptions import (
     WithingsAuthenticationFailedError,
     WithingsBadStateError,
+    WithingsCircuitOpenError,
     WithingsConnectionError,
     WithingsError,
     WithingsErrorOccurredError,
@@ -11,39 +17,188 @@ from .exceptions import (
     WithingsTooManyRequestsError,
     WithingsUnauthorizedError,
     WithingsUnknownStatusError,
+    WithingsUnknownUserError,
 )
-from .helpers import aggregate_measurements
-from .models import (
-    Activity,
-    ActivityDataFields,
-    ActivityDataOrigin,
-    AuthScope,
-    Device,
-    DeviceBattery,
-    DeviceModel,
-    DeviceType,
-    Goals,
-    Measurement,
-    MeasurementAttribution,
-    MeasurementGroup,
-    MeasurementGroupCategory,
-    MeasurementPosition,
-    MeasurementType,
-    NotificationCategory,
-    Services,
-    SleepDataFields,
-    SleepSeries,
-    SleepSeriesTimeData,
-    SleepState,
-    SleepSummary,
-    SleepSummaryDataFields,
-    WebhookCall,
-    Workout,
-    WorkoutCategory,
-    WorkoutDataFields,
-    get_measurement_type_from_notification_category,
-)
-from .withings import WithingsClient
+
+if TYPE_CHECKING:
+    from .backfill import (
+        BackfillDataType,
+        BackfillOrchestrator,
+        BackfillProgress,
+        BackfillSink,
+        BackfillWindow,
+        CheckpointStore,
+        JsonCheckpointStore,
+        plan_windows,
+    )
+    from .batching import MeasurementBatcher
+    from .circuit import CircuitBreaker, CircuitState, CircuitStateChange
+    from .deadlines import deadline
+    from .dedup import ChangeDetector, ChangeKind
+    from .helpers import (
+        AggregationPeriod,
+        DeviceChanges,
+        DeviceTracker,
+        FieldStatistics,
+        LatestMeasurementAggregator,
+        ResampledSeries,
+        SleepSummaryRollup,
+        aggregate_measurements,
+        resample,
+        resample_activities,
+        resample_measurements,
+        rollup_sleep_summaries,
+    )
+    from .metrics import MetricsCollector, StatusCategory
+    from .models import (
+        Activity,
+        ActivityDataFields,
+        ActivityDataOrigin,
+        AuthScope,
+        Device,
+        DeviceBattery,
+        DeviceModel,
+        DeviceType,
+        Goals,
+        Measurement,
+        MeasurementAttribution,
+        MeasurementGroup,
+        MeasurementGroupCategory,
+        MeasurementPosition,
+        MeasurementType,
+        NotificationCategory,
+        Services,
+        SleepDataFields,
+        SleepSeries,
+        SleepSeriesTimeData,
+        SleepState,
+        SleepSummary,
+        SleepSummaryDataFields,
+        WebhookCall,
+        Workout,
+        WorkoutCategory,
+        WorkoutDataFields,
+        get_measurement_type_from_notification_category,
+    )
+    from .oauth import JsonTokenStore, OAuthToken, TokenManager, TokenStore
+    from .profiling import PhaseSummary, ProfilePhase, RequestProfile, RequestProfiler
+    from .quota import QuotaLedger
+    from .scheduling import (
+        QueueWaitSummary,
+        RequestPriority,
+        RequestScheduler,
+        priority,
+    )
+    from .serialization import decode_model, decode_models, encode_model, encode_models
+    from .tracing import TraceEvent, TraceEventType
+    from .values import MeasurementColumn, MeasurementValue
+    from .withings import WithingsClient
+    from .workers import get_shard, run_sharded
+
+_LAZY_IMPORTS: dict[str, str] = {
+    "BackfillDataType": "backfill",
+    "BackfillOrchestrator": "backfill",
+    "BackfillProgress": "backfill",
+    "BackfillSink": "backfill",
+    "BackfillWindow": "backfill",
+    "CheckpointStore": "backfill",
+    "JsonCheckpointStore": "backfill",
+    "plan_windows": "backfill",
+    "MeasurementBatcher": "batching",
+    "CircuitBreaker": "circuit",
+    "CircuitState": "circuit",
+    "CircuitStateChange": "circuit",
+    "deadline": "deadlines",
+    "ChangeDetector": "dedup",
+    "ChangeKind": "dedup",
+    "AggregationPeriod": "helpers",
+    "DeviceChanges": "helpers",
+    "DeviceTracker": "helpers",
+    "FieldStatistics": "helpers",
+    "LatestMeasurementAggregator": "helpers",
+    "ResampledSeries": "helpers",
+    "SleepSummaryRollup": "helpers",
+    "aggregate_measurements": "helpers",
+    "resample": "helpers",
+    "resample_activities": "helpers",
+    "resample_measurements": "helpers",
+    "rollup_sleep_summaries": "helpers",
+    "MetricsCollector": "metrics",
+    "StatusCategory": "metrics",
+    "Activity": "models",
+    "ActivityDataFields": "models",
+    "ActivityDataOrigin": "models",
+    "AuthScope": "models",
+    "Device": "models",
+    "DeviceBattery": "models",
+    "DeviceModel": "models",
+    "DeviceType": "models",
+    "Goals": "models",
+    "Measurement": "models",
+    "MeasurementAttribution": "models",
+    "MeasurementGroup": "models",
+    "MeasurementGroupCategory": "models",
+    "MeasurementPosition": "models",
+    "MeasurementType": "models",
+    "NotificationCategory": "models",
+    "Services": "models",
+    "SleepDataFields": "models",
+    "SleepSeries": "models",
+    "SleepSeriesTimeData": "models",
+    "SleepState": "models",
+    "SleepSummary": "models",
+    "SleepSummaryDataFields": "models",
+    "WebhookCall": "models",
+    "Workout": "models",
+    "WorkoutCategory": "models",
+    "WorkoutDataFields": "models",
+    "get_measurement_type_from_notification_category": "models",
+    "JsonTokenStore": "oauth",
+    "OAuthToken": "oauth",
+    "TokenManager": "oauth",
+    "TokenStore": "oauth",
+    "PhaseSummary": "profiling",
+    "ProfilePhase": "profiling",
+    "RequestProfile": "profiling",
+    "RequestProfiler": "profiling",
+    "QuotaLedger": "quota",
+    "QueueWaitSummary": "scheduling",
+    "RequestPriority": "scheduling",
+    "RequestScheduler": "scheduling",
+    "priority": "scheduling",
+    "decode_model": "serialization",
+    "decode_models": "serialization",
+    "encode_model": "serialization",
+    "encode_models": "serialization",
+    "TraceEvent": "tracing",
+    "TraceEventType": "tracing",
+    "MeasurementColumn": "values",
+    "MeasurementValue": "values",
+    "WithingsClient": "withings",
+    "get_shard": "workers",
+    "run_sharded": "workers",
+}
+
+
+def __getattr__(name: str) -> Any:
+    """Import public names from their submodule on first access.
+
+    This keeps importing the package cheap, as aiohttp and the models are only
+    imported when they are used.
+    """
+    if (module_name := _LAZY_IMPORTS.get(name)) is None:
+        msg = f"module {__name__!r} has no attribute {name!r}"
+        raise AttributeError(msg)
+    module = import_module(f".{module_name}", __name__)
+    value = getattr(module, name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    """Return the names of the package, including the lazily imported ones."""
+    return sorted({*globals(), *__all__})
+
 
 __all__ = [
     "AUTHORIZATION_URL",
@@ -51,19 +206,51 @@ __all__ = [
     "Activity",
     "ActivityDataFields",
     "ActivityDataOrigin",
+    "AggregationPeriod",
     "AuthScope",
+    "BackfillDataType",
+    "BackfillOrchestrator",
+    "BackfillProgress",
+    "BackfillSink",
+    "BackfillWindow",
+    "ChangeDetector",
+    "ChangeKind",
+    "CheckpointStore",
+    "CircuitBreaker",
+    "CircuitState",
+    "CircuitStateChange",
     "Device",
     "DeviceBattery",
+    "DeviceChanges",
     "DeviceModel",
+    "DeviceTracker",
     "DeviceType",
+    "FieldStatistics",
     "Goals",
+    "JsonCheckpointStore",
+    "JsonTokenStore",
+    "LatestMeasurementAggregator",
     "Measurement",
     "MeasurementAttribution",
+    "MeasurementBatcher",
+    "MeasurementColumn",
     "MeasurementGroup",
     "MeasurementGroupCategory",
     "MeasurementPosition",
     "MeasurementType",
+    "MeasurementValue",
+    "MetricsCollector",
     "NotificationCategory",
+    "OAuthToken",
+    "PhaseSummary",
+    "ProfilePhase",
+    "QueueWaitSummary",
+    "QuotaLedger",
+    "RequestPriority",
+    "RequestProfile",
+    "RequestProfiler",
+    "RequestScheduler",
+    "ResampledSeries",
     "Services",
     "SleepDataFields",
     "SleepSeries",
@@ -71,9 +258,16 @@ __all__ = [
     "SleepState",
     "SleepSummary",
     "SleepSummaryDataFields",
+    "SleepSummaryRollup",
+    "StatusCategory",
+    "TokenManager",
+    "TokenStore",
+    "TraceEvent",
+    "TraceEventType",
     "WebhookCall",
     "WithingsAuthenticationFailedError",
     "WithingsBadStateError",
+    "WithingsCircuitOpenError",
     "WithingsClient",
     "WithingsConnectionError",
     "WithingsError",
@@ -82,9 +276,23 @@ __all__ = [
     "WithingsTooManyRequestsError",
     "WithingsUnauthorizedError",
     "WithingsUnknownStatusError",
+    "WithingsUnknownUserError",
     "Workout",
     "WorkoutCategory",
     "WorkoutDataFields",
     "aggregate_measurements",
+    "deadline",
+    "decode_model",
+    "decode_models",
+    "encode_model",
+    "encode_models",
     "get_measurement_type_from_notification_category",
+    "get_shard",
+    "plan_windows",
+    "priority",
+    "resample",
+    "resample_activities",
+    "resample_measurements",
+    "rollup_sleep_summaries",
+    "run_sharded",
 ]
@@ -0,0 +1,282 @@
+"""Asynchronous Python client for Withings."""
+
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+import asyncio
+from dataclasses import dataclass, field
+from datetime import UTC, datetime, timedelta
+from enum import StrEnum
+import json
+from typing import TYPE_CHECKING, Any
+
+from .scheduling import RequestPriority, priority
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator, Callable, Iterable
+    from pathlib import Path
+
+    from .models import Device
+    from .withings import WithingsClient
+
+
+class BackfillDataType(StrEnum):
+    """Enum representing the data types a backfill fetches."""
+
+    MEASUREMENTS = "measurements"
+    SLEEP_SUMMARIES = "sleep_summaries"
+    ACTIVITIES = "activities"
+    WORKOUTS = "workouts"
+
+
+@dataclass(frozen=True, slots=True)
+class BackfillWindow:
+    """Period of a data type to fetch, from start up to but excluding end."""
+
+    data_type: BackfillDataType
+    start: datetime
+    end: datetime
+
+    @property
+    def key(self) -> str:
+        """Return the key the window is checkpointed under."""
+        return (
+            f"{self.data_type}/{int(self.start.timestamp())}"
+            f"-{int(self.end.timestamp())}"
+        )
+
+
+@dataclass(slots=True)
+class BackfillProgress:
+    """Progress of a backfill, fired for every page and finished window."""
+
+    window: BackfillWindow
+    models: int
+    window_completed: bool
+    completed_windows: int
+    total_windows: int
+
+
+# pylint: disable-next=too-few-public-methods
+class BackfillSink(ABC):
+    """Destination of the models fetched by a backfill."""
+
+    @abstractmethod
+    async def write(self, window: BackfillWindow, models: list[Any]) -> None:
+        """Write a page of models of a window."""
+
+
+class CheckpointStore(ABC):
+    """Storage of the progress of a backfill."""
+
+    @abstractmethod
+    def load(self) -> set[str]:
+        """Return the keys of the completed windows."""
+
+    @abstractmethod
+    def mark_completed(self, key: str) -> None:
+        """Record a completed window."""
+
+    @abstractmethod
+    def load_end(self) -> datetime | None:
+        """Return the end of the backfill, if it was recorded."""
+
+    @abstractmethod
+    def save_end(self, end: datetime) -> None:
+        """Record the end of the backfill."""
+
+
+@dataclass(slots=True)
+class JsonCheckpointStore(CheckpointStore):
+    """Checkpoint store in a local JSON file.
+
+    The file is replaced atomically on every update, so a crash leaves either
+    the previous or the new checkpoint behind.
+    """
+
+    path: Path
+    _completed: set[str] = field(init=False, default_factory=set)
+    _end: float | None = field(init=False, default=None)
+
+    def load(self) -> set[str]:
+        """Return the keys of the completed windows."""
+        self._read()
+        return set(self._completed)
+
+    def mark_completed(self, key: str) -> None:
+        """Record a completed window."""
+        self._completed.add(key)
+        self._write()
+
+    def load_end(self) -> datetime | None:
+        """Return the end of the backfill, if it was recorded."""
+        self._read()
+        if self._end is None:
+            return None
+        return datetime.fromtimestamp(self._end, tz=UTC)
+
+    def save_end(self, end: datetime) -> None:
+        """Record the end of the backfill."""
+        self._end = end.timestamp()
+        self._write()
+
+    def _read(self) -> None:
+        if self.path.exists():
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            self._completed = set(data["completed"])
+            self._end = data.get("end")
+
+    def _write(self) -> None:
+        temporary = self.path.with_name(f"{self.path.name}.tmp")
+        temporary.write_text(
+            json.dumps({"completed": sorted(self._completed), "end": self._end}),
+            encoding="utf-8",
+        )
+        temporary.replace(self.path)
+
+
+def get_backfill_start(devices: Iterable[Device]) -> datetime | None:
+    """Return the first session date of the oldest device, if any."""
+    dates = [
+        device.first_session_date
+        for device in devices
+        if device.first_session_date is not None
+    ]
+    return min(dates, default=None)
+
+
+def plan_windows(
+    start: datetime,
+    end: datetime,
+    window_size: timedelta,
+    data_types: Iterable[BackfillDataType] = tuple(BackfillDataType),
+) -> list[BackfillWindow]:
+    """Split a period into windows per data type, aligned to UTC midnight.
+
+    Windows are aligned so the same period always produces the same windows,
+    which keeps checkpoints valid across runs.
+    """
+    start = datetime.combine(start.astimezone(UTC).date(), datetime.min.time(), UTC)
+    boundaries = []
+    while start < end:
+        boundaries.append((start, min(start + window_size, end)))
+        start += window_size
+    return [
+        BackfillWindow(data_type, window_start, window_end)
+        for data_type in data_types
+        for window_start, window_end in boundaries
+    ]
+
+
+@dataclass(slots=True)
+class BackfillOrchestrator:
+    """Fetch the full history of a user in windows that can be resumed.
+
+    Windows run concurrently, at most max_concurrency at a time, and their
+    requests have the backfill priority when the client has a scheduler.
+    Every page is written to the sink as it arrives and a window is
+    checkpointed once all its pages are written. After a crash, completed
+    windows are skipped and unfinished windows are fetched again, so the sink
+    receives the pages of those windows at least once.
+    """
+
+    client: WithingsClient
+    sink: BackfillSink
+    store: CheckpointStore
+    window_size: timedelta = timedelta(days=90)
+    max_concurrency: int = 4
+    on_progress: Callable[[BackfillProgress], None] | None = None
+
+    async def run(
+        self,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        data_types: Iterable[BackfillDataType] = tuple(BackfillDataType),
+    ) -> int:
+        """Run the backfill and return the amount of models written.
+
+        Without start, the backfill starts at the first session date of the
+        oldest device of the user. Without end, the backfill ends at the time
+        it first ran, which is kept in the store, so resumed runs plan the
+        same windows.
+        """
+        if start is None:
+            start = get_backfill_start(await self.client.get_devices())
+            if start is None:
+                return 0
+        if end is None:
+            end = self.store.load_end()
+        if end is None:
+            end = datetime.now(tz=UTC)
+            self.store.save_end(end)
+        windows = plan_windows(start, end, self.window_size, data_types)
+        completed = self.store.load()
+        pending = [window for window in windows if window.key not in completed]
+        progress = _Progress(len(windows), len(windows) - len(pending))
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        with priority(RequestPriority.BACKFILL):
+            async with asyncio.TaskGroup() as group:
+                for window in pending:
+                    group.create_task(self._run_window(window, semaphore, progress))
+        return progress.models
+
+    async def _run_window(
+        self,
+        window: BackfillWindow,
+        semaphore: asyncio.Semaphore,
+        progress: _Progress,
+    ) -> None:
+        async with semaphore:
+            async for page in self._iter_pages(window):
+                await self.sink.write(window, page)
+                progress.models += len(page)
+                self._report(window, progress, len(page), window_completed=False)
+            self.store.mark_completed(window.key)
+            progress.completed += 1
+            self._report(window, progress, 0, window_completed=True)
+
+    def _report(
+        self,
+        window: BackfillWindow,
+        progress: _Progress,
+        models: int,
+        *,
+        window_completed: bool,
+    ) -> None:
+        if self.on_progress is not None:
+            self.on_progress(
+                BackfillProgress(
+                    window,
+                    models,
+                    window_completed,
+                    progress.completed,
+                    progress.total,
+                )
+            )
+
+    def _iter_pages(self, window: BackfillWindow) -> AsyncIterator[list[Any]]:
+        """Iterate over the pages of a window, as the endpoints expect it.
+
+        Measurements take timestamps, which are inclusive, so the last second
+        is left out. The other endpoints take inclusive days, so the last day
+        is the day before the end, unless the window ends during a day.
+        """
+        if window.data_type is BackfillDataType.MEASUREMENTS:
+            return self.client.iter_measurement_pages(
+                window.start,
+                window.end - timedelta(seconds=1),
+            )
+        first_day = window.start.date()
+        last_day = (window.end - timedelta(microseconds=1)).date()
+        if window.data_type is BackfillDataType.SLEEP_SUMMARIES:
+            return self.client.iter_sleep_summary_pages(first_day, last_day)
+        if window.data_type is BackfillDataType.ACTIVITIES:
+            return self.client.iter_activity_pages(first_day, last_day)
+        return self.client.iter_workout_pages(first_day, last_day)
+
+
+@dataclass(slots=True)
+class _Progress:
+    total: int
+    completed: int
+    models: int = 0
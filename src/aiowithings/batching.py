@@ -0,0 +1,217 @@
+"""Asynchronous Python client for Withings."""
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass, field, replace
+from datetime import datetime
+from enum import StrEnum
+from typing import TYPE_CHECKING
+
+from .deadlines import get_deadline
+from .scheduling import get_priority
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator
+
+    from .models import MeasurementGroup, MeasurementType
+    from .scheduling import RequestPriority
+    from .withings import WithingsClient
+
+
+class _QueryKind(StrEnum):
+    SINCE = "since"
+    PERIOD = "period"
+
+
+type _BatchKey = tuple[_QueryKind, float | None, RequestPriority | None]
+
+
+@dataclass(slots=True)
+class _Query:
+    start: datetime
+    end: datetime | None
+    measurement_types: list[MeasurementType] | None
+    future: asyncio.Future[list[MeasurementGroup]]
+
+
+@dataclass(slots=True)
+class MeasurementBatcher:
+    """Merge measurement queries made at about the same time into one request.
+
+    Queries are held for delay seconds. Queries of the same kind that arrive
+    in that time are sent as one request, with the union of their measurement
+    types and the widest window: the earliest since, or the earliest start
+    and latest end of the periods. The pages of a merged request are followed,
+    so no caller misses groups that did not fit in the first page. Since and
+    period queries select on different dates, so they are never merged with
+    each other. Every caller gets the measurement groups of its own window,
+    with only the measurements of its own types. Only queries with the same
+    deadline and priority are merged, so the request runs with the deadline
+    and priority of each of its queries.
+    """
+
+    client: WithingsClient
+    delay: float = 0.005
+    _batches: dict[_BatchKey, list[_Query]] = field(init=False, default_factory=dict)
+    _tasks: set[asyncio.Task[None]] = field(init=False, default_factory=set)
+
+    async def get_measurement_since(
+        self,
+        measurement_since: datetime,
+        measurement_types: list[MeasurementType] | None = None,
+    ) -> list[MeasurementGroup]:
+        """Get all measurements since measurement_since."""
+        return await self._enqueue(
+            _QueryKind.SINCE, measurement_since, None, measurement_types
+        )
+
+    async def get_measurement_in_period(
+        self,
+        start_date: datetime,
+        end_date: datetime,
+        measurement_types: list[MeasurementType] | None = None,
+    ) -> list[MeasurementGroup]:
+        """Get all measurements measured since start date and until end date."""
+        return await self._enqueue(
+            _QueryKind.PERIOD, start_date, end_date, measurement_types
+        )
+
+    async def _enqueue(
+        self,
+        kind: _QueryKind,
+        start: datetime,
+        end: datetime | None,
+        measurement_types: list[MeasurementType] | None,
+    ) -> list[MeasurementGroup]:
+        """Add a query to the batch of its kind and context, starting it if needed.
+
+        The batch is sent from a task that copies the context of the query
+        that started it, which has the deadline and priority of the batch.
+        """
+        future: asyncio.Future[list[MeasurementGroup]]
+        future = asyncio.get_running_loop().create_future()
+        key = (kind, get_deadline(), get_priority())
+        if (batch := self._batches.get(key)) is None:
+            batch = self._batches[key] = []
+            task = asyncio.create_task(self._flush(key))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        batch.append(_Query(start, end, measurement_types, future))
+        return await future
+
+    async def _flush(self, key: _BatchKey) -> None:
+        """Send the merged request of a batch and split the result.
+
+        Errors, including cancellation of the batch, reach every waiting
+        query. Errors that are not an Exception are raised again.
+        """
+        queries = self._batches[key]
+        try:
+            try:
+                await asyncio.sleep(self.delay)
+            finally:
+                del self._batches[key]
+            start = min(query.start for query in queries)
+            end = max((query.end for query in queries if query.end), default=None)
+            measurement_types = _merge_types(queries)
+            if len(queries) > 1:
+                groups = [
+                    group
+                    async for page in self._iter_pages(start, end, measurement_types)
+                    for group in page
+                ]
+            elif end is None:
+                groups = await self.client.get_measurement_since(
+                    start, measurement_types
+                )
+            else:
+                groups = await self.client.get_measurement_in_period(
+                    start, end, measurement_types
+                )
+        except BaseException as exception:
+            for query in queries:
+                if not query.future.done():
+                    query.future.set_exception(exception)
+            if isinstance(exception, Exception):
+                return
+            raise
+        for query in queries:
+            if not query.future.done():
+                query.future.set_result(
+                    _select(query, groups, start, end, measurement_types)
+                )
+
+    def _iter_pages(
+        self,
+        start: datetime,
+        end: datetime | None,
+        measurement_types: list[MeasurementType] | None,
+    ) -> AsyncIterator[list[MeasurementGroup]]:
+        """Iterate over every page of a merged request.
+
+        The widest window of a batch can hold more groups than fit in one
+        page, so the pages are followed for every caller to get all of its
+        groups.
+        """
+        if end is None:
+            return self.client.iter_measurement_pages(
+                since=start, measurement_types=measurement_types
+            )
+        return self.client.iter_measurement_pages(
+            start, end, measurement_types=measurement_types
+        )
+
+
+def _merge_types(queries: list[_Query]) -> list[MeasurementType] | None:
+    """Return the union of the measurement types, or None if any wants all."""
+    merged: dict[MeasurementType, None] = {}
+    for query in queries:
+        if query.measurement_types is None:
+            return None
+        merged.update(dict.fromkeys(query.measurement_types))
+    return list(merged)
+
+
+def _truncate(moment: datetime) -> datetime:
+    """Return the moment at the whole second the API receives for it."""
+    return datetime.fromtimestamp(int(moment.timestamp()), moment.tzinfo)
+
+
+def _select(
+    query: _Query,
+    groups: list[MeasurementGroup],
+    start: datetime,
+    end: datetime | None,
+    measurement_types: list[MeasurementType] | None,
+) -> list[MeasurementGroup]:
+    """Return the groups of the merged request a query would have received.
+
+    Groups are only filtered on the bounds of the query that are narrower than
+    those of the merged request, so a query that set them gets the response
+    unchanged. The bounds are truncated to whole seconds, as they are when
+    sent to the API.
+    """
+    query_start = _truncate(query.start)
+    if query_start > _truncate(start):
+        if query.end is None:
+            groups = [group for group in groups if group.updated_at >= query_start]
+        else:
+            groups = [group for group in groups if group.taken_at >= query_start]
+    if query.end is not None and end is not None:
+        query_end = _truncate(query.end)
+        if query_end < _truncate(end):
+            groups = [group for group in groups if group.taken_at <= query_end]
+    if query.measurement_types in (None, measurement_types):
+        return groups
+    wanted = set(query.measurement_types or ())
+    selected = []
+    for group in groups:
+        measurements = [
+            measurement
+            for measurement in group.measurements
+            if measurement.measurement_type in wanted
+        ]
+        if measurements:
+            selected.append(replace(group, measurements=measurements))
+    return selected
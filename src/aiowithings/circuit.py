@@ -0,0 +1,129 @@
+"""Asynchronous Python client for Withings."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from enum import StrEnum
+import time
+from typing import TYPE_CHECKING
+
+from .exceptions import WithingsCircuitOpenError
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+
+class CircuitState(StrEnum):
+    """Enum representing the states of a circuit."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+@dataclass(slots=True)
+class CircuitStateChange:
+    """Transition of the circuit of an endpoint."""
+
+    host: str
+    endpoint: str
+    previous: CircuitState
+    state: CircuitState
+    failures: int
+
+
+type CircuitStateListener = Callable[[CircuitStateChange], None]
+
+
+@dataclass(slots=True)
+class _Circuit:
+    state: CircuitState = CircuitState.CLOSED
+    failures: int = 0
+    opened_at: float = 0.0
+    probes: int = 0
+    successful_probes: int = 0
+
+
+@dataclass(slots=True)
+class CircuitBreaker:
+    """Fail fast on endpoints that are failing.
+
+    Every API host and endpoint has its own circuit. A circuit opens after
+    failure_threshold consecutive connection errors or error occurred
+    statuses, and requests fail with WithingsCircuitOpenError while it is
+    open. After reset_timeout seconds up to half_open_probes requests are let
+    through. The circuit closes once all of them succeed and opens again on
+    the first failure. Share one breaker between the clients of all users, so
+    an outage is detected once instead of per user.
+    """
+
+    failure_threshold: int = 5
+    reset_timeout: float = 30.0
+    half_open_probes: int = 1
+    on_state_change: CircuitStateListener | None = None
+    clock: Callable[[], float] = time.monotonic
+    _circuits: dict[tuple[str, str], _Circuit] = field(init=False, default_factory=dict)
+
+    def get_state(self, host: str, endpoint: str) -> CircuitState:
+        """Return the state of the circuit of an endpoint."""
+        if (circuit := self._circuits.get((host, endpoint))) is None:
+            return CircuitState.CLOSED
+        return circuit.state
+
+    def before_request(self, host: str, endpoint: str) -> None:
+        """Raise WithingsCircuitOpenError if a request may not be sent."""
+        circuit = self._circuits.setdefault((host, endpoint), _Circuit())
+        if (
+            circuit.state is CircuitState.OPEN
+            and self.clock() - circuit.opened_at >= self.reset_timeout
+        ):
+            circuit.probes = circuit.successful_probes = 0
+            self._transition(host, endpoint, circuit, CircuitState.HALF_OPEN)
+        if circuit.state is CircuitState.OPEN or (
+            circuit.state is CircuitState.HALF_OPEN
+            and circuit.probes >= self.half_open_probes
+        ):
+            msg = f"Circuit for {endpoint} on {host} is open"
+            raise WithingsCircuitOpenError(msg)
+        if circuit.state is CircuitState.HALF_OPEN:
+            circuit.probes += 1
+
+    def record_success(self, host: str, endpoint: str) -> None:
+        """Record a request that reached the API."""
+        circuit = self._circuits[(host, endpoint)]
+        circuit.failures = 0
+        if circuit.state is CircuitState.HALF_OPEN:
+            circuit.successful_probes += 1
+            if circuit.successful_probes >= self.half_open_probes:
+                self._transition(host, endpoint, circuit, CircuitState.CLOSED)
+
+    def record_failure(self, host: str, endpoint: str) -> None:
+        """Record a request that failed because of the API."""
+        circuit = self._circuits[(host, endpoint)]
+        circuit.failures += 1
+        if circuit.state is CircuitState.HALF_OPEN or (
+            circuit.state is CircuitState.CLOSED
+            and circuit.failures >= self.failure_threshold
+        ):
+            circuit.opened_at = self.clock()
+            self._transition(host, endpoint, circuit, CircuitState.OPEN)
+
+    def release(self, host: str, endpoint: str) -> None:
+        """Record a request that ended without an outcome, like a cancelled one."""
+        circuit = self._circuits[(host, endpoint)]
+        if circuit.state is CircuitState.HALF_OPEN and circuit.probes:
+            circuit.probes -= 1
+
+    def _transition(
+        self,
+        host: str,
+        endpoint: str,
+        circuit: _Circuit,
+        state: CircuitState,
+    ) -> None:
+        change = CircuitStateChange(
+            host, endpoint, circuit.state, state, circuit.failures
+        )
+        circuit.state = state
+        if self.on_state_change is not None:
+            self.on_state_change(change)
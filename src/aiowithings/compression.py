@@ -0,0 +1,53 @@
+"""Asynchronous Python client for Withings."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any
+import zlib
+
+from .exceptions import WithingsError
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+ACCEPT_ENCODING = "gzip, deflate" if brotli is None else "br, gzip, deflate"
+
+
+@dataclass(slots=True)
+class Decompressor:
+    """Incrementally decompress a response body sent with a content encoding.
+
+    Without a maximum length the decompressors return all output at once, so
+    nothing is left to flush at the end of the body.
+    """
+
+    encoding: str
+    _decompressor: Any = None
+
+    def __post_init__(self) -> None:
+        """Create the decompressor of the encoding."""
+        if self.encoding == "gzip":
+            self._decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        elif self.encoding == "deflate":
+            self._decompressor = zlib.decompressobj()
+        elif self.encoding == "br" and brotli is not None:
+            self._decompressor = brotli.Decompressor()
+        elif self.encoding != "identity":
+            msg = f"Unsupported content encoding {self.encoding}"
+            raise WithingsError(msg)
+
+    def decompress(self, chunk: bytes) -> bytes:
+        """Return the decompressed bytes of a chunk of the body."""
+        if self._decompressor is None:
+            return chunk
+        if self.encoding == "br":
+            return bytes(self._decompressor.process(chunk))
+        return bytes(self._decompressor.decompress(chunk))
+
+
+def decompress(data: bytes, encoding: str) -> bytes:
+    """Decompress a complete response body."""
+    return Decompressor(encoding).decompress(data)
@@ -0,0 +1,39 @@
+"""Asynchronous Python client for Withings."""
+
+from __future__ import annotations
+
+import asyncio
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+_deadline: ContextVar[float | None] = ContextVar("aiowithings_deadline", default=None)
+
+
+def get_deadline() -> float | None:
+    """Return the loop time by which the current operation must finish."""
+    return _deadline.get()
+
+
+@contextmanager
+def deadline(timeout: float) -> Iterator[float]:
+    """Limit all requests made within the block to a budget of timeout seconds.
+
+    Every request stops when the budget runs out, including token refresh,
+    reading the body and parsing, and raises WithingsConnectionError. The
+    deadline is kept in a context variable, so it also applies to pages
+    requested by the page iterators and to tasks started within the block,
+    such as a TaskGroup fanning out over users. A nested deadline can only
+    shorten the budget of the block around it.
+    """
+    when = asyncio.get_running_loop().time() + timeout
+    if (current := _deadline.get()) is not None:
+        when = min(when, current)
+    token = _deadline.set(when)
+    try:
+        yield when
+    finally:
+        _deadline.reset(token)
@@ -0,0 +1,134 @@
+"""Asynchronous Python client for Withings."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from enum import StrEnum
+import hashlib
+import json
+import marshal
+from typing import TYPE_CHECKING, Any, Self
+
+from .models import Activity, MeasurementGroup, SleepSummary, Workout
+from .serialization import CODEC_VERSION, INTERPRETER, get_codec
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+
+# Digests are taken over the rows of the codec, so an index is only valid
+# for the codec version it was built with.
+INDEX_VERSION = (2, CODEC_VERSION)
+
+
+class ChangeKind(StrEnum):
+    """Enum representing how a record differs from the records seen before."""
+
+    NEW = "new"
+    UPDATED = "updated"
+    UNCHANGED = "unchanged"
+
+
+type _IndexKey = tuple[int | str, ...]
+
+
+def _fingerprint(record: Any) -> int:
+    """Return a stable digest of the content of a model without a version.
+
+    The row is hashed as JSON, which unlike marshal does not depend on the
+    interpreter version.
+    """
+    row = get_codec(type(record)).encode_row(record)
+    encoded = json.dumps(row, separators=(",", ":")).encode()
+    digest = hashlib.blake2b(encoded, digest_size=8).digest()
+    return int.from_bytes(digest, signed=True)
+
+
+def _measurement_group_key(group: MeasurementGroup) -> tuple[_IndexKey, int]:
+    return (0, group.group_id), int(group.updated_at.timestamp())
+
+
+def _workout_key(workout: Workout) -> tuple[_IndexKey, int]:
+    return (1, workout.workout_id), _fingerprint(workout)
+
+
+def _activity_key(activity: Activity) -> tuple[_IndexKey, int]:
+    key = (2, activity.date.toordinal(), int(activity.origin))
+    return key, int(activity.modified.timestamp())
+
+
+def _sleep_summary_key(summary: SleepSummary) -> tuple[_IndexKey, int]:
+    key = (3, summary.date.toordinal(), summary.hashed_device_id)
+    return key, _fingerprint(summary)
+
+
+_KEYS: dict[type[Any], Callable[[Any], tuple[_IndexKey, int]]] = {
+    MeasurementGroup: _measurement_group_key,
+    Workout: _workout_key,
+    Activity: _activity_key,
+    SleepSummary: _sleep_summary_key,
+}
+
+
+@dataclass(slots=True)
+class ChangeDetector:
+    """Classify fetched records as new, updated or unchanged.
+
+    Records are identified by group id for measurement groups, workout id for
+    workouts, date and origin for activities and date and device for sleep
+    summaries. The index keeps only that identity and a version per record:
+    updated_at for measurement groups, modified for activities and a digest
+    of the content for workouts and sleep summaries, which have no version.
+    A record is updated when its version differs from the one seen before.
+    """
+
+    _versions: dict[_IndexKey, int] = field(init=False, default_factory=dict)
+
+    def __len__(self) -> int:
+        """Return the amount of records in the index."""
+        return len(self._versions)
+
+    def classify(self, record: Any) -> ChangeKind:
+        """Record a fetched record and return how it differs from before."""
+        try:
+            get_key = _KEYS[type(record)]
+        except KeyError:
+            msg = f"Change detection is not supported for {type(record).__name__}"
+            raise TypeError(msg) from None
+        key, version = get_key(record)
+        previous = self._versions.get(key)
+        if previous == version:
+            return ChangeKind.UNCHANGED
+        self._versions[key] = version
+        return ChangeKind.NEW if previous is None else ChangeKind.UPDATED
+
+    def changed[RecordT](self, records: Iterable[RecordT]) -> list[RecordT]:
+        """Record fetched records and return the new and updated ones."""
+        return [
+            record
+            for record in records
+            if self.classify(record) is not ChangeKind.UNCHANGED
+        ]
+
+    def dump(self) -> bytes:
+        """Return the index in a compact binary format."""
+        return marshal.dumps((INDEX_VERSION, INTERPRETER, list(self._versions.items())))
+
+    @classmethod
+    def load(cls, data: bytes) -> Self:
+        """Initialize a detector from a dump.
+
+        The format is based on marshal, so it is only meant for data written
+        by this library, not for data from untrusted sources, and it can only
+        be loaded by the interpreter version that dumped it.
+        """
+        version, *header, items = marshal.loads(data)  # noqa: S302
+        if version != INDEX_VERSION:
+            msg = f"Unsupported index version {version}, expected {INDEX_VERSION}"
+            raise ValueError(msg)
+        (interpreter,) = header
+        if interpreter != INTERPRETER:
+            msg = f"Index was dumped by {interpreter}, not {INTERPRETER}"
+            raise ValueError(msg)
+        detector = cls()
+        detector._versions = dict(items)
+        return detector
@@ -9,6 +9,10 @@ class WithingsConnectionError(WithingsError):
     """Withings connection exception."""
 
 
+class WithingsCircuitOpenError(WithingsConnectionError):
+    """Withings circuit open exception."""
+
+
 class WithingsAuthenticationFailedError(WithingsError):
     """Withings authentication failed exception."""
 
@@ -35,3 +39,7 @@ class WithingsTooManyRequestsError(WithingsError):
 
 class WithingsUnknownStatusError(WithingsError):
     """Withings unknown status exception."""
+
+
+class WithingsUnknownUserError(WithingsError):
+    """Withings unknown user exception."""
@@ -0,0 +1,215 @@
+"""Asynchronous Python client for Withings."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field, fields, is_dataclass
+from datetime import date, datetime
+from enum import Enum
+from operator import attrgetter
+import types
+from typing import TYPE_CHECKING, Any, Self, Union, get_args, get_origin, get_type_hints
+
+_PYARROW_REQUIRED = "Exporting requires pyarrow, install aiowithings[arrow]"
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError as exception:  # pragma: no cover
+    raise ImportError(_PYARROW_REQUIRED) from exception
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterable, Callable, Iterable
+    from pathlib import Path
+    from types import TracebackType
+
+type _Converter = Callable[[Any], Any]
+
+
+def _get_arrow_type(hint: Any) -> tuple[pa.DataType, _Converter | None]:
+    """Return the Arrow type of a type hint and the converter of its values."""
+    origin = get_origin(hint)
+    if origin in (Union, types.UnionType):
+        (inner,) = (arg for arg in get_args(hint) if arg is not types.NoneType)
+        arrow_type, converter = _get_arrow_type(inner)
+        if converter is None:
+            return arrow_type, None
+        return arrow_type, lambda value: None if value is None else converter(value)
+    if origin is list:
+        arrow_type, converter = _get_arrow_type(get_args(hint)[0])
+        if converter is None:
+            return pa.list_(arrow_type), None
+        return pa.list_(arrow_type), lambda values: [converter(v) for v in values]
+    if isinstance(hint, type) and is_dataclass(hint):
+        struct_fields, converters = _get_struct(hint)
+        names = [struct_field.name for struct_field in struct_fields]
+
+        def convert(item: Any) -> dict[str, Any]:
+            return {
+                name: value if converter is None else converter(value)
+                for name, converter, value in zip(
+                    names,
+                    converters,
+                    (getattr(item, name) for name in names),
+                    strict=True,
+                )
+            }
+
+        return pa.struct(struct_fields), convert
+    return _get_scalar_type(hint)
+
+
+def _get_scalar_type(hint: Any) -> tuple[pa.DataType, _Converter | None]:
+    """Return the Arrow type of a plain class."""
+    if isinstance(hint, type):
+        if issubclass(hint, Enum):
+            arrow_type = pa.int64() if issubclass(hint, int) else pa.string()
+            return arrow_type, attrgetter("value")
+        if issubclass(hint, datetime):
+            return pa.timestamp("ms", tz="UTC"), None
+        if issubclass(hint, date):
+            return pa.date32(), None
+        for python_type, arrow_type in (
+            (bool, pa.bool_()),
+            (int, pa.int64()),
+            (float, pa.float64()),
+            (str, pa.string()),
+        ):
+            if issubclass(hint, python_type):
+                return arrow_type, None
+    msg = f"Unsupported type {hint} for Arrow export"
+    raise TypeError(msg)
+
+
+def _get_struct(model: type[Any]) -> tuple[list[pa.Field], list[_Converter | None]]:
+    """Return the Arrow fields of a dataclass and the converters of its values."""
+    hints = get_type_hints(model)
+    arrow_fields: list[pa.Field] = []
+    converters: list[_Converter | None] = []
+    for model_field in fields(model):
+        arrow_type, converter = _get_arrow_type(hints[model_field.name])
+        arrow_fields.append(pa.field(model_field.name, arrow_type))
+        converters.append(converter)
+    return arrow_fields, converters
+
+
+_COLUMNS: dict[type[Any], tuple[pa.Schema, list[_Converter | None]]] = {}
+
+
+def _get_columns(model: type[Any]) -> tuple[pa.Schema, list[_Converter | None]]:
+    """Return the schema of a model and the converters of its columns."""
+    if (columns := _COLUMNS.get(model)) is None:
+        arrow_fields, converters = _get_struct(model)
+        columns = _COLUMNS[model] = (pa.schema(arrow_fields), converters)
+    return columns
+
+
+def get_arrow_schema(model: type[Any]) -> pa.Schema:
+    """Return the Arrow schema derived from the fields of a model.
+
+    Enums are stored by value, datetimes as UTC timestamps in milliseconds,
+    which Parquet supports natively, and nested models as structs.
+    """
+    return _get_columns(model)[0]
+
+
+def to_record_batch[ModelT](model: type[ModelT], items: list[ModelT]) -> pa.RecordBatch:
+    """Convert models to an Arrow record batch, one column per field.
+
+    The columns are cast to the schema with safe casting, so a value that
+    does not fit the type of its field raises instead of being truncated.
+    """
+    schema, converters = _get_columns(model)
+    columns = []
+    for name, converter in zip(schema.names, converters, strict=True):
+        values = [getattr(item, name) for item in items]
+        if converter is not None:
+            values = [converter(value) for value in values]
+        columns.append(values)
+    return pa.RecordBatch.from_arrays(
+        [
+            pa.array(values).cast(arrow_field.type)
+            for values, arrow_field in zip(columns, schema, strict=True)
+        ],
+        schema=schema,
+    )
+
+
+@dataclass(slots=True)
+class ParquetExporter[ModelT]:
+    """Write models to a Parquet file incrementally.
+
+    Models are buffered until row_group_size rows are collected and then
+    written as a row group, so memory stays bounded by the size of a row
+    group regardless of the amount of history exported.
+    """
+
+    where: str | Path
+    model: type[ModelT]
+    row_group_size: int = 10_000
+    compression: str = "zstd"
+    rows_written: int = field(init=False, default=0)
+    _buffer: list[ModelT] = field(init=False, default_factory=list)
+    _writer: pq.ParquetWriter | None = field(init=False, default=None)
+
+    @property
+    def schema(self) -> pa.Schema:
+        """Return the schema of the written file."""
+        return get_arrow_schema(self.model)
+
+    def write(self, items: Iterable[ModelT]) -> None:
+        """Add models to the file, writing full row groups."""
+        self._buffer.extend(items)
+        while len(self._buffer) >= self.row_group_size:
+            rows = self._buffer[: self.row_group_size]
+            del self._buffer[: self.row_group_size]
+            self._write_rows(rows)
+
+    def flush(self) -> None:
+        """Write the buffered models as a row group."""
+        if self._buffer:
+            rows, self._buffer = self._buffer, []
+            self._write_rows(rows)
+
+    def _get_writer(self) -> pq.ParquetWriter:
+        if self._writer is None:
+            self._writer = pq.ParquetWriter(
+                self.where,
+                self.schema,
+                compression=self.compression,
+            )
+        return self._writer
+
+    def _write_rows(self, rows: list[ModelT]) -> None:
+        self._get_writer().write_batch(to_record_batch(self.model, rows))
+        self.rows_written += len(rows)
+
+    async def write_pages(self, pages: AsyncIterable[Iterable[ModelT]]) -> int:
+        """Write every page of a page iterator of the client.
+
+        Returns the total amount of rows written to the file.
+        """
+        async for page in pages:
+            self.write(page)
+        self.flush()
+        return self.rows_written
+
+    def close(self) -> None:
+        """Write the remaining models and close the file.
+
+        A file without any rows still gets the schema of the model.
+        """
+        self.flush()
+        self._get_writer().close()
+
+    def __enter__(self) -> Self:
+        """Enter the exporter."""
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Close the exporter."""
+        self.close()
@@ -2,43 +2,173 @@
 
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+from dataclasses import dataclass, fields
+from datetime import UTC, date, datetime, timedelta
+from enum import StrEnum
+from itertools import groupby
+from operator import attrgetter
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Self
 
 from aiowithings.models import (
+    Device,
     MeasurementAttribution,
     MeasurementPosition,
     MeasurementType,
     SleepSummary,
 )
+from aiowithings.serialization import decode_models, encode_models
 
 if TYPE_CHECKING:
-    from aiowithings import MeasurementGroup
+    from collections.abc import Iterable, Mapping, Sequence
+    from datetime import tzinfo
+
+    from _typeshed import SupportsRichComparison
+
+    from aiowithings import Activity, MeasurementGroup
+
+_IGNORED_ATTRIBUTIONS = (
+    MeasurementAttribution.UNKNOWN,
+    MeasurementAttribution.DEVICE_ENTRY_FOR_USER_AMBIGUOUS,
+)
+_AGGREGATED_POSITIONS = (
+    MeasurementPosition.WHOLE_BODY,
+    MeasurementPosition.BETWEEN_LEGS,
+)
+
+
+class LatestMeasurementAggregator:
+    """Keep the latest measurement per type and position.
+
+    Measurement groups can be added incrementally, for example after every
+    webhook call, without re-sorting the history or mutating the groups.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the aggregator."""
+        self._taken_at: dict[
+            tuple[MeasurementType, MeasurementPosition | None], datetime
+        ] = {}
+        self._values: dict[
+            tuple[MeasurementType, MeasurementPosition | None], float
+        ] = {}
+
+    def add(self, measurement_groups: Iterable[MeasurementGroup]) -> None:
+        """Absorb new measurement groups."""
+        for measurement_group in measurement_groups:
+            if measurement_group.attribution in _IGNORED_ATTRIBUTIONS:
+                continue
+            taken_at = measurement_group.taken_at
+            for data_point in measurement_group.measurements:
+                position = data_point.position
+                if position in _AGGREGATED_POSITIONS:
+                    position = None
+                key = (data_point.measurement_type, position)
+                latest = self._taken_at.get(key)
+                if latest is None or taken_at >= latest:
+                    self._taken_at[key] = taken_at
+                    self._values[key] = data_point.value
+
+    def get(
+        self,
+        measurement_type: MeasurementType,
+        position: MeasurementPosition | None = None,
+    ) -> float | None:
+        """Return the latest value for a measurement type and position."""
+        return self._values.get((measurement_type, position))
+
+    @property
+    def latest(
+        self,
+    ) -> Mapping[tuple[MeasurementType, MeasurementPosition | None], float]:
+        """Return a read-only view of the latest values."""
+        return MappingProxyType(self._values)
 
 
 def aggregate_measurements(
     measurements: list[MeasurementGroup],
 ) -> dict[tuple[MeasurementType, MeasurementPosition | None], float]:
     """Aggregate the measurements to return a list of the latest measurements."""
-    result: dict[tuple[MeasurementType, MeasurementPosition | None], float] = {}
+    aggregator = LatestMeasurementAggregator()
+    aggregator.add(measurements)
+    return dict(aggregator.latest)
+
+
+@dataclass(slots=True)
+class DeviceChanges:
+    """Differences between the last known and the current devices of a user."""
+
+    added: list[Device]
+    removed: list[Device]
+    battery_changed: list[Device]
+    session_advanced: list[Device]
+
+    def __bool__(self) -> bool:
+        """Return whether any device changed."""
+        return bool(
+            self.added or self.removed or self.battery_changed or self.session_advanced
+        )
+
+
+class DeviceTracker:
+    """Keep the last known state of devices and report what changed.
 
-    groups = sorted(measurements, key=lambda group: group.taken_at)
+    Devices are keyed on their hashed device id. A device that did not change
+    keeps its previous instance, so consumers can skip it by identity. The
+    state can be dumped to and loaded from the compact serialization, to keep
+    it next to other cached responses.
+    """
 
-    for measurement in groups:
-        if measurement.attribution not in (
-            MeasurementAttribution.UNKNOWN,
-            MeasurementAttribution.DEVICE_ENTRY_FOR_USER_AMBIGUOUS,
-        ):
-            for data_point in measurement.measurements:
-                if data_point.position in (
-                    MeasurementPosition.WHOLE_BODY,
-                    MeasurementPosition.BETWEEN_LEGS,
-                ):
-                    data_point.position = None
-                result[(data_point.measurement_type, data_point.position)] = (
-                    data_point.value
-                )
+    def __init__(self, devices: Iterable[Device] = ()) -> None:
+        """Initialize the tracker with the last known devices."""
+        self._devices = {device.hashed_device_id: device for device in devices}
 
-    return result
+    def update(self, devices: Iterable[Device]) -> DeviceChanges:
+        """Absorb the current devices and return how they differ."""
+        changes = DeviceChanges([], [], [], [])
+        current: dict[str, Device] = {}
+        for device in devices:
+            key = device.hashed_device_id
+            previous = self._devices.get(key)
+            if previous == device:
+                current[key] = previous
+                continue
+            if previous is None:
+                changes.added.append(device)
+            else:
+                if previous.battery != device.battery:
+                    changes.battery_changed.append(device)
+                if _session_advanced(previous, device):
+                    changes.session_advanced.append(device)
+            current[key] = device
+        changes.removed.extend(
+            device for key, device in self._devices.items() if key not in current
+        )
+        self._devices = current
+        return changes
+
+    @property
+    def devices(self) -> Mapping[str, Device]:
+        """Return a read-only view of the last known devices by hashed id."""
+        return MappingProxyType(self._devices)
+
+    def dump(self) -> bytes:
+        """Return the last known devices in the compact serialization."""
+        return encode_models(Device, self._devices.values())
+
+    @classmethod
+    def load(cls, data: bytes) -> Self:
+        """Initialize a tracker from a dump."""
+        return cls(decode_models(Device, data))
+
+
+def _session_advanced(previous: Device, device: Device) -> bool:
+    if device.last_session_date is None:
+        return False
+    return (
+        previous.last_session_date is None
+        or device.last_session_date > previous.last_session_date
+    )
 
 
 def aggregate_sleep_summary(
@@ -184,3 +314,250 @@ def aggregate_sleep_summary(
         total_time_in_bed=None,
         withings_index=None,
     )
+
+
+class AggregationPeriod(StrEnum):
+    """Enum representing the calendar periods to aggregate over."""
+
+    DAY = "day"
+    WEEK = "week"
+    MONTH = "month"
+
+
+def get_period_start(day: date, period: AggregationPeriod) -> date:
+    """Return the first day of the period the day falls in.
+
+    Weeks start on Monday.
+    """
+    if period is AggregationPeriod.WEEK:
+        return day - timedelta(days=day.weekday())
+    if period is AggregationPeriod.MONTH:
+        return day.replace(day=1)
+    return day
+
+
+@dataclass(slots=True)
+class FieldStatistics:
+    """Columnar statistics of a single field, one entry per period."""
+
+    count: list[int]
+    total: list[float]
+    mean: list[float | None]
+    minimum: list[float | None]
+    maximum: list[float | None]
+
+
+@dataclass(slots=True)
+class SleepSummaryRollup:
+    """Columnar sleep summary statistics, one row per period and device."""
+
+    period_start: list[date]
+    hashed_device_id: list[str | None]
+    night_count: list[int]
+    fields: dict[str, FieldStatistics]
+
+
+SLEEP_SUMMARY_ROLLUP_FIELDS = tuple(
+    field.name
+    for field in fields(SleepSummary)
+    if field.name not in {"start_date", "end_date", "date", "hashed_device_id"}
+)
+
+
+def _group_rows[KeyT: SupportsRichComparison](
+    keys: list[KeyT],
+) -> list[tuple[KeyT, list[int]]]:
+    """Return every distinct key in order with the rows that have it.
+
+    The rows are sorted on their key once, after which every group is a run
+    of the sorted rows, like a group by on a columnar frame. Rows keep their
+    input order within a group.
+    """
+    order = sorted(range(len(keys)), key=keys.__getitem__)
+    return [(key, list(rows)) for key, rows in groupby(order, keys.__getitem__)]
+
+
+@dataclass(slots=True)
+class _RollupGroup:
+    """Values of every rollup field of one period and device."""
+
+    night_count: int
+    values: list[list[float]]
+
+    @classmethod
+    def create(cls) -> Self:
+        """Initialize without any nights."""
+        return cls(0, [[] for _ in SLEEP_SUMMARY_ROLLUP_FIELDS])
+
+    def add(self, values: Sequence[float | None]) -> None:
+        """Add the field values of a night, skipping missing values."""
+        self.night_count += 1
+        for column, value in zip(self.values, values, strict=True):
+            if value is not None:
+                column.append(value)
+
+
+def _get_field_statistics(columns: list[list[float]]) -> FieldStatistics:
+    """Return the statistics of the values of a field, one entry per group."""
+    totals = [sum(column) for column in columns]
+    return FieldStatistics(
+        count=[len(column) for column in columns],
+        total=totals,
+        mean=[
+            total / len(column) if column else None
+            for total, column in zip(totals, columns, strict=True)
+        ],
+        minimum=[min(column, default=None) for column in columns],
+        maximum=[max(column, default=None) for column in columns],
+    )
+
+
+def rollup_sleep_summaries(
+    sleep_summaries: Iterable[SleepSummary],
+    period: AggregationPeriod,
+    *,
+    by_device: bool = False,
+) -> SleepSummaryRollup:
+    """Roll up sleep summaries per calendar period.
+
+    The summaries are consumed in a single pass that collects the values of
+    every field per period and device, so the input can be a generator over a
+    large history. The statistics are then reduced with the builtins, whose
+    sum keeps float totals free of rounding noise.
+    """
+    get_values = attrgetter(*SLEEP_SUMMARY_ROLLUP_FIELDS)
+    groups: dict[tuple[date, str | None], _RollupGroup] = {}
+    for summary in sleep_summaries:
+        key = (
+            get_period_start(summary.date, period),
+            summary.hashed_device_id if by_device else None,
+        )
+        if (group := groups.get(key)) is None:
+            group = groups[key] = _RollupGroup.create()
+        group.add(get_values(summary))
+    keys = sorted(groups, key=lambda key: (key[0], key[1] or ""))
+    rows = [groups[key] for key in keys]
+    return SleepSummaryRollup(
+        period_start=[start for start, _ in keys],
+        hashed_device_id=[device for _, device in keys],
+        night_count=[row.night_count for row in rows],
+        fields={
+            name: _get_field_statistics([row.values[index] for row in rows])
+            for index, name in enumerate(SLEEP_SUMMARY_ROLLUP_FIELDS)
+        },
+    )
+
+
+@dataclass(slots=True)
+class ResampledSeries:
+    """Columnar resampled values, one entry per period."""
+
+    period_start: list[date]
+    count: list[int]
+    mean: list[float]
+    last: list[float]
+    minimum: list[float]
+    maximum: list[float]
+
+
+def resample[TimestampT: (datetime, date)](
+    timestamps: Iterable[TimestampT],
+    values: Iterable[float],
+    period: AggregationPeriod,
+    *,
+    time_zone: tzinfo = UTC,
+) -> ResampledSeries:
+    """Resample a series of timestamps and values per calendar period.
+
+    Datetimes are converted to time_zone before determining the day they
+    belong to, dates are used as is. The last value of a period is the one
+    with the latest timestamp, or the latest given of those.
+    """
+    rows = list(zip(timestamps, values, strict=True))
+    groups = _group_rows(
+        [
+            get_period_start(_get_day(timestamp, time_zone), period)
+            for timestamp, _ in rows
+        ]
+    )
+    series = ResampledSeries(
+        period_start=[], count=[], mean=[], last=[], minimum=[], maximum=[]
+    )
+    for period_start, group in groups:
+        group_values = [rows[row][1] for row in group]
+        series.period_start.append(period_start)
+        series.count.append(len(group_values))
+        series.mean.append(sum(group_values) / len(group_values))
+        series.last.append(rows[_get_latest_row(rows, group)][1])
+        series.minimum.append(min(group_values))
+        series.maximum.append(max(group_values))
+    return series
+
+
+def _get_day(timestamp: datetime | date, time_zone: tzinfo) -> date:
+    """Return the day of a timestamp in a time zone, or the date itself."""
+    if isinstance(timestamp, datetime):
+        return timestamp.astimezone(time_zone).date()
+    return timestamp
+
+
+def _get_latest_row[TimestampT: (datetime, date)](
+    rows: list[tuple[TimestampT, float]],
+    group: list[int],
+) -> int:
+    """Return the row of a group with the latest timestamp, the last on ties."""
+    latest = group[0]
+    for row in group:
+        if rows[row][0] >= rows[latest][0]:
+            latest = row
+    return latest
+
+
+def resample_measurements(
+    measurement_groups: Iterable[MeasurementGroup],
+    measurement_type: MeasurementType,
+    period: AggregationPeriod,
+    *,
+    position: MeasurementPosition | None = None,
+    time_zone: tzinfo = UTC,
+) -> ResampledSeries:
+    """Resample the values of a measurement type per calendar period.
+
+    The same attribution and position rules as aggregate_measurements apply.
+    """
+    timestamps: list[datetime] = []
+    values: list[float] = []
+    for measurement_group in measurement_groups:
+        if measurement_group.attribution in _IGNORED_ATTRIBUTIONS:
+            continue
+        for data_point in measurement_group.measurements:
+            data_point_position = data_point.position
+            if data_point_position in _AGGREGATED_POSITIONS:
+                data_point_position = None
+            if (
+                data_point.measurement_type is measurement_type
+                and data_point_position is position
+            ):
+                timestamps.append(measurement_group.taken_at)
+                values.append(data_point.value)
+    return resample(timestamps, values, period, time_zone=time_zone)
+
+
+def resample_activities(
+    activities: Iterable[Activity],
+    field_name: str,
+    period: AggregationPeriod,
+) -> ResampledSeries:
+    """Resample an activity field, like steps, per calendar period.
+
+    Activities are reported per local day, so no time zone is needed.
+    """
+    get_value = attrgetter(field_name)
+    dates: list[date] = []
+    values: list[float] = []
+    for activity in activities:
+        value = get_value(activity)
+        if value is not None:
+            dates.append(activity.date)
+            values.append(value)
+    return resample(dates, values, period)
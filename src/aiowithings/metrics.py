@@ -0,0 +1,275 @@
+"""Asynchronous Python client for Withings."""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections import defaultdict
+from dataclasses import dataclass, field
+from enum import StrEnum
+from typing import Any
+
+from .const import (
+    STATUS_AUTH_FAILED,
+    STATUS_BAD_STATE,
+    STATUS_ERROR_OCCURRED,
+    STATUS_INVALID_PARAMS,
+    STATUS_SUCCESS,
+    STATUS_TIMEOUT,
+    STATUS_TOO_MANY_REQUESTS,
+    STATUS_UNAUTHORIZED,
+)
+from .tracing import TraceEvent, TraceEventType
+
+DEFAULT_LATENCY_BUCKETS: tuple[float, ...] = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+
+class StatusCategory(StrEnum):
+    """Enum representing the status sets of the API."""
+
+    SUCCESS = "success"
+    AUTH_FAILED = "auth_failed"
+    INVALID_PARAMS = "invalid_params"
+    UNAUTHORIZED = "unauthorized"
+    ERROR_OCCURRED = "error_occurred"
+    TIMEOUT = "timeout"
+    BAD_STATE = "bad_state"
+    TOO_MANY_REQUESTS = "too_many_requests"
+    UNKNOWN = "unknown"
+
+
+_STATUS_SETS: tuple[tuple[set[int], StatusCategory], ...] = (
+    (STATUS_SUCCESS, StatusCategory.SUCCESS),
+    (STATUS_AUTH_FAILED, StatusCategory.AUTH_FAILED),
+    (STATUS_INVALID_PARAMS, StatusCategory.INVALID_PARAMS),
+    (STATUS_UNAUTHORIZED, StatusCategory.UNAUTHORIZED),
+    (STATUS_ERROR_OCCURRED, StatusCategory.ERROR_OCCURRED),
+    (STATUS_TIMEOUT, StatusCategory.TIMEOUT),
+    (STATUS_BAD_STATE, StatusCategory.BAD_STATE),
+    (STATUS_TOO_MANY_REQUESTS, StatusCategory.TOO_MANY_REQUESTS),
+)
+
+
+def get_status_category(status: int | None) -> StatusCategory:
+    """Return the status set a response status belongs to."""
+    for statuses, category in _STATUS_SETS:
+        if status in statuses:
+            return category
+    return StatusCategory.UNKNOWN
+
+
+@dataclass(slots=True)
+class LatencyHistogram:
+    """Histogram of request latencies in seconds."""
+
+    buckets: tuple[float, ...] = DEFAULT_LATENCY_BUCKETS
+    counts: list[int] = field(init=False)
+    count: int = 0
+    total: float = 0.0
+
+    def __post_init__(self) -> None:
+        """Initialize a counter per bucket plus one for +Inf."""
+        self.counts = [0] * (len(self.buckets) + 1)
+
+    def observe(self, value: float) -> None:
+        """Add a latency to the histogram."""
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+
+    def cumulative_counts(self) -> list[int]:
+        """Return the amount of observations less than or equal to each bucket."""
+        cumulative = []
+        running = 0
+        for bucket_count in self.counts:
+            running += bucket_count
+            cumulative.append(running)
+        return cumulative
+
+
+@dataclass(slots=True)
+class MetricsCollector:
+    """Collect request metrics from the trace events of a client.
+
+    Register an instance as tracer on the client. Latency is measured from the
+    start of the request until it completed, including parsing the models, or
+    failed. Every request that did not complete counts as a failure, whether
+    the API returned an error status or it failed before that. Response
+    bytes are counted after decompression and transferred bytes as sent over
+    the wire, so the two show the savings of compression.
+    """
+
+    latency_buckets: tuple[float, ...] = DEFAULT_LATENCY_BUCKETS
+    latencies: dict[tuple[str, str | None], LatencyHistogram] = field(
+        init=False, default_factory=dict
+    )
+    statuses: defaultdict[tuple[str, StatusCategory], int] = field(
+        init=False, default_factory=lambda: defaultdict(int)
+    )
+    failures: defaultdict[str, int] = field(
+        init=False, default_factory=lambda: defaultdict(int)
+    )
+    retries: defaultdict[str, int] = field(
+        init=False, default_factory=lambda: defaultdict(int)
+    )
+    cache_hits: defaultdict[str, int] = field(
+        init=False, default_factory=lambda: defaultdict(int)
+    )
+    response_bytes: defaultdict[str, int] = field(
+        init=False, default_factory=lambda: defaultdict(int)
+    )
+    transferred_bytes: defaultdict[str, int] = field(
+        init=False, default_factory=lambda: defaultdict(int)
+    )
+
+    def __call__(self, event: TraceEvent) -> None:
+        """Record a trace event."""
+        if event.event_type is TraceEventType.BODY_READ:
+            self.transferred_bytes[event.endpoint] += event.response_bytes or 0
+        elif event.event_type is TraceEventType.BODY_DECODED:
+            self.response_bytes[event.endpoint] += event.response_bytes or 0
+        elif event.event_type is TraceEventType.STATUS_DISPATCHED:
+            category = get_status_category(event.status)
+            self.statuses[(event.endpoint, category)] += 1
+        elif event.event_type is TraceEventType.REQUEST_COMPLETED:
+            self._observe_latency(event)
+        elif event.event_type is TraceEventType.REQUEST_FAILED:
+            self.failures[event.endpoint] += 1
+            self._observe_latency(event)
+
+    def _observe_latency(self, event: TraceEvent) -> None:
+        key = (event.endpoint, event.action)
+        if (histogram := self.latencies.get(key)) is None:
+            histogram = self.latencies[key] = LatencyHistogram(self.latency_buckets)
+        histogram.observe(event.elapsed)
+
+    def record_retry(self, endpoint: str) -> None:
+        """Record a retried request."""
+        self.retries[endpoint] += 1
+
+    def record_cache_hit(self, endpoint: str) -> None:
+        """Record a request that was answered from a cache."""
+        self.cache_hits[endpoint] += 1
+
+    def reset(self) -> None:
+        """Clear all collected metrics."""
+        self.latencies.clear()
+        self.statuses.clear()
+        self.failures.clear()
+        self.retries.clear()
+        self.cache_hits.clear()
+        self.response_bytes.clear()
+        self.transferred_bytes.clear()
+
+    def snapshot(self) -> dict[str, Any]:
+        """Return the collected metrics as plain data."""
+        return {
+            "latency": [
+                {
+                    "endpoint": endpoint,
+                    "action": action,
+                    "count": histogram.count,
+                    "sum": histogram.total,
+                    "buckets": dict(
+                        zip(
+                            (*histogram.buckets, float("inf")),
+                            histogram.cumulative_counts(),
+                            strict=True,
+                        )
+                    ),
+                }
+                for (endpoint, action), histogram in sorted(
+                    self.latencies.items(), key=lambda item: _sort_key(item[0])
+                )
+            ],
+            "statuses": [
+                {"endpoint": endpoint, "category": str(category), "count": count}
+                for (endpoint, category), count in sorted(self.statuses.items())
+            ],
+            "failures": dict(sorted(self.failures.items())),
+            "retries": dict(sorted(self.retries.items())),
+            "cache_hits": dict(sorted(self.cache_hits.items())),
+            "response_bytes": dict(sorted(self.response_bytes.items())),
+            "transferred_bytes": dict(sorted(self.transferred_bytes.items())),
+        }
+
+    def to_prometheus(self, prefix: str = "withings") -> str:
+        """Return the collected metrics in the Prometheus text format."""
+        lines: list[str] = []
+        name = f"{prefix}_request_duration_seconds"
+        lines.append(f"# HELP {name} Latency of Withings API requests.")
+        lines.append(f"# TYPE {name} histogram")
+        for (endpoint, action), histogram in sorted(
+            self.latencies.items(), key=lambda item: _sort_key(item[0])
+        ):
+            labels = _format_labels(endpoint=endpoint, action=action or "")
+            for bucket, count in zip(
+                (*histogram.buckets, float("inf")),
+                histogram.cumulative_counts(),
+                strict=True,
+            ):
+                bucket_labels = _format_labels(
+                    endpoint=endpoint,
+                    action=action or "",
+                    le=_format_value(bucket),
+                )
+                lines.append(f"{name}_bucket{bucket_labels} {count}")
+            lines.append(f"{name}_sum{labels} {_format_value(histogram.total)}")
+            lines.append(f"{name}_count{labels} {histogram.count}")
+        name = f"{prefix}_responses_total"
+        lines.append(f"# HELP {name} Withings API responses by status set.")
+        lines.append(f"# TYPE {name} counter")
+        for (endpoint, category), count in sorted(self.statuses.items()):
+            labels = _format_labels(endpoint=endpoint, category=category)
+            lines.append(f"{name}{labels} {count}")
+        for metric, help_text, values in (
+            ("request_failures_total", "Failed requests.", self.failures),
+            ("request_retries_total", "Retried requests.", self.retries),
+            ("cache_hits_total", "Requests answered from a cache.", self.cache_hits),
+            ("response_bytes_total", "Bytes received.", self.response_bytes),
+            (
+                "transferred_bytes_total",
+                "Bytes transferred before decompression.",
+                self.transferred_bytes,
+            ),
+        ):
+            name = f"{prefix}_{metric}"
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} counter")
+            lines.extend(
+                f"{name}{_format_labels(endpoint=endpoint)} {count}"
+                for endpoint, count in sorted(values.items())
+            )
+        return "\n".join(lines) + "\n"
+
+
+def _sort_key(key: tuple[str, str | None]) -> tuple[str, str]:
+    return key[0], key[1] or ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+
+def _format_labels(**labels: str) -> str:
+    formatted = ",".join(
+        f'{key}="{_escape_label(value)}"' for key, value in labels.items()
+    )
+    return f"{{{formatted}}}"
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
@@ -617,7 +617,7 @@ class SleepSummary:
     average_respiration_rate: int | None
     min_respiration_rate: int | None
     max_respiration_rate: int | None
-    sleep_efficiency: int | None
+    sleep_efficiency: float | None
     sleep_latency: int | None
     sleep_score: int | None
     snoring: int | None
@@ -0,0 +1,334 @@
+"""Asynchronous Python client for Withings."""
+
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+import asyncio
+from contextlib import suppress
+from dataclasses import asdict, dataclass, field
+import heapq
+import json
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Self
+
+from aiohttp import ClientError, ClientSession
+from aiohttp.hdrs import METH_POST
+
+from .const import TOKEN_URL
+from .exceptions import (
+    WithingsAuthenticationFailedError,
+    WithingsConnectionError,
+    WithingsInvalidParamsError,
+    WithingsUnauthorizedError,
+    WithingsUnknownUserError,
+)
+from .parsing import raise_for_status
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable
+    from pathlib import Path
+
+_PERMANENT_ERRORS = (
+    WithingsAuthenticationFailedError,
+    WithingsInvalidParamsError,
+    WithingsUnauthorizedError,
+)
+
+
+@dataclass(slots=True)
+class OAuthToken:
+    """Tokens of a user, with the time the access token expires."""
+
+    user_id: str
+    access_token: str
+    refresh_token: str
+    expires_at: float
+    scope: str
+
+    @classmethod
+    def from_api(cls, data: dict[str, Any], issued_at: float) -> Self:
+        """Initialize from the API, given the time the token was issued."""
+        return cls(
+            user_id=str(data["userid"]),
+            access_token=data["access_token"],
+            refresh_token=data["refresh_token"],
+            expires_at=issued_at + data["expires_in"],
+            scope=data["scope"],
+        )
+
+
+class TokenStore(ABC):
+    """Storage of the tokens of all users."""
+
+    @abstractmethod
+    async def load_all(self) -> list[OAuthToken]:
+        """Return the stored tokens."""
+
+    @abstractmethod
+    async def save(self, token: OAuthToken) -> None:
+        """Store the tokens of a user, replacing the previous ones."""
+
+
+@dataclass(slots=True)
+class JsonTokenStore(TokenStore):
+    """Token store in a local JSON file.
+
+    The file is read and written in a worker thread, so the event loop is
+    not blocked. It is replaced atomically on every update, so a crash never
+    loses a rotated refresh token that was stored before. Writes are applied
+    in the order of the saves, and a write is skipped if a later save was
+    already written, as that contains the tokens of every user.
+    """
+
+    path: Path
+    _tokens: dict[str, OAuthToken] = field(init=False, default_factory=dict)
+    _lock: threading.Lock = field(init=False, default_factory=threading.Lock)
+    _version: int = field(init=False, default=0)
+    _written: int = field(init=False, default=0)
+
+    async def load_all(self) -> list[OAuthToken]:
+        """Return the stored tokens."""
+        if (tokens := await asyncio.to_thread(self._read)) is not None:
+            self._tokens = {token.user_id: token for token in tokens}
+        return list(self._tokens.values())
+
+    async def save(self, token: OAuthToken) -> None:
+        """Store the tokens of a user, replacing the previous ones."""
+        self._tokens[token.user_id] = token
+        self._version += 1
+        document = {"tokens": [asdict(token) for token in self._tokens.values()]}
+        await asyncio.to_thread(self._write, self._version, document)
+
+    def _read(self) -> list[OAuthToken] | None:
+        if not self.path.exists():
+            return None
+        data = json.loads(self.path.read_text(encoding="utf-8"))
+        return [OAuthToken(**token) for token in data["tokens"]]
+
+    def _write(self, version: int, document: dict[str, Any]) -> None:
+        with self._lock:
+            if version <= self._written:
+                return
+            temporary = self.path.with_name(f"{self.path.name}.tmp")
+            temporary.write_text(json.dumps(document), encoding="utf-8")
+            temporary.replace(self.path)
+            self._written = version
+
+
+@dataclass(slots=True)
+class TokenManager:
+    """Exchange authorization codes and keep the tokens of users fresh.
+
+    Tokens are refreshed in the background refresh_margin seconds before they
+    expire, in order of expiry, so requests only read the current access
+    token. Pass token_function(user_id) as refresh_token_function of the
+    client of a user. Withings rotates refresh tokens, so every new token is
+    saved to the store before it is used. Failed refreshes are retried after
+    retry_interval seconds, unless the API rejected the refresh token. Errors
+    of background refreshes are passed to on_refresh_error, if set.
+    """
+
+    client_id: str
+    client_secret: str
+    redirect_uri: str | None = None
+    store: TokenStore | None = None
+    session: ClientSession | None = None
+    refresh_margin: float = 600.0
+    retry_interval: float = 60.0
+    max_concurrent_refreshes: int = 8
+    request_timeout: int = 10
+    token_url: str = TOKEN_URL
+    on_refresh_error: Callable[[str, Exception], None] | None = None
+    clock: Callable[[], float] = time.time
+    _close_session: bool = False
+    _tokens: dict[str, OAuthToken] = field(init=False, default_factory=dict)
+    _locks: dict[str, asyncio.Lock] = field(init=False, default_factory=dict)
+    _queue: list[tuple[float, str]] = field(init=False, default_factory=list)
+    _due: dict[str, float] = field(init=False, default_factory=dict)
+    _wakeup: asyncio.Event = field(init=False, default_factory=asyncio.Event)
+    _task: asyncio.Task[None] | None = field(init=False, default=None)
+
+    async def load(self) -> None:
+        """Load the tokens of the store and schedule their refreshes."""
+        if self.store is not None:
+            for token in await self.store.load_all():
+                self._set_token(token)
+
+    def get_token(self, user_id: str) -> OAuthToken | None:
+        """Return the current tokens of a user, if known."""
+        return self._tokens.get(user_id)
+
+    async def exchange_code(self, code: str) -> OAuthToken:
+        """Exchange an authorization code for the tokens of a user."""
+        data = {"grant_type": "authorization_code", "code": code}
+        if self.redirect_uri is not None:
+            data["redirect_uri"] = self.redirect_uri
+        token = await self._request_token(data)
+        await self._save(token)
+        return token
+
+    async def refresh(self, user_id: str) -> OAuthToken:
+        """Refresh the tokens of a user now.
+
+        Concurrent refreshes of a user share one request, as the refresh token
+        can only be used once.
+        """
+        token = self._get_known_token(user_id)
+        async with self._locks.setdefault(user_id, asyncio.Lock()):
+            if (current := self._tokens[user_id]) is not token:
+                return current
+            refreshed = await self._request_token(
+                {"grant_type": "refresh_token", "refresh_token": token.refresh_token}
+            )
+            await self._save(refreshed)
+        return refreshed
+
+    async def get_access_token(self, user_id: str) -> str:
+        """Return the access token of a user.
+
+        The token is only refreshed here if the background refresh did not
+        run in time, like when the manager is not started.
+        """
+        token = self._get_known_token(user_id)
+        if token.expires_at <= self.clock():
+            token = await self.refresh(user_id)
+        return token.access_token
+
+    def _get_known_token(self, user_id: str) -> OAuthToken:
+        """Return the current tokens of a user, raising if the user is unknown."""
+        try:
+            return self._tokens[user_id]
+        except KeyError:
+            msg = f"No tokens are known for user {user_id}"
+            raise WithingsUnknownUserError(msg) from None
+
+    def token_function(self, user_id: str) -> Callable[[], Awaitable[str]]:
+        """Return a refresh token function for the client of a user."""
+
+        async def get_access_token() -> str:
+            return await self.get_access_token(user_id)
+
+        return get_access_token
+
+    def start(self) -> None:
+        """Start refreshing tokens in the background."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop refreshing tokens in the background."""
+        if (task := self._task) is None:
+            return
+        self._task = None
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+
+    async def _run(self) -> None:
+        """Refresh the tokens that are due, sleeping until the next one is."""
+        semaphore = asyncio.Semaphore(self.max_concurrent_refreshes)
+        async with asyncio.TaskGroup() as group:
+            while True:
+                self._wakeup.clear()
+                while self._queue and self._queue[0][0] <= self.clock():
+                    when, user_id = heapq.heappop(self._queue)
+                    if self._due.get(user_id) != when:
+                        continue
+                    del self._due[user_id]
+                    group.create_task(self._refresh_in_background(user_id, semaphore))
+                timeout = None
+                if self._queue:
+                    timeout = self._queue[0][0] - self.clock()
+                try:
+                    async with asyncio.timeout(timeout):
+                        await self._wakeup.wait()
+                except TimeoutError:
+                    pass
+
+    async def _refresh_in_background(
+        self,
+        user_id: str,
+        semaphore: asyncio.Semaphore,
+    ) -> None:
+        async with semaphore:
+            try:
+                await self.refresh(user_id)
+            # A failed refresh must not stop the refreshes of the other users.
+            # pylint: disable-next=broad-exception-caught
+            except Exception as exception:  # noqa: BLE001
+                if self.on_refresh_error is not None:
+                    self.on_refresh_error(user_id, exception)
+                if not isinstance(exception, _PERMANENT_ERRORS):
+                    self._schedule(self.clock() + self.retry_interval, user_id)
+
+    async def _save(self, token: OAuthToken) -> None:
+        if self.store is not None:
+            await self.store.save(token)
+        self._set_token(token)
+
+    def _set_token(self, token: OAuthToken) -> None:
+        self._tokens[token.user_id] = token
+        self._schedule(token.expires_at - self.refresh_margin, token.user_id)
+
+    def _schedule(self, when: float, user_id: str) -> None:
+        """Queue a refresh, replacing the queued refresh of the user if any.
+
+        Replaced refreshes stay in the queue and are skipped once they are due.
+        """
+        self._due[user_id] = when
+        if not self._queue or when < self._queue[0][0]:
+            self._wakeup.set()
+        heapq.heappush(self._queue, (when, user_id))
+
+    async def _request_token(self, data: dict[str, str]) -> OAuthToken:
+        """Request tokens from the OAuth endpoint."""
+        if self.session is None:
+            self.session = ClientSession()
+            self._close_session = True
+        issued_at = self.clock()
+        try:
+            async with (
+                asyncio.timeout(self.request_timeout),
+                self.session.request(
+                    METH_POST,
+                    self.token_url,
+                    data={
+                        "action": "requesttoken",
+                        "client_id": self.client_id,
+                        "client_secret": self.client_secret,
+                        **data,
+                    },
+                ) as response,
+            ):
+                body = await response.json(content_type=None)
+        except TimeoutError as exception:
+            msg = "Timeout occurred while connecting to Withings"
+            raise WithingsConnectionError(msg) from exception
+        except (ClientError, ValueError) as exception:
+            msg = "Error occurred while communicating with Withings"
+            raise WithingsConnectionError(msg) from exception
+        if not isinstance(body, dict):
+            msg = "Unexpected response from Withings"
+            raise WithingsConnectionError(msg)
+        raise_for_status(body.get("status"), body.get("error"))
+        if not isinstance(body.get("body"), dict):
+            msg = "Unexpected response from Withings"
+            raise WithingsConnectionError(msg)
+        return OAuthToken.from_api(body["body"], issued_at)
+
+    async def close(self) -> None:
+        """Stop refreshing and close the open client session."""
+        await self.stop()
+        if self.session and self._close_session:
+            await self.session.close()
+
+    async def __aenter__(self) -> Self:
+        """Load the stored tokens and start refreshing them."""
+        await self.load()
+        self.start()
+        return self
+
+    async def __aexit__(self, *_exc_info: object) -> None:
+        """Stop refreshing and close the open client session."""
+        await self.close()
@@ -0,0 +1,119 @@
+"""Asynchronous Python client for Withings."""
+
+from __future__ import annotations
+
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+import json
+import sys
+from typing import Any, Protocol, Self, cast
+
+from aiowithings.const import (
+    STATUS_AUTH_FAILED,
+    STATUS_BAD_STATE,
+    STATUS_ERROR_OCCURRED,
+    STATUS_INVALID_PARAMS,
+    STATUS_SUCCESS,
+    STATUS_TIMEOUT,
+    STATUS_TOO_MANY_REQUESTS,
+    STATUS_UNAUTHORIZED,
+)
+from aiowithings.exceptions import (
+    WithingsAuthenticationFailedError,
+    WithingsBadStateError,
+    WithingsConnectionError,
+    WithingsErrorOccurredError,
+    WithingsInvalidParamsError,
+    WithingsTooManyRequestsError,
+    WithingsUnauthorizedError,
+    WithingsUnknownStatusError,
+)
+from aiowithings.serialization import decode_models, encode_models
+
+
+# pylint: disable-next=too-few-public-methods
+class ApiModel(Protocol):
+    """Protocol for models that can be created from an API response."""
+
+    @classmethod
+    def from_api(cls, data: Any) -> Self:
+        """Initialize from the API."""
+
+
+def raise_for_status(status: int | None, error: Any) -> None:
+    """Raise the exception matching an unsuccessful response status."""
+    if status in STATUS_SUCCESS:
+        return
+    if status in STATUS_AUTH_FAILED:
+        raise WithingsAuthenticationFailedError(error)
+    if status in STATUS_INVALID_PARAMS:
+        raise WithingsInvalidParamsError(error)
+    if status in STATUS_UNAUTHORIZED:
+        raise WithingsUnauthorizedError(error)
+    if status in STATUS_ERROR_OCCURRED:
+        raise WithingsErrorOccurredError(error)
+    if status in STATUS_TIMEOUT:
+        raise WithingsConnectionError(error)
+    if status in STATUS_BAD_STATE:
+        raise WithingsBadStateError(error)
+    if status in STATUS_TOO_MANY_REQUESTS:
+        raise WithingsTooManyRequestsError(error)
+    raise WithingsUnknownStatusError(error)
+
+
+@dataclass(slots=True)
+class ParsedResponse:
+    """Decoded response with the parsed models if it was successful.
+
+    The models are kept encoded with encode_models, as one bytes object is
+    much cheaper to send back from a process pool than the models themselves.
+    """
+
+    status: int | None
+    error: Any
+    data: bytes
+    next_offset: int | None = None
+
+    def decode[ModelT](self, model: type[ModelT]) -> list[ModelT]:
+        """Return the parsed models."""
+        return decode_models(model, self.data)
+
+
+def get_next_offset(body: dict[str, Any]) -> int | None:
+    """Return the offset of the next page, or None if this is the last page."""
+    if body.get("more"):
+        return cast("int", body["offset"])
+    return None
+
+
+def parse_response(raw: bytes, model: type[ApiModel], key: str) -> ParsedResponse:
+    """Decode a raw response and parse the list under key into models.
+
+    The status is returned instead of raised, so the caller can dispatch it.
+    This is a module level function so it can be sent to a process pool.
+    """
+    response_data = json.loads(raw)
+    status = response_data.get("status", -1)
+    if status not in STATUS_SUCCESS:
+        return ParsedResponse(
+            status, response_data.get("error"), encode_models(model, [])
+        )
+    body = response_data["body"]
+    return ParsedResponse(
+        status,
+        None,
+        encode_models(model, [model.from_api(item) for item in body[key]]),
+        get_next_offset(body),
+    )
+
+
+def create_parse_executor(max_workers: int | None = None) -> Executor:
+    """Create an executor suitable for offloading response parsing.
+
+    Free-threaded builds can parse in parallel threads, which avoids pickling
+    the response. Otherwise a process pool is used.
+    """
+    is_gil_enabled = getattr(sys, "_is_gil_enabled", lambda: True)
+    if not is_gil_enabled():
+        return ThreadPoolExecutor(max_workers=max_workers)
+    return ProcessPoolExecutor(max_workers=max_workers)
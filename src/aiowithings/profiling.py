@@ -0,0 +1,218 @@
+"""Asynchronous Python client for Withings."""
+
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import dataclass, field
+from enum import StrEnum
+from functools import partial
+import tracemalloc
+from typing import TYPE_CHECKING
+
+from .tracing import TraceEvent, TraceEventType
+
+if TYPE_CHECKING:
+    from .tracing import RequestTracer
+    from .withings import WithingsClient
+
+
+class ProfilePhase(StrEnum):
+    """Enum representing the phases of a request."""
+
+    FETCH = "fetch"
+    DECODE = "decode"
+    PARSE = "parse"
+
+
+_PHASE_ENDS: dict[TraceEventType, ProfilePhase] = {
+    TraceEventType.BODY_READ: ProfilePhase.FETCH,
+    TraceEventType.BODY_DECODED: ProfilePhase.DECODE,
+    TraceEventType.MODELS_PARSED: ProfilePhase.PARSE,
+}
+
+_PHASE_STARTS: frozenset[TraceEventType] = frozenset(
+    {TraceEventType.BODY_READ, TraceEventType.STATUS_DISPATCHED}
+)
+
+
+@dataclass(slots=True)
+class RequestProfile:
+    """Phase timings of a single request.
+
+    Memory is the growth of the traced memory peak during a phase in bytes,
+    and is only filled when tracemalloc was tracing. When parsing was
+    offloaded to the parse executor, decoding and parsing are both counted in
+    the decode phase.
+    """
+
+    request_id: int
+    endpoint: str
+    action: str | None
+    durations: dict[ProfilePhase, float] = field(default_factory=dict)
+    memory: dict[ProfilePhase, int] = field(default_factory=dict)
+    response_bytes: int | None = None
+    status: int | None = None
+    model_count: int | None = None
+    failed: bool = False
+
+    @property
+    def total(self) -> float:
+        """Return the seconds spent in all phases."""
+        return sum(self.durations.values())
+
+
+@dataclass(slots=True)
+class PhaseSummary:
+    """Summary of the timings of a phase over multiple requests."""
+
+    count: int
+    mean: float
+    maximum: float
+
+
+@dataclass(slots=True)
+class _PendingProfile:
+    profile: RequestProfile
+    phase_started_at: float
+    phase_memory: int
+    client: int | None
+
+
+@dataclass(slots=True)
+class RequestProfiler:
+    """Profile the phases of requests from the trace events of a client.
+
+    Enable profiling on a client, or attach the profiler to one or more
+    clients to profile their requests. The profiler can also be added to the
+    tracers of a client directly. Every sample_every-th request is profiled
+    and the last max_profiles profiles are kept. A request is profiled until
+    it completed or failed, which every request reports. With trace_memory,
+    tracemalloc is started by start and memory growth is recorded per phase.
+    The memory figures are only exact when requests are not running
+    concurrently.
+    """
+
+    trace_memory: bool = False
+    sample_every: int = 1
+    max_profiles: int = 1000
+    profiles: deque[RequestProfile] = field(init=False)
+    _pending: dict[int, _PendingProfile] = field(init=False, default_factory=dict)
+    _request_count: int = field(init=False, default=0)
+    _started_tracemalloc: bool = field(init=False, default=False)
+    _clients: dict[int, tuple[WithingsClient, RequestTracer]] = field(
+        init=False, default_factory=dict
+    )
+
+    def __post_init__(self) -> None:
+        """Initialize the profile buffer."""
+        self.profiles = deque(maxlen=self.max_profiles)
+
+    def attach(self, client: WithingsClient) -> None:
+        """Start profiling the requests of a client."""
+        if id(client) in self._clients:
+            return
+        tracer = partial(self._record, id(client))
+        self._clients[id(client)] = (client, tracer)
+        client.tracers.append(tracer)
+        self.start()
+
+    def detach(self, client: WithingsClient) -> None:
+        """Stop profiling the requests of a client.
+
+        Only the pending profiles of that client are dropped. Memory tracing
+        stops once no client is attached anymore.
+        """
+        if (attached := self._clients.pop(id(client), None)) is None:
+            return
+        client.tracers.remove(attached[1])
+        for request_id, pending in list(self._pending.items()):
+            if pending.client == id(client):
+                del self._pending[request_id]
+        if not self._clients:
+            self.stop()
+
+    def start(self) -> None:
+        """Start tracing memory allocations, if enabled."""
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+
+    def stop(self) -> None:
+        """Stop tracing memory allocations, if started by this profiler."""
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+        self._pending.clear()
+
+    def _memory_mark(self) -> int:
+        if not self.trace_memory or not tracemalloc.is_tracing():
+            return 0
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        return current
+
+    def __call__(self, event: TraceEvent) -> None:
+        """Record a trace event."""
+        self._record(None, event)
+
+    def _record(self, client: int | None, event: TraceEvent) -> None:
+        """Record a trace event of the client with the given id, if any."""
+        if event.event_type is TraceEventType.REQUEST_START:
+            self._request_count += 1
+            if (self._request_count - 1) % self.sample_every == 0:
+                self._pending[event.request_id] = _PendingProfile(
+                    RequestProfile(event.request_id, event.endpoint, event.action),
+                    event.started_at,
+                    self._memory_mark(),
+                    client,
+                )
+            return
+        if (pending := self._pending.get(event.request_id)) is None:
+            return
+        profile = pending.profile
+        if (phase := _PHASE_ENDS.get(event.event_type)) is not None:
+            profile.durations[phase] = event.timestamp - pending.phase_started_at
+            if self.trace_memory and tracemalloc.is_tracing():
+                _, peak = tracemalloc.get_traced_memory()
+                profile.memory[phase] = max(peak - pending.phase_memory, 0)
+        if event.event_type in _PHASE_STARTS:
+            pending.phase_started_at = event.timestamp
+            pending.phase_memory = self._memory_mark()
+        if event.event_type is TraceEventType.BODY_READ:
+            profile.response_bytes = event.response_bytes
+        elif event.event_type is TraceEventType.MODELS_PARSED:
+            profile.model_count = event.model_count
+        elif event.event_type is TraceEventType.STATUS_DISPATCHED:
+            profile.status = event.status
+        elif event.event_type is TraceEventType.REQUEST_FAILED:
+            self._finish(event.request_id, failed=True)
+        elif event.event_type is TraceEventType.REQUEST_COMPLETED:
+            self._finish(event.request_id, failed=False)
+
+    def _finish(self, request_id: int, *, failed: bool) -> None:
+        profile = self._pending.pop(request_id).profile
+        profile.failed = failed
+        self.profiles.append(profile)
+
+    def summary(self) -> dict[str, dict[ProfilePhase, PhaseSummary]]:
+        """Return the phase timings per endpoint of the kept profiles."""
+        durations: dict[str, dict[ProfilePhase, list[float]]] = {}
+        for profile in self.profiles:
+            endpoint = durations.setdefault(profile.endpoint, {})
+            for phase, duration in profile.durations.items():
+                endpoint.setdefault(phase, []).append(duration)
+        return {
+            endpoint: {
+                phase: PhaseSummary(
+                    len(values),
+                    sum(values) / len(values),
+                    max(values),
+                )
+                for phase, values in sorted(phases.items())
+            }
+            for endpoint, phases in sorted(durations.items())
+        }
+
+    def clear(self) -> None:
+        """Remove all kept profiles."""
+        self.profiles.clear()
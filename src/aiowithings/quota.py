@@ -0,0 +1,144 @@
+"""Asynchronous Python client for Withings."""
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass, field
+import sqlite3
+import threading
+import time
+from typing import TYPE_CHECKING, cast
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from pathlib import Path
+
+
+@dataclass(slots=True)
+class QuotaLedger:
+    """Request quota of an application, shared by processes in a SQLite file.
+
+    The ledger records the time of every request of the last period, so at
+    most limit requests are sent in any period, over all processes that open
+    the same file. Transactions wait up to five seconds for other processes
+    to release the file, so acquire and used run them in a thread, one at a
+    time per ledger. Each process opens its own ledger, connections are not
+    shared.
+    """
+
+    path: str | Path
+    limit: int = 120
+    period: float = 60.0
+    clock: Callable[[], float] = time.time
+    _connection: sqlite3.Connection | None = field(init=False, default=None)
+    _lock: threading.Lock = field(init=False, default_factory=threading.Lock)
+    _releases: set[asyncio.Future[None]] = field(init=False, default_factory=set)
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            connection = sqlite3.connect(
+                self.path,
+                timeout=5.0,
+                isolation_level=None,
+                check_same_thread=False,
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS requests (sent_at REAL NOT NULL)"
+            )
+            self._connection = connection
+        return self._connection
+
+    def try_acquire(self) -> float:
+        """Take a request from the quota, or return the seconds until one frees.
+
+        This blocks while another process holds the file, see acquire.
+        """
+        delay, _ = self._take()
+        return delay
+
+    def _take(self) -> tuple[float, tuple[int, float] | None]:
+        """Take a request from the quota, returning its row if it was taken."""
+        with self._lock:
+            connection = self._connect()
+            now = self.clock()
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                connection.execute(
+                    "DELETE FROM requests WHERE sent_at <= ?", (now - self.period,)
+                )
+                used, oldest = connection.execute(
+                    "SELECT COUNT(*), MIN(sent_at) FROM requests"
+                ).fetchone()
+                delay = 0.0
+                taken = None
+                if int(used) < self.limit:
+                    cursor = connection.execute(
+                        "INSERT INTO requests VALUES (?)", (now,)
+                    )
+                    taken = (cast("int", cursor.lastrowid), now)
+                else:
+                    delay = float(oldest) + self.period - now
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            connection.execute("COMMIT")
+            return delay, taken
+
+    def _release(self, taken: tuple[int, float]) -> None:
+        """Give back a request taken from the quota."""
+        with self._lock:
+            self._connect().execute(
+                "DELETE FROM requests WHERE rowid = ? AND sent_at = ?", taken
+            )
+
+    async def acquire(self) -> None:
+        """Wait until the quota allows another request and take it.
+
+        The thread taking the request cannot be interrupted, so if acquire is
+        cancelled meanwhile, the request is given back once it was taken.
+        """
+        while True:
+            taking = asyncio.ensure_future(asyncio.to_thread(self._take))
+            try:
+                delay, _ = await asyncio.shield(taking)
+            except asyncio.CancelledError:
+                taking.add_done_callback(self._give_back)
+                raise
+            if delay <= 0:
+                return
+            await asyncio.sleep(delay)
+
+    def _give_back(
+        self, taking: asyncio.Future[tuple[float, tuple[int, float] | None]]
+    ) -> None:
+        """Release the request a cancelled acquire took, in a thread."""
+        if taking.cancelled() or taking.exception() is not None:
+            return
+        if (taken := taking.result()[1]) is not None:
+            task = asyncio.ensure_future(asyncio.to_thread(self._release, taken))
+            self._releases.add(task)
+            task.add_done_callback(self._releases.discard)
+
+    async def used(self) -> int:
+        """Return the amount of requests sent in the current period."""
+        return await asyncio.to_thread(self._count)
+
+    def _count(self) -> int:
+        with self._lock:
+            (used,) = (
+                self._connect()
+                .execute(
+                    "SELECT COUNT(*) FROM requests WHERE sent_at > ?",
+                    (self.clock() - self.period,),
+                )
+                .fetchone()
+            )
+        return int(used)
+
+    def close(self) -> None:
+        """Close the connection to the ledger."""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
@@ -0,0 +1,156 @@
+"""Asynchronous Python client for Withings."""
+
+from __future__ import annotations
+
+import asyncio
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from enum import IntEnum
+import heapq
+import itertools
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+
+class RequestPriority(IntEnum):
+    """Enum representing the priority classes of requests, highest first."""
+
+    INTERACTIVE = 0
+    WEBHOOK = 1
+    BACKFILL = 2
+
+
+_priority: ContextVar[RequestPriority | None] = ContextVar(
+    "aiowithings_priority", default=None
+)
+
+
+def get_priority() -> RequestPriority | None:
+    """Return the priority set for the current context, if any."""
+    return _priority.get()
+
+
+@contextmanager
+def priority(request_priority: RequestPriority) -> Iterator[None]:
+    """Set the priority of all requests made within the block.
+
+    Wrap a single call to set the priority of that call. Like deadlines, the
+    priority is kept in a context variable, so tasks started within the block
+    inherit it.
+    """
+    token = _priority.set(request_priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+@dataclass(slots=True)
+class QueueWaitSummary:
+    """Summary of the time requests of a priority class waited for a slot."""
+
+    count: int
+    mean: float
+    maximum: float
+
+
+@dataclass(slots=True)
+class _QueueWaits:
+    count: int = 0
+    total: float = 0.0
+    maximum: float = 0.0
+
+    def observe(self, wait: float) -> None:
+        """Add the time a request waited for a slot."""
+        self.count += 1
+        self.total += wait
+        self.maximum = max(self.maximum, wait)
+
+
+@dataclass(slots=True)
+class RequestScheduler:
+    """Run requests over a bounded pool of slots, by priority class.
+
+    When all max_concurrency slots are taken, requests wait in a queue and the
+    highest priority request gets the next free slot. A waiting request gains
+    one priority class for every aging_interval seconds it waited, so backfill
+    requests are never starved by a steady stream of interactive ones. Share
+    one scheduler between the clients of all users to bound the total amount
+    of requests in flight. Cancelled requests are no longer counted as queued,
+    but are only removed from the queue once they are reached.
+    """
+
+    max_concurrency: int = 8
+    aging_interval: float = 5.0
+    default_priority: RequestPriority = RequestPriority.INTERACTIVE
+    active: int = field(init=False, default=0)
+    queued: int = field(init=False, default=0)
+    _queue: list[tuple[float, int, asyncio.Future[None]]] = field(
+        init=False, default_factory=list
+    )
+    _sequence: itertools.count[int] = field(init=False, default_factory=itertools.count)
+    _waits: dict[RequestPriority, _QueueWaits] = field(init=False, default_factory=dict)
+
+    async def acquire(self, request_priority: RequestPriority | None = None) -> None:
+        """Wait for a free slot, taking the priority of the context by default.
+
+        Requests are ordered by the time they were queued plus aging_interval
+        for every class below the highest. This equals comparing the classes
+        after aging, but does not change while requests wait.
+        """
+        if request_priority is None:
+            request_priority = get_priority()
+        if request_priority is None:
+            request_priority = self.default_priority
+        loop = asyncio.get_running_loop()
+        queued_at = loop.time()
+        if self.active < self.max_concurrency and not self.queued:
+            self.active += 1
+            self._observe(request_priority, 0.0)
+            return
+        waiter: asyncio.Future[None] = loop.create_future()
+        heapq.heappush(
+            self._queue,
+            (
+                queued_at + request_priority * self.aging_interval,
+                next(self._sequence),
+                waiter,
+            ),
+        )
+        self.queued += 1
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.cancelled():
+                self.queued -= 1
+            else:
+                self.release()
+            raise
+        self._observe(request_priority, loop.time() - queued_at)
+
+    def release(self) -> None:
+        """Hand the slot of a finished request to the next waiting request."""
+        while self._queue:
+            _, _, waiter = heapq.heappop(self._queue)
+            if not waiter.done():
+                waiter.set_result(None)
+                self.queued -= 1
+                return
+        self.active -= 1
+
+    def _observe(self, request_priority: RequestPriority, wait: float) -> None:
+        self._waits.setdefault(request_priority, _QueueWaits()).observe(wait)
+
+    def wait_times(self) -> dict[RequestPriority, QueueWaitSummary]:
+        """Return the queue wait times in seconds per priority class."""
+        return {
+            request_priority: QueueWaitSummary(
+                waits.count,
+                waits.total / waits.count,
+                waits.maximum,
+            )
+            for request_priority, waits in sorted(self._waits.items())
+        }
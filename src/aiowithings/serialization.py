@@ -0,0 +1,182 @@
+"""Asynchronous Python client for Withings."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, fields, is_dataclass
+from datetime import UTC, date, datetime
+from enum import Enum
+import marshal
+from operator import attrgetter
+import sys
+import types
+from typing import TYPE_CHECKING, Any, Union, get_args, get_origin, get_type_hints
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+
+CODEC_VERSION = 2
+
+# marshal is only guaranteed to round trip within one interpreter version, like
+# the bytecode caches that use it, so data is tagged with that interpreter.
+INTERPRETER = sys.implementation.cache_tag
+
+type _Converter = Callable[[Any], Any]
+
+
+def _encode_datetime(value: datetime) -> int | float:
+    timestamp = value.timestamp()
+    return int(timestamp) if timestamp.is_integer() else timestamp
+
+
+def _decode_datetime(value: float) -> datetime:
+    return datetime.fromtimestamp(value, tz=UTC)
+
+
+def _optional(converter: _Converter) -> _Converter:
+    return lambda value: None if value is None else converter(value)
+
+
+def _sequence(converter: _Converter) -> _Converter:
+    return lambda values: [converter(value) for value in values]
+
+
+def _wrap(
+    converters: tuple[_Converter | None, _Converter | None],
+    wrapper: Callable[[_Converter], _Converter],
+) -> tuple[_Converter | None, _Converter | None]:
+    encoder, decoder = converters
+    return (
+        None if encoder is None else wrapper(encoder),
+        None if decoder is None else wrapper(decoder),
+    )
+
+
+def _get_converters(hint: Any) -> tuple[_Converter | None, _Converter | None]:
+    """Return the encoder and decoder for a type, None if it is kept as is."""
+    origin = get_origin(hint)
+    if origin in (Union, types.UnionType):
+        (inner,) = (arg for arg in get_args(hint) if arg is not types.NoneType)
+        return _wrap(_get_converters(inner), _optional)
+    if origin is list:
+        return _wrap(_get_converters(get_args(hint)[0]), _sequence)
+    if isinstance(hint, type):
+        return _get_type_converters(hint)
+    return None, None
+
+
+def _get_type_converters(
+    hint: type[Any],
+) -> tuple[_Converter | None, _Converter | None]:
+    """Return the encoder and decoder for a plain class."""
+    if issubclass(hint, Enum):
+        members = {member.value: member for member in hint}
+        return attrgetter("value"), members.__getitem__
+    if issubclass(hint, datetime):
+        return _encode_datetime, _decode_datetime
+    if issubclass(hint, date):
+        return date.toordinal, date.fromordinal
+    if is_dataclass(hint):
+        codec = get_codec(hint)
+        return codec.encode_row, codec.decode_row
+    return None, None
+
+
+@dataclass(slots=True)
+class ModelCodec:
+    """Converts instances of a model to rows of marshallable values."""
+
+    model: type[Any]
+    getter: Callable[[Any], tuple[Any, ...]]
+    encoders: list[tuple[int, _Converter]]
+    decoders: list[tuple[int, _Converter]]
+
+    def encode_row(self, item: Any) -> list[Any]:
+        """Return the values of the fields of an instance."""
+        row = list(self.getter(item))
+        for index, encoder in self.encoders:
+            row[index] = encoder(row[index])
+        return row
+
+    def decode_row(self, row: list[Any]) -> Any:
+        """Create an instance from the values of its fields."""
+        for index, decoder in self.decoders:
+            row[index] = decoder(row[index])
+        return self.model(*row)
+
+
+_CODECS: dict[type[Any], ModelCodec] = {}
+
+
+def get_codec(model: type[Any]) -> ModelCodec:
+    """Return the codec of a dataclass model, building it on first use."""
+    if (codec := _CODECS.get(model)) is None:
+        codec = _CODECS[model] = _build_codec(model)
+    return codec
+
+
+def _get_values(names: list[str]) -> Callable[[Any], tuple[Any, ...]]:
+    """Return a function returning the values of the named attributes."""
+    getter = attrgetter(*names)
+    if len(names) > 1:
+        return getter
+
+    def get_single(item: Any) -> tuple[Any, ...]:
+        return (getter(item),)
+
+    return get_single
+
+
+def _build_codec(model: type[Any]) -> ModelCodec:
+    """Build the codec of a dataclass model from its type hints."""
+    hints = get_type_hints(model)
+    names = [model_field.name for model_field in fields(model)]
+    encoders: list[tuple[int, _Converter]] = []
+    decoders: list[tuple[int, _Converter]] = []
+    for index, name in enumerate(names):
+        encoder, decoder = _get_converters(hints[name])
+        if encoder is not None:
+            encoders.append((index, encoder))
+        if decoder is not None:
+            decoders.append((index, decoder))
+    return ModelCodec(model, _get_values(names), encoders, decoders)
+
+
+def encode_models[ModelT](model: type[ModelT], items: Iterable[ModelT]) -> bytes:
+    """Serialize models to a compact binary format for caching.
+
+    Enums are stored by value, datetimes as epoch timestamps and dates as
+    ordinals. The format is based on marshal, so it is only meant for data
+    written by this library, not for data from untrusted sources, and it can
+    only be decoded by the interpreter version that encoded it.
+    """
+    codec = get_codec(model)
+    rows = [codec.encode_row(item) for item in items]
+    return marshal.dumps((CODEC_VERSION, INTERPRETER, model.__qualname__, rows))
+
+
+def decode_models[ModelT](model: type[ModelT], data: bytes) -> list[ModelT]:
+    """Deserialize models written by encode_models."""
+    version, *header, rows = marshal.loads(data)  # noqa: S302
+    if version != CODEC_VERSION:
+        msg = f"Unsupported codec version {version}, expected {CODEC_VERSION}"
+        raise ValueError(msg)
+    interpreter, name = header
+    if interpreter != INTERPRETER:
+        msg = f"Data was encoded by {interpreter}, not {INTERPRETER}"
+        raise ValueError(msg)
+    if name != model.__qualname__:
+        msg = f"Data contains {name} models, not {model.__qualname__}"
+        raise ValueError(msg)
+    decode_row = get_codec(model).decode_row
+    return [decode_row(row) for row in rows]
+
+
+def encode_model[ModelT](model: type[ModelT], item: ModelT) -> bytes:
+    """Serialize a single model."""
+    return encode_models(model, [item])
+
+
+def decode_model[ModelT](model: type[ModelT], data: bytes) -> ModelT:
+    """Deserialize a single model written by encode_model."""
+    (item,) = decode_models(model, data)
+    return item
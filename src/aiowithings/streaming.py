@@ -0,0 +1,173 @@
+"""Asynchronous Python client for Withings."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+import json
+import re
+from typing import Any
+
+from .compression import Decompressor
+
+_STRUCTURE = re.compile(rb'[\[\]{}",]')
+_NESTING = re.compile(rb'[\[\]{}"]')
+_STRING_END = re.compile(rb'["\\]')
+_WHITESPACE = b" \t\r\n"
+_OPENING = b"[{"
+
+
+@dataclass(slots=True)
+class ArrayItemScanner:
+    """Incrementally extract the items of one array from a JSON document.
+
+    Chunks of the document are fed as they arrive. Every object or array in
+    the array at path is decoded on its own as soon as it is complete, so
+    memory scales with the largest item instead of the whole document. The
+    rest of the document is kept, with the items left out, and returned by
+    close.
+    """
+
+    path: tuple[str, ...]
+    _buffer: bytearray = field(init=False, default_factory=bytearray)
+    _position: int = field(init=False, default=0)
+    _skeleton: bytearray = field(init=False, default_factory=bytearray)
+    _containers: bytearray = field(init=False, default_factory=bytearray)
+    _keys: list[str | None] = field(init=False, default_factory=list)
+    _last_string: Any = field(init=False, default=None)
+    _in_array: bool = field(init=False, default=False)
+    _item_depth: int = field(init=False, default=0)
+
+    def feed(self, chunk: bytes) -> list[Any]:
+        """Add a chunk of the document and return the completed items."""
+        self._buffer += chunk
+        items: list[Any] = []
+        while self._scan_item() if self._item_depth else self._scan_document():
+            if not self._item_depth:
+                items.append(json.loads(self._buffer[: self._position]))
+                del self._buffer[: self._position]
+                self._position = 0
+        if not self._item_depth:
+            self._skeleton += self._buffer[: self._position]
+            del self._buffer[: self._position]
+            self._position = 0
+        return items
+
+    def close(self) -> Any:
+        """Return the rest of the document once it is complete.
+
+        Raises ValueError if the document is incomplete or invalid.
+        """
+        if self._item_depth or self._containers:
+            msg = "Incomplete JSON document"
+            raise ValueError(msg)
+        self._skeleton += self._buffer
+        self._buffer.clear()
+        return json.loads(self._skeleton)
+
+    def _skip_string(self, start: int) -> int | None:
+        """Return the index after the string starting at start, if complete."""
+        position = start + 1
+        while match := _STRING_END.search(self._buffer, position):
+            if match.group() == b'"':
+                return match.end()
+            position = match.end() + 1
+        return None
+
+    def _scan_item(self) -> bool:
+        """Advance through the current item, True once it is complete."""
+        buffer = self._buffer
+        while match := _NESTING.search(buffer, self._position):
+            if match.group() == b'"':
+                if (end := self._skip_string(match.start())) is None:
+                    self._position = match.start()
+                    return False
+                self._position = end
+                continue
+            self._position = match.end()
+            self._item_depth += 1 if match.group() in _OPENING else -1
+            if not self._item_depth:
+                return True
+        self._position = len(buffer)
+        return False
+
+    def _scan_document(self) -> bool:
+        """Advance through the document outside the items, True at an item."""
+        buffer = self._buffer
+        while True:
+            if self._in_array:
+                while (
+                    self._position < len(buffer)
+                    and buffer[self._position] in _WHITESPACE
+                ):
+                    self._position += 1
+                if self._position == len(buffer):
+                    return False
+                if buffer[self._position] in _OPENING:
+                    self._skeleton += buffer[: self._position]
+                    del buffer[: self._position]
+                    self._position = 1
+                    self._item_depth = 1
+                    return True
+            if (match := _STRUCTURE.search(buffer, self._position)) is None:
+                self._position = len(buffer)
+                return False
+            character = match.group()
+            if character == b'"':
+                if (end := self._skip_string(match.start())) is None:
+                    self._position = match.start()
+                    return False
+                self._last_string = json.loads(buffer[match.start() : end])
+                self._position = end
+            elif character == b"," and self._in_array:
+                self._skeleton += buffer[: match.start()]
+                del buffer[: match.end()]
+                self._position = 0
+            elif character in _OPENING:
+                self._position = match.end()
+                self._open(character)
+            else:
+                self._position = match.end()
+                if character != b",":
+                    self._in_array = False
+                    self._containers.pop()
+                    self._keys.pop()
+
+    def _open(self, character: bytes) -> None:
+        """Enter a nested object or array of the document."""
+        if self._containers and self._containers[-1:] == b"{":
+            self._keys.append(self._last_string)
+        else:
+            self._keys.append(None)
+        self._containers += character
+        self._in_array = character == b"[" and tuple(self._keys[1:]) == self.path
+
+
+@dataclass(slots=True)
+class BodyItemStream:
+    """Decompress a response body as it arrives and scan the array at path.
+
+    Counts the bytes as transferred and after decompression.
+    """
+
+    content_encoding: str
+    path: tuple[str, ...]
+    response_bytes: int = field(init=False, default=0)
+    decompressed_bytes: int = field(init=False, default=0)
+    _decompressor: Decompressor = field(init=False)
+    _scanner: ArrayItemScanner = field(init=False)
+
+    def __post_init__(self) -> None:
+        """Initialize the decompressor and the scanner."""
+        self._decompressor = Decompressor(self.content_encoding)
+        self._scanner = ArrayItemScanner(self.path)
+
+    def feed(self, chunk: bytes) -> list[Any]:
+        """Add a chunk of the body and return the completed items."""
+        self.response_bytes += len(chunk)
+        decompressed = self._decompressor.decompress(chunk)
+        self.decompressed_bytes += len(decompressed)
+        return self._scanner.feed(decompressed)
+
+    def close(self) -> Any:
+        """Return the rest of the document once the body is complete."""
+        return self._scanner.close()
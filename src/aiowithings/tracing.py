@@ -0,0 +1,92 @@
+"""Asynchronous Python client for Withings."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from enum import StrEnum
+import itertools
+import time
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Sequence
+
+
+class TraceEventType(StrEnum):
+    """Enum representing the moments in the lifecycle of a request."""
+
+    REQUEST_START = "request_start"
+    TOKEN_REFRESHED = "token_refreshed"  # noqa: S105
+    RESPONSE_HEADERS = "response_headers"
+    BODY_READ = "body_read"
+    BODY_DECODED = "body_decoded"
+    STATUS_DISPATCHED = "status_dispatched"
+    MODELS_PARSED = "models_parsed"
+    REQUEST_COMPLETED = "request_completed"
+    REQUEST_FAILED = "request_failed"
+
+
+@dataclass(slots=True)
+class TraceEvent:
+    """Event fired during the lifecycle of a request.
+
+    Timestamps come from time.monotonic, so they can be compared with each
+    other but not with the wall clock. When the body is read, response_bytes
+    is the size as transferred and decompressed_bytes the size after
+    decompression. A failed request carries the exception that ended it,
+    which can also be a cancellation.
+    """
+
+    event_type: TraceEventType
+    request_id: int
+    endpoint: str
+    action: str | None
+    context: Any
+    started_at: float
+    timestamp: float
+    http_status: int | None = None
+    response_bytes: int | None = None
+    decompressed_bytes: int | None = None
+    content_encoding: str | None = None
+    status: int | None = None
+    model_count: int | None = None
+    error: BaseException | None = None
+
+    @property
+    def elapsed(self) -> float:
+        """Return the seconds since the start of the request."""
+        return self.timestamp - self.started_at
+
+
+type RequestTracer = Callable[[TraceEvent], None]
+
+_request_ids = itertools.count(1)
+
+
+@dataclass(slots=True)
+class RequestTrace:
+    """Context of a single request, used to fire its events."""
+
+    tracers: Sequence[RequestTracer]
+    endpoint: str
+    action: str | None
+    context: Any
+    started_at: float = field(default_factory=time.monotonic)
+    request_id: int = field(default_factory=lambda: next(_request_ids))
+
+    def emit(self, event_type: TraceEventType, **details: Any) -> None:
+        """Fire an event to all tracers."""
+        if not self.tracers:
+            return
+        event = TraceEvent(
+            event_type=event_type,
+            request_id=self.request_id,
+            endpoint=self.endpoint,
+            action=self.action,
+            context=self.context,
+            started_at=self.started_at,
+            timestamp=time.monotonic(),
+            **details,
+        )
+        for tracer in self.tracers:
+            tracer(event)
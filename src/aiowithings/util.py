@@ -25,8 +25,14 @@ def to_enum[EnumT](
 
 
 def get_measurement(value: int, unit: int) -> float:
-    """Convert value and unit to real value."""
-    return cast("float", value * pow(10, unit))
+    """Convert value and unit to real value.
+
+    Negative units divide by an integer power of ten, which rounds correctly,
+    so 703 with unit -1 becomes 70.3 instead of 70.30000000000001.
+    """
+    if unit < 0:
+        return cast("float", value / 10**-unit)
+    return cast("float", value * 10**unit)
 
 
 def get_measurement_from_dict(input_dict: dict[str, Any]) -> float:
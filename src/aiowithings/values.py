@@ -0,0 +1,164 @@
+"""Asynchronous Python client for Withings."""
+
+from __future__ import annotations
+
+from array import array
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import TYPE_CHECKING, Any, Self
+
+from aiowithings.util import get_measurement
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+    from aiowithings.models import MeasurementPosition, MeasurementType
+
+
+def _normalize(value: int, unit: int) -> tuple[int, int]:
+    """Strip trailing zeros, so equal quantities share one representation."""
+    if value == 0:
+        return 0, 0
+    while value % 10 == 0:
+        value //= 10
+        unit += 1
+    return value, unit
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class MeasurementValue:
+    """Exact measurement value as sent by the API, value * 10 ** unit.
+
+    Values compare and hash by the quantity they represent, so 703e-1 equals
+    7030e-2.
+    """
+
+    value: int
+    unit: int
+
+    @classmethod
+    def from_api(cls, data: dict[str, Any]) -> Self:
+        """Initialize from the API."""
+        return cls(value=data["value"], unit=data["unit"])
+
+    @classmethod
+    def from_float(cls, value: float) -> Self:
+        """Initialize from a float parsed by get_measurement.
+
+        The shortest representation of the float is used, which restores the
+        original value for anything with up to 15 significant digits.
+        """
+        sign, digits, exponent = Decimal(repr(value)).as_tuple()
+        raw = int("".join(map(str, digits)))
+        return cls(value=-raw if sign else raw, unit=int(exponent))
+
+    def normalized(self) -> tuple[int, int]:
+        """Return the value and unit without trailing zeros."""
+        return _normalize(self.value, self.unit)
+
+    def to_float(self) -> float:
+        """Return the value as float."""
+        return float(get_measurement(self.value, self.unit))
+
+    def to_decimal(self) -> Decimal:
+        """Return the value as exact decimal."""
+        return Decimal(self.value).scaleb(self.unit)
+
+    def __eq__(self, other: object) -> bool:
+        """Compare the represented quantities."""
+        if not isinstance(other, MeasurementValue):
+            return NotImplemented
+        return self.normalized() == other.normalized()
+
+    def __hash__(self) -> int:
+        """Hash the represented quantity."""
+        return hash(self.normalized())
+
+
+@dataclass(slots=True)
+class MeasurementColumn:
+    """Column of exact measurement values stored in two compact arrays.
+
+    Values are stored as signed 64 bit integers and units as signed bytes.
+    """
+
+    values: array[int] = field(default_factory=lambda: array("q"))
+    units: array[int] = field(default_factory=lambda: array("b"))
+
+    @classmethod
+    def from_api(cls, measures: Iterable[dict[str, Any]]) -> Self:
+        """Initialize from the measures of the API."""
+        column = cls()
+        for measure in measures:
+            column.append(measure["value"], measure["unit"])
+        return column
+
+    @classmethod
+    def from_api_groups(
+        cls,
+        groups: Iterable[dict[str, Any]],
+        measurement_type: MeasurementType,
+        position: MeasurementPosition | None = None,
+    ) -> Self:
+        """Initialize from the measures of a type in measurement groups of the API.
+
+        Parsed groups only keep the values as floats, so the column is built
+        from the raw values and units of the API instead.
+        """
+        return cls.from_api(
+            measure
+            for group in groups
+            for measure in group["measures"]
+            if measure["type"] == measurement_type
+            and measure.get("position") == position
+        )
+
+    def append(self, value: int, unit: int) -> None:
+        """Add a raw value and unit to the column."""
+        self.values.append(value)
+        self.units.append(unit)
+
+    def append_value(self, value: MeasurementValue) -> None:
+        """Add a measurement value to the column."""
+        self.append(value.value, value.unit)
+
+    def __len__(self) -> int:
+        """Return the amount of values in the column."""
+        return len(self.values)
+
+    def __getitem__(self, index: int) -> MeasurementValue:
+        """Return a single value of the column."""
+        return MeasurementValue(self.values[index], self.units[index])
+
+    def __iter__(self) -> Iterator[MeasurementValue]:
+        """Iterate over the values of the column."""
+        for value, unit in zip(self.values, self.units, strict=True):
+            yield MeasurementValue(value, unit)
+
+    def to_floats(self) -> list[float]:
+        """Convert the whole column to floats.
+
+        The power of ten is computed once per distinct unit in the column.
+        """
+        scales = {unit: 10 ** abs(unit) for unit in set(self.units)}
+        return [
+            value / scales[unit] if unit < 0 else float(value * scales[unit])
+            for value, unit in zip(self.values, self.units, strict=True)
+        ]
+
+    def to_decimals(self) -> list[Decimal]:
+        """Convert the whole column to exact decimals."""
+        return [
+            Decimal(value).scaleb(unit)
+            for value, unit in zip(self.values, self.units, strict=True)
+        ]
+
+    def unique(self) -> MeasurementColumn:
+        """Return a column without duplicate quantities, keeping the first."""
+        seen: set[tuple[int, int]] = set()
+        column = MeasurementColumn()
+        for value, unit in zip(self.values, self.units, strict=True):
+            if (key := _normalize(value, unit)) not in seen:
+                seen.add(key)
+                column.append(value, unit)
+        return column
@@ -3,34 +3,24 @@
 from __future__ import annotations
 
 import asyncio
-from dataclasses import dataclass
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from functools import cache
+from http import HTTPStatus
 from importlib import metadata
+import json
 from typing import TYPE_CHECKING, Any, cast
 
-from aiohttp import ClientSession
+from aiohttp import ClientError, ClientResponse, ClientSession
 from aiohttp.hdrs import METH_POST
 from yarl import URL
 
-from .const import (
-    STATUS_AUTH_FAILED,
-    STATUS_BAD_STATE,
-    STATUS_ERROR_OCCURRED,
-    STATUS_INVALID_PARAMS,
-    STATUS_SUCCESS,
-    STATUS_TIMEOUT,
-    STATUS_TOO_MANY_REQUESTS,
-    STATUS_UNAUTHORIZED,
-)
+from .compression import ACCEPT_ENCODING, decompress
+from .deadlines import get_deadline
 from .exceptions import (
-    WithingsAuthenticationFailedError,
-    WithingsBadStateError,
     WithingsConnectionError,
     WithingsError,
     WithingsErrorOccurredError,
-    WithingsInvalidParamsError,
-    WithingsTooManyRequestsError,
-    WithingsUnauthorizedError,
-    WithingsUnknownStatusError,
 )
 from .models import (
     Activity,
@@ -48,26 +38,99 @@ from .models import (
     Workout,
     WorkoutDataFields,
 )
+from .parsing import get_next_offset, parse_response, raise_for_status
+from .profiling import RequestProfiler
+from .streaming import BodyItemStream
+from .tracing import RequestTrace, TraceEventType
+from .values import MeasurementColumn
 
 if TYPE_CHECKING:
-    from collections.abc import Awaitable, Callable
+    from collections.abc import AsyncGenerator, AsyncIterator, Awaitable, Callable
+    from concurrent.futures import Executor
     from datetime import date, datetime
     from typing import Self
 
-
-VERSION = metadata.version(__package__)
+    from .circuit import CircuitBreaker
+    from .models import MeasurementPosition
+    from .parsing import ApiModel
+    from .quota import QuotaLedger
+    from .scheduling import RequestScheduler
+    from .tracing import RequestTracer
+
+
+@cache
+def get_version() -> str:
+    """Return the installed version of the package, resolved on first use."""
+    return metadata.version("aiowithings")
+
+
+def __getattr__(name: str) -> Any:
+    """Resolve the VERSION constant on first access."""
+    if name == "VERSION":
+        return get_version()
+    msg = f"module {__name__!r} has no attribute {name!r}"
+    raise AttributeError(msg)
+
+
+def _get_content_encoding(response: ClientResponse) -> str:
+    """Return the normalized content encoding of a response."""
+    return response.headers.get("Content-Encoding", "").strip().lower() or "identity"
+
+
+def _get_timestamp_range(
+    since: datetime | None,
+    start_date: datetime | None,
+    end_date: datetime | None,
+) -> dict[str, Any]:
+    """Return the request data selecting a period or everything updated since."""
+    if since is not None:
+        return {"lastupdate": int(since.timestamp())}
+    if start_date is None or end_date is None:
+        msg = "Either since or both start_date and end_date are required"
+        raise ValueError(msg)
+    return {
+        "startdate": int(start_date.timestamp()),
+        "enddate": int(end_date.timestamp()),
+    }
+
+
+def _get_date_range(
+    since: datetime | None,
+    start_date: date | None,
+    end_date: date | None,
+) -> dict[str, Any]:
+    """Return the request data selecting a period of days or since."""
+    if since is not None:
+        return {"lastupdate": int(since.timestamp())}
+    if start_date is None or end_date is None:
+        msg = "Either since or both start_date and end_date are required"
+        raise ValueError(msg)
+    return {"startdateymd": str(start_date), "enddateymd": str(end_date)}
 
 
 @dataclass
+# pylint: disable-next=too-many-public-methods
 class WithingsClient:
     """Main class for handling connections with Withings."""
 
     session: ClientSession | None = None
-    request_timeout: int = 10
+    request_timeout: float = 10
     api_host: str = "wbsapi.withings.net"
     _token: str | None = None
     _close_session: bool = False
     refresh_token_function: Callable[[], Awaitable[str]] | None = None
+    parse_executor: Executor | None = None
+    parse_offload_threshold: int = 256 * 1024
+    api_scheme: str = "https"
+    api_port: int = 443
+    tracers: list[RequestTracer] = field(default_factory=list)
+    trace_context: Any = None
+    stream_chunk_size: int = 64 * 1024
+    compression: bool = True
+    circuit_breaker: CircuitBreaker | None = None
+    scheduler: RequestScheduler | None = None
+    quota: QuotaLedger | None = None
+    _profiler: RequestProfiler | None = None
 
     async def refresh_token(self) -> None:
         """Refresh token with provided function."""
@@ -78,24 +141,154 @@ class WithingsClient:
         """Authenticate the user with a token."""
         self._token = token
 
-    async def _request(
+    @property
+    def profiler(self) -> RequestProfiler | None:
+        """Return the profiler of the profiling mode, if enabled."""
+        return self._profiler
+
+    def enable_profiling(
+        self,
+        *,
+        trace_memory: bool = False,
+        sample_every: int = 1,
+        max_profiles: int = 1000,
+    ) -> RequestProfiler:
+        """Start recording the phase timings of requests."""
+        self.disable_profiling()
+        profiler = self._profiler = RequestProfiler(
+            trace_memory=trace_memory,
+            sample_every=sample_every,
+            max_profiles=max_profiles,
+        )
+        profiler.attach(self)
+        return profiler
+
+    def disable_profiling(self) -> None:
+        """Stop recording the phase timings of requests."""
+        if self._profiler is not None:
+            self._profiler.detach(self)
+            self._profiler = None
+
+    def _get_deadline(self) -> float:
+        """Return the loop time by which the current request must finish."""
+        when = asyncio.get_running_loop().time() + self.request_timeout
+        if (budget := get_deadline()) is not None:
+            return min(when, budget)
+        return when
+
+    @asynccontextmanager
+    async def _schedule(self) -> AsyncIterator[None]:
+        """Wait for a slot of the scheduler, within the deadline.
+
+        The quota is taken while holding the slot, so requests get the quota
+        in the order of the scheduler.
+        """
+        if (scheduler := self.scheduler) is None:
+            yield
+            return
+        async with self._timeout(get_deadline()):
+            await scheduler.acquire()
+        try:
+            yield
+        finally:
+            scheduler.release()
+
+    async def _take_quota(self) -> None:
+        """Wait for the quota to allow a request, within the deadline."""
+        if self.quota is not None:
+            async with self._timeout(get_deadline()):
+                await self.quota.acquire()
+
+    @asynccontextmanager
+    async def _timeout(self, when: float | None) -> AsyncIterator[None]:
+        """Raise a connection error if the block does not finish before when."""
+        try:
+            async with asyncio.timeout_at(when):
+                yield
+        except TimeoutError as exception:
+            msg = "Timeout occurred while connecting to Withings"
+            raise WithingsConnectionError(msg) from exception
+
+    @asynccontextmanager
+    async def _guard(self, trace: RequestTrace) -> AsyncIterator[None]:
+        """Check the circuit of the endpoint, take the quota and record the outcome.
+
+        The quota is only taken once the circuit admits the request, so
+        requests to an open circuit fail fast without using it. Waiting for
+        the quota is not an outcome of the endpoint, so it is not recorded.
+        """
+        if (breaker := self.circuit_breaker) is None:
+            await self._take_quota()
+            yield
+            return
+        breaker.before_request(self.api_host, trace.endpoint)
+        record = breaker.release
+        try:
+            await self._take_quota()
+            try:
+                yield
+            except (WithingsConnectionError, WithingsErrorOccurredError, ClientError):
+                record = breaker.record_failure
+                raise
+            except WithingsError:
+                record = breaker.record_success
+                raise
+            record = breaker.record_success
+        finally:
+            record(self.api_host, trace.endpoint)
+
+    @asynccontextmanager
+    async def _trace(
         self,
         uri: str,
+        data: dict[str, Any] | None,
+    ) -> AsyncIterator[RequestTrace]:
+        """Trace a request, firing the failed event on every exit but success.
+
+        That includes cancellation and leaving a stream early, so every
+        started request ends with either the completed or the failed event.
+        """
+        trace = RequestTrace(
+            self.tracers,
+            uri,
+            data.get("action") if data else None,
+            self.trace_context,
+        )
+        trace.emit(TraceEventType.REQUEST_START)
+        error: BaseException | None = None
+        try:
+            yield trace
+        except BaseException as exception:
+            error = exception
+            raise
+        finally:
+            if error is None:
+                trace.emit(TraceEventType.REQUEST_COMPLETED)
+            else:
+                trace.emit(TraceEventType.REQUEST_FAILED, error=error)
+
+    async def _send(
+        self,
+        trace: RequestTrace,
+        uri: str,
         *,
         data: dict[str, Any] | None = None,
-    ) -> dict[str, Any]:
-        """Handle a request to Withings."""
+    ) -> ClientResponse:
+        """Send a request to Withings and return the JSON response."""
         url = URL.build(
-            scheme="https",
+            scheme=self.api_scheme,
             host=self.api_host,
-            port=443,
+            port=self.api_port,
         ).joinpath(uri)
 
-        await self.refresh_token()
+        if self.refresh_token_function:
+            await self.refresh_token()
+            trace.emit(TraceEventType.TOKEN_REFRESHED)
 
         headers = {
-            "User-Agent": f"AioWithings/{VERSION}",
+            "User-Agent": f"AioWithings/{get_version()}",
             "Accept": "application/json, text/plain, */*",
+            "Accept-Encoding": ACCEPT_ENCODING if self.compression else "identity",
             "Authorization": f"Bearer {self._token}",
         }
 
@@ -103,48 +296,210 @@ class WithingsClient:
             self.session = ClientSession()
             self._close_session = True
 
-        try:
-            async with asyncio.timeout(self.request_timeout):
-                response = await self.session.request(
-                    METH_POST,
-                    url,
-                    headers=headers,
-                    data=data,
-                )
-        except TimeoutError as exception:
-            msg = "Timeout occurred while connecting to Withings"
-            raise WithingsConnectionError(msg) from exception
+        response = await self.session.request(
+            METH_POST,
+            url,
+            headers=headers,
+            data=data,
+            auto_decompress=False,
+        )
+
+        trace.emit(
+            TraceEventType.RESPONSE_HEADERS,
+            http_status=response.status,
+            response_bytes=response.content_length,
+        )
 
         content_type = response.headers.get("Content-Type", "")
 
         if "application/json" not in content_type:
-            text = await response.text()
+            text = decompress(
+                await response.read(),
+                _get_content_encoding(response),
+            ).decode(response.get_encoding(), errors="replace")
             msg = "Unexpected response from Withings"
-            raise WithingsError(
+            # Error pages of the edge of Withings during an outage are not an
+            # answer of the API, so they fail like the connection did.
+            error = (
+                WithingsConnectionError
+                if response.status >= HTTPStatus.INTERNAL_SERVER_ERROR
+                else WithingsError
+            )
+            raise error(
                 msg,
                 {"Content-Type": content_type, "response": text},
             )
 
-        response_data = cast("dict[str, Any]", await response.json())
-        response_status = response_data.get("status", -1)
-        if response_status in STATUS_SUCCESS:
-            return cast("dict[str, Any]", response_data.get("body"))
-        error = response_data.get("error")
-        if response_status in STATUS_AUTH_FAILED:
-            raise WithingsAuthenticationFailedError(error)
-        if response_status in STATUS_INVALID_PARAMS:
-            raise WithingsInvalidParamsError(error)
-        if response_status in STATUS_UNAUTHORIZED:
-            raise WithingsUnauthorizedError(error)
-        if response_status in STATUS_ERROR_OCCURRED:
-            raise WithingsErrorOccurredError(error)
-        if response_status in STATUS_TIMEOUT:
-            raise WithingsConnectionError(error)
-        if response_status in STATUS_BAD_STATE:
-            raise WithingsBadStateError(error)
-        if response_status in STATUS_TOO_MANY_REQUESTS:
-            raise WithingsTooManyRequestsError(error)
-        raise WithingsUnknownStatusError(error)
+        return response
+
+    async def _request_raw(
+        self,
+        trace: RequestTrace,
+        uri: str,
+        *,
+        data: dict[str, Any] | None = None,
+    ) -> bytes:
+        """Handle a request to Withings and return the raw response body."""
+        response = await self._send(trace, uri, data=data)
+        body = await response.read()
+        content_encoding = _get_content_encoding(response)
+        raw = decompress(body, content_encoding)
+        trace.emit(
+            TraceEventType.BODY_READ,
+            response_bytes=len(body),
+            decompressed_bytes=len(raw),
+            content_encoding=content_encoding,
+        )
+        return raw
+
+    def _decode(self, trace: RequestTrace, raw: bytes) -> dict[str, Any]:
+        """Decode a raw response and return its body or raise for its status."""
+        response_data = json.loads(raw)
+        trace.emit(TraceEventType.BODY_DECODED, response_bytes=len(raw))
+        status = response_data.get("status", -1)
+        trace.emit(TraceEventType.STATUS_DISPATCHED, status=status)
+        raise_for_status(status, response_data.get("error"))
+        return cast("dict[str, Any]", response_data.get("body"))
+
+    async def _request(
+        self,
+        uri: str,
+        *,
+        data: dict[str, Any] | None = None,
+    ) -> dict[str, Any]:
+        """Handle a request to Withings."""
+        async with (
+            self._trace(uri, data) as trace,
+            self._schedule(),
+            self._guard(trace),
+            self._timeout(self._get_deadline()),
+        ):
+            raw = await self._request_raw(trace, uri, data=data)
+            return self._decode(trace, raw)
+
+    async def _request_page[ModelT: ApiModel](
+        self,
+        uri: str,
+        model: type[ModelT],
+        key: str,
+        *,
+        data: dict[str, Any],
+    ) -> tuple[list[ModelT], int | None]:
+        """Handle a request to Withings and parse the list under key.
+
+        Returns the models and the offset of the next page, if there is one.
+        Large responses are decoded and parsed in the parse executor, if set.
+        """
+        async with self._trace(uri, data) as trace:
+            async with (
+                self._schedule(),
+                self._guard(trace),
+                self._timeout(self._get_deadline()),
+            ):
+                raw = await self._request_raw(trace, uri, data=data)
+                if (
+                    self.parse_executor is None
+                    or len(raw) < self.parse_offload_threshold
+                ):
+                    body = self._decode(trace, raw)
+                    models = [model.from_api(item) for item in body[key]]
+                    next_offset = get_next_offset(body)
+                else:
+                    loop = asyncio.get_running_loop()
+                    parsed = await loop.run_in_executor(
+                        self.parse_executor,
+                        parse_response,
+                        raw,
+                        model,
+                        key,
+                    )
+                    trace.emit(TraceEventType.BODY_DECODED, response_bytes=len(raw))
+                    trace.emit(TraceEventType.STATUS_DISPATCHED, status=parsed.status)
+                    raise_for_status(parsed.status, parsed.error)
+                    models = parsed.decode(model)
+                    next_offset = parsed.next_offset
+            trace.emit(TraceEventType.MODELS_PARSED, model_count=len(models))
+        return models, next_offset
+
+    async def _request_models[ModelT: ApiModel](
+        self,
+        uri: str,
+        model: type[ModelT],
+        key: str,
+        *,
+        data: dict[str, Any],
+    ) -> list[ModelT]:
+        """Handle a request to Withings and parse the first page under key."""
+        models, _ = await self._request_page(uri, model, key, data=data)
+        return models
+
+    async def _iter_pages[ModelT: ApiModel](
+        self,
+        uri: str,
+        model: type[ModelT],
+        key: str,
+        *,
+        data: dict[str, Any],
+    ) -> AsyncIterator[list[ModelT]]:
+        """Request pages until the API reports there are no more."""
+        page_data = data
+        while True:
+            models, offset = await self._request_page(uri, model, key, data=page_data)
+            yield models
+            if offset is None or offset == page_data.get("offset"):
+                return
+            page_data = {**data, "offset": offset}
+
+    async def _stream_models[ModelT: ApiModel](
+        self,
+        uri: str,
+        model: type[ModelT],
+        key: str,
+        *,
+        data: dict[str, Any],
+    ) -> AsyncGenerator[ModelT]:
+        """Handle a request to Withings and parse the list under key as it arrives.
+
+        The status of the response is checked once the body is complete. Every
+        chunk is read under the deadline of the request, as a timeout cannot
+        span the yields.
+        """
+        async with self._trace(uri, data) as trace:
+            async with self._schedule(), self._guard(trace):
+                when = self._get_deadline()
+                async with self._timeout(when):
+                    response = await self._send(trace, uri, data=data)
+                stream = BodyItemStream(_get_content_encoding(response), ("body", key))
+                model_count = 0
+                try:
+                    while True:
+                        async with self._timeout(when):
+                            chunk = await response.content.read(self.stream_chunk_size)
+                        if not chunk:
+                            break
+                        for item in stream.feed(chunk):
+                            model_count += 1
+                            yield model.from_api(item)
+                finally:
+                    response.release()
+                self._decode_stream(trace, stream)
+            trace.emit(TraceEventType.MODELS_PARSED, model_count=model_count)
+
+    def _decode_stream(self, trace: RequestTrace, stream: BodyItemStream) -> None:
+        """Decode the rest of a streamed response and raise for its status."""
+        trace.emit(
+            TraceEventType.BODY_READ,
+            response_bytes=stream.response_bytes,
+            decompressed_bytes=stream.decompressed_bytes,
+            content_encoding=stream.content_encoding,
+        )
+        response_data = stream.close()
+        trace.emit(
+            TraceEventType.BODY_DECODED, response_bytes=stream.decompressed_bytes
+        )
+        status = response_data.get("status", -1)
+        trace.emit(TraceEventType.STATUS_DISPATCHED, status=status)
+        raise_for_status(status, response_data.get("error"))
 
     async def get_devices(self) -> list[Device]:
         """Get devices."""
@@ -160,21 +515,29 @@ class WithingsClient:
         response = await self._request("v2/user", data={"action": "getgoals"})
         return Goals.from_api(response["goals"])
 
-    async def _get_measurements(
-        self,
+    @staticmethod
+    def _get_measurement_data(
         measurement_types: list[MeasurementType] | None,
         base_data: dict[str, Any],
-    ) -> list[MeasurementGroup]:
+    ) -> dict[str, Any]:
         data = {**base_data, "action": "getmeas"}
         if measurement_types is not None:
             data["meastypes"] = ",".join(
                 [str(measurement_type) for measurement_type in measurement_types],
             )
-        response = await self._request("measure", data=data)
-        return [
-            MeasurementGroup.from_api(measurement_group)
-            for measurement_group in response["measuregrps"]
-        ]
+        return data
+
+    async def _get_measurements(
+        self,
+        measurement_types: list[MeasurementType] | None,
+        base_data: dict[str, Any],
+    ) -> list[MeasurementGroup]:
+        return await self._request_models(
+            "measure",
+            MeasurementGroup,
+            "measuregrps",
+            data=self._get_measurement_data(measurement_types, base_data),
+        )
 
     async def get_measurement_since(
         self,
@@ -202,13 +565,62 @@ class WithingsClient:
             },
         )
 
-    async def get_sleep(
+    async def get_measurement_column(
         self,
+        measurement_type: MeasurementType,
         start_date: datetime,
         end_date: datetime,
-        data_fields: list[SleepDataFields] | None = None,
-    ) -> list[SleepSeries]:
-        """Get sleep."""
+        position: MeasurementPosition | None = None,
+    ) -> MeasurementColumn:
+        """Get the exact values of a measurement type in a period as a column.
+
+        The column is built from the values and units of the API, following
+        every page, as parsed measurements only keep a float.
+        """
+        data = self._get_measurement_data(
+            [measurement_type],
+            {
+                "startdate": int(start_date.timestamp()),
+                "enddate": int(end_date.timestamp()),
+            },
+        )
+        groups: list[dict[str, Any]] = []
+        page_data = data
+        while True:
+            body = await self._request("measure", data=page_data)
+            groups.extend(body["measuregrps"])
+            offset = get_next_offset(body)
+            if offset is None or offset == page_data.get("offset"):
+                return MeasurementColumn.from_api_groups(
+                    groups, measurement_type, position
+                )
+            page_data = {**data, "offset": offset}
+
+    def iter_measurement_pages(
+        self,
+        start_date: datetime | None = None,
+        end_date: datetime | None = None,
+        *,
+        since: datetime | None = None,
+        measurement_types: list[MeasurementType] | None = None,
+    ) -> AsyncIterator[list[MeasurementGroup]]:
+        """Iterate over every page of measurements in a period or since."""
+        return self._iter_pages(
+            "measure",
+            MeasurementGroup,
+            "measuregrps",
+            data=self._get_measurement_data(
+                measurement_types,
+                _get_timestamp_range(since, start_date, end_date),
+            ),
+        )
+
+    @staticmethod
+    def _get_sleep_data(
+        start_date: datetime,
+        end_date: datetime,
+        data_fields: list[SleepDataFields] | None,
+    ) -> dict[str, Any]:
         data = {
             "action": "get",
             "startdate": int(start_date.timestamp()),
@@ -218,17 +630,46 @@ class WithingsClient:
             data["data_fields"] = ",".join(
                 [str(sleep_data_field) for sleep_data_field in data_fields],
             )
-        response = await self._request(
+        return data
+
+    async def get_sleep(
+        self,
+        start_date: datetime,
+        end_date: datetime,
+        data_fields: list[SleepDataFields] | None = None,
+    ) -> list[SleepSeries]:
+        """Get sleep."""
+        return await self._request_models(
             "v2/sleep",
-            data=data,
+            SleepSeries,
+            "series",
+            data=self._get_sleep_data(start_date, end_date, data_fields),
         )
-        return [SleepSeries.from_api(sleep) for sleep in response["series"]]
 
-    async def _get_sleep_summary(
+    def iter_sleep(
         self,
+        start_date: datetime,
+        end_date: datetime,
+        data_fields: list[SleepDataFields] | None = None,
+    ) -> AsyncGenerator[SleepSeries]:
+        """Iterate over sleep series while the response is being received.
+
+        Each series is parsed as soon as it arrives, so memory scales with a
+        single series instead of the whole response. Call aclose when
+        stopping early, to release the response right away.
+        """
+        return self._stream_models(
+            "v2/sleep",
+            SleepSeries,
+            "series",
+            data=self._get_sleep_data(start_date, end_date, data_fields),
+        )
+
+    @staticmethod
+    def _get_sleep_summary_data(
         sleep_summary_data_fields: list[SleepSummaryDataFields] | None,
         base_data: dict[str, Any],
-    ) -> list[SleepSummary]:
+    ) -> dict[str, Any]:
         data = {**base_data, "action": "getsummary"}
         if sleep_summary_data_fields is not None:
             data["data_fields"] = ",".join(
@@ -237,11 +678,19 @@ class WithingsClient:
                     for sleep_data_field in sleep_summary_data_fields
                 ],
             )
-        response = await self._request(
+        return data
+
+    async def _get_sleep_summary(
+        self,
+        sleep_summary_data_fields: list[SleepSummaryDataFields] | None,
+        base_data: dict[str, Any],
+    ) -> list[SleepSummary]:
+        return await self._request_models(
             "v2/sleep",
-            data=data,
+            SleepSummary,
+            "series",
+            data=self._get_sleep_summary_data(sleep_summary_data_fields, base_data),
         )
-        return [SleepSummary.from_api(sleep) for sleep in response["series"]]
 
     async def get_sleep_summary_since(
         self,
@@ -266,11 +715,30 @@ class WithingsClient:
             {"startdateymd": str(start_date), "enddateymd": str(end_date)},
         )
 
-    async def _get_activities(
+    def iter_sleep_summary_pages(
         self,
+        start_date: date | None = None,
+        end_date: date | None = None,
+        *,
+        since: datetime | None = None,
+        sleep_summary_data_fields: list[SleepSummaryDataFields] | None = None,
+    ) -> AsyncIterator[list[SleepSummary]]:
+        """Iterate over every page of sleep summaries in a period or since."""
+        return self._iter_pages(
+            "v2/sleep",
+            SleepSummary,
+            "series",
+            data=self._get_sleep_summary_data(
+                sleep_summary_data_fields,
+                _get_date_range(since, start_date, end_date),
+            ),
+        )
+
+    @staticmethod
+    def _get_activity_data(
         activity_data_fields: list[ActivityDataFields] | None,
         base_data: dict[str, Any],
-    ) -> list[Activity]:
+    ) -> dict[str, Any]:
         data = {**base_data, "action": "getactivity"}
         if activity_data_fields is not None:
             data["data_fields"] = ",".join(
@@ -279,11 +747,19 @@ class WithingsClient:
                     for activity_data_field in activity_data_fields
                 ],
             )
-        response = await self._request(
+        return data
+
+    async def _get_activities(
+        self,
+        activity_data_fields: list[ActivityDataFields] | None,
+        base_data: dict[str, Any],
+    ) -> list[Activity]:
+        return await self._request_models(
             "v2/measure",
-            data=data,
+            Activity,
+            "activities",
+            data=self._get_activity_data(activity_data_fields, base_data),
         )
-        return [Activity.from_api(activity) for activity in response["activities"]]
 
     async def get_activities_since(
         self,
@@ -308,21 +784,48 @@ class WithingsClient:
             {"startdateymd": str(start_date), "enddateymd": str(end_date)},
         )
 
-    async def _get_workouts(
+    def iter_activity_pages(
         self,
+        start_date: date | None = None,
+        end_date: date | None = None,
+        *,
+        since: datetime | None = None,
+        activity_data_fields: list[ActivityDataFields] | None = None,
+    ) -> AsyncIterator[list[Activity]]:
+        """Iterate over every page of activities in a period or since."""
+        return self._iter_pages(
+            "v2/measure",
+            Activity,
+            "activities",
+            data=self._get_activity_data(
+                activity_data_fields,
+                _get_date_range(since, start_date, end_date),
+            ),
+        )
+
+    @staticmethod
+    def _get_workout_data(
         workout_data_fields: list[WorkoutDataFields] | None,
         base_data: dict[str, Any],
-    ) -> list[Workout]:
+    ) -> dict[str, Any]:
         data = {**base_data, "action": "getworkouts"}
         if workout_data_fields is not None:
             data["data_fields"] = ",".join(
                 [str(workout_data_field) for workout_data_field in workout_data_fields],
             )
-        response = await self._request(
+        return data
+
+    async def _get_workouts(
+        self,
+        workout_data_fields: list[WorkoutDataFields] | None,
+        base_data: dict[str, Any],
+    ) -> list[Workout]:
+        return await self._request_models(
             "v2/measure",
-            data=data,
+            Workout,
+            "series",
+            data=self._get_workout_data(workout_data_fields, base_data),
         )
-        return [Workout.from_api(workout) for workout in response["series"]]
 
     async def get_workouts_since(
         self,
@@ -347,6 +850,25 @@ class WithingsClient:
             {"startdateymd": str(start_date), "enddateymd": str(end_date)},
         )
 
+    def iter_workout_pages(
+        self,
+        start_date: date | None = None,
+        end_date: date | None = None,
+        *,
+        since: datetime | None = None,
+        workout_data_fields: list[WorkoutDataFields] | None = None,
+    ) -> AsyncIterator[list[Workout]]:
+        """Iterate over every page of workouts in a period or since."""
+        return self._iter_pages(
+            "v2/measure",
+            Workout,
+            "series",
+            data=self._get_workout_data(
+                workout_data_fields,
+                _get_date_range(since, start_date, end_date),
+            ),
+        )
+
     async def subscribe_notification(
         self,
         callback_url: str,
@@ -0,0 +1,75 @@
+"""Asynchronous Python client for Withings."""
+
+from __future__ import annotations
+
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+import hashlib
+import multiprocessing
+import os
+from typing import TYPE_CHECKING
+
+from .quota import QuotaLedger
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable, Iterable
+    from pathlib import Path
+
+
+def get_shard(user_id: str | int, shards: int) -> int:
+    """Return the shard of a user, which is the same in every process and run."""
+    digest = hashlib.blake2b(str(user_id).encode(), digest_size=8).digest()
+    return int.from_bytes(digest) % shards
+
+
+def run_sharded[UserT, ResultT](
+    users: Iterable[UserT],
+    worker: Callable[[list[UserT], QuotaLedger], Awaitable[ResultT]],
+    ledger: QuotaLedger,
+    *,
+    processes: int | None = None,
+    key: Callable[[UserT], str | int] = str,
+) -> list[ResultT]:
+    """Run a worker per process on a shard of the users and return the results.
+
+    Users are sharded by a hash of key, so a user always lands in the same
+    shard. Every process runs worker in its own event loop with its own
+    connection to the file of ledger. The worker passes that ledger to its
+    clients as quota, so all processes share the request quota of the
+    application. Processes are spawned rather than forked, as acquiring the
+    quota starts threads, and the worker must be a module level function, so
+    it can be sent to them. Results are returned in shard order.
+    """
+    processes = processes or os.cpu_count() or 1
+    shards: list[list[UserT]] = [[] for _ in range(processes)]
+    for user in users:
+        shards[get_shard(key(user), processes)].append(user)
+    with ProcessPoolExecutor(
+        processes, mp_context=multiprocessing.get_context("spawn")
+    ) as executor:
+        futures = [
+            executor.submit(
+                _run_shard, worker, shard, ledger.path, ledger.limit, ledger.period
+            )
+            for shard in shards
+        ]
+        return [future.result() for future in futures]
+
+
+def _run_shard[UserT, ResultT](
+    worker: Callable[[list[UserT], QuotaLedger], Awaitable[ResultT]],
+    users: list[UserT],
+    ledger_path: str | Path,
+    limit: int,
+    period: float,
+) -> ResultT:
+    """Run the worker of a shard in the event loop of the process."""
+    ledger = QuotaLedger(ledger_path, limit, period)
+
+    async def run() -> ResultT:
+        return await worker(users, ledger)
+
+    try:
+        return asyncio.run(run())
+    finally:
+        ledger.close()
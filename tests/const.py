@@ -2,6 +2,8 @@
 
 from importlib import metadata
 
+from aiowithings.compression import ACCEPT_ENCODING
+
 WITHINGS_URL = "https://wbsapi.withings.net"
 
 version = metadata.version("aiowithings")
@@ -9,5 +11,6 @@ version = metadata.version("aiowithings")
 HEADERS = {
     "User-Agent": f"AioWithings/{version}",
     "Accept": "application/json, text/plain, */*",
+    "Accept-Encoding": ACCEPT_ENCODING,
     "Authorization": "Bearer test",
 }
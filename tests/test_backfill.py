@@ -0,0 +1,238 @@
+"""Asynchronous Python client for Withings."""
+
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+import json
+from typing import TYPE_CHECKING, Any
+
+from aioresponses import CallbackResult, aioresponses
+import pytest
+
+from aiowithings import (
+    BackfillDataType,
+    BackfillOrchestrator,
+    BackfillProgress,
+    BackfillSink,
+    BackfillWindow,
+    Device,
+    JsonCheckpointStore,
+    WithingsClient,
+    plan_windows,
+)
+from aiowithings.backfill import get_backfill_start
+from aiowithings.scheduling import RequestPriority, get_priority
+
+from . import load_fixture
+from .const import WITHINGS_URL
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+_FIXTURES = {
+    "getdevice": "device.json",
+    "getmeas": "measurement.json",
+    "getsummary": "sleep_summary.json",
+    "getactivity": "activity.json",
+    "getworkouts": "workouts.json",
+}
+
+
+class _ListSink(BackfillSink):
+    def __init__(self, fail_on: BackfillWindow | None = None) -> None:
+        self.pages: list[tuple[BackfillWindow, int]] = []
+        self.priorities: set[RequestPriority | None] = set()
+        self.fail_on = fail_on
+
+    async def write(self, window: BackfillWindow, models: list[Any]) -> None:
+        if window == self.fail_on:
+            msg = "Sink is full"
+            raise OSError(msg)
+        self.pages.append((window, len(models)))
+        self.priorities.add(get_priority())
+
+
+@pytest.fixture(name="api")
+def api_fixture(responses: aioresponses) -> list[dict[str, Any]]:
+    """Answer every endpoint with its fixture and record the request data."""
+    requests: list[dict[str, Any]] = []
+
+    def respond(_: Any, **kwargs: Any) -> CallbackResult:
+        requests.append(kwargs["data"])
+        return CallbackResult(body=load_fixture(_FIXTURES[kwargs["data"]["action"]]))
+
+    for uri in ("v2/user", "measure", "v2/sleep", "v2/measure"):
+        responses.post(f"{WITHINGS_URL}/{uri}", callback=respond, repeat=True)
+    return requests
+
+
+def _date(day: int) -> datetime:
+    return datetime(2023, 9, day, tzinfo=UTC)
+
+
+def test_plan_windows() -> None:
+    """Test windows are aligned to midnight and end at the end of the period."""
+    windows = plan_windows(
+        _date(4) + timedelta(hours=5),
+        _date(20) + timedelta(hours=12),
+        timedelta(days=7),
+        [BackfillDataType.WORKOUTS],
+    )
+
+    assert [(window.start, window.end) for window in windows] == [
+        (_date(4), _date(11)),
+        (_date(11), _date(18)),
+        (_date(18), _date(20) + timedelta(hours=12)),
+    ]
+    assert windows[0].key == "workouts/1693785600-1694390400"
+
+
+def test_backfill_start() -> None:
+    """Test the backfill starts at the first session of the oldest device."""
+    body = json.loads(load_fixture("device.json"))["body"]
+    devices = [Device.from_api(device) for device in body["devices"]]
+
+    assert get_backfill_start(devices) == datetime.fromtimestamp(1693867179, tz=UTC)
+    assert get_backfill_start(devices[:1]) is None
+
+
+def test_checkpoint_store(tmp_path: Path) -> None:
+    """Test completed windows survive a new store on the same file."""
+    path = tmp_path / "checkpoint.json"
+    store = JsonCheckpointStore(path)
+    assert store.load() == set()
+
+    store.mark_completed("workouts/1-2")
+    store.mark_completed("activities/1-2")
+
+    assert JsonCheckpointStore(path).load() == {"workouts/1-2", "activities/1-2"}
+    assert [file.name for file in tmp_path.iterdir()] == ["checkpoint.json"]
+    assert store.load_end() is None
+
+    store.save_end(_date(20))
+
+    assert JsonCheckpointStore(path).load_end() == _date(20)
+    assert JsonCheckpointStore(path).load() == {"workouts/1-2", "activities/1-2"}
+
+
+async def test_backfill(
+    api: list[dict[str, Any]],
+    authenticated_client: WithingsClient,
+    tmp_path: Path,
+) -> None:
+    """Test every window of every data type is fetched and written."""
+    sink = _ListSink()
+    events: list[BackfillProgress] = []
+    orchestrator = BackfillOrchestrator(
+        authenticated_client,
+        sink,
+        JsonCheckpointStore(tmp_path / "checkpoint.json"),
+        window_size=timedelta(days=7),
+        on_progress=events.append,
+    )
+
+    written = await orchestrator.run(end=_date(20))
+
+    assert api[0] == {"action": "getdevice"}
+    windows = {window for window, _ in sink.pages}
+    assert len(windows) == 12
+    assert written == sum(models for _, models in sink.pages)
+    assert sink.priorities == {RequestPriority.BACKFILL}
+    assert {
+        (request["action"], request.get("startdateymd"), request.get("enddateymd"))
+        for request in api
+        if request["action"] == "getworkouts"
+    } == {
+        ("getworkouts", "2023-09-04", "2023-09-10"),
+        ("getworkouts", "2023-09-11", "2023-09-17"),
+        ("getworkouts", "2023-09-18", "2023-09-19"),
+    }
+    assert {
+        (request["startdate"], request["enddate"])
+        for request in api
+        if request["action"] == "getmeas"
+    } == {
+        (1693785600, 1694390399),
+        (1694390400, 1694995199),
+        (1694995200, 1695167999),
+    }
+    assert events[-1].completed_windows == events[-1].total_windows == 12
+    assert sum(event.window_completed for event in events) == 12
+
+
+async def test_backfill_resumes(
+    api: list[dict[str, Any]],
+    authenticated_client: WithingsClient,
+    tmp_path: Path,
+) -> None:
+    """Test a failed backfill only fetches the unfinished windows again."""
+    store = JsonCheckpointStore(tmp_path / "checkpoint.json")
+    failing = BackfillWindow(BackfillDataType.ACTIVITIES, _date(4), _date(11))
+
+    with pytest.raises(ExceptionGroup):
+        await BackfillOrchestrator(
+            authenticated_client,
+            _ListSink(fail_on=failing),
+            store,
+            window_size=timedelta(days=7),
+            max_concurrency=1,
+        ).run(_date(4), _date(18), [BackfillDataType.ACTIVITIES])
+    api.clear()
+    sink = _ListSink()
+    await BackfillOrchestrator(
+        authenticated_client,
+        sink,
+        JsonCheckpointStore(store.path),
+        window_size=timedelta(days=7),
+    ).run(_date(4), _date(18), [BackfillDataType.ACTIVITIES])
+
+    assert [window for window, _ in sink.pages] == [failing]
+    assert len(api) == 1
+
+
+async def test_backfill_keeps_end(
+    api: list[dict[str, Any]],
+    authenticated_client: WithingsClient,
+    tmp_path: Path,
+) -> None:
+    """Test a resumed backfill without end plans the windows of the first run."""
+    store = JsonCheckpointStore(tmp_path / "checkpoint.json")
+    start = datetime.now(tz=UTC) - timedelta(days=3)
+    sinks = [_ListSink(), _ListSink()]
+    for sink in sinks:
+        await BackfillOrchestrator(
+            authenticated_client,
+            sink,
+            JsonCheckpointStore(store.path),
+            window_size=timedelta(days=1),
+        ).run(start, data_types=[BackfillDataType.WORKOUTS])
+
+    end = store.load_end()
+    assert end is not None
+    assert start < end <= datetime.now(tz=UTC)
+    assert max(window.end for window, _ in sinks[0].pages) == end
+    assert sinks[1].pages == []
+    assert len(api) == len(sinks[0].pages)
+
+
+async def test_backfill_without_devices(
+    responses: aioresponses,
+    authenticated_client: WithingsClient,
+    tmp_path: Path,
+) -> None:
+    """Test nothing is fetched for a user without sessions."""
+    responses.post(
+        f"{WITHINGS_URL}/v2/user",
+        status=200,
+        body='{"status": 0, "body": {"devices": []}}',
+    )
+    sink = _ListSink()
+
+    written = await BackfillOrchestrator(
+        authenticated_client,
+        sink,
+        JsonCheckpointStore(tmp_path / "checkpoint.json"),
+    ).run()
+
+    assert written == 0
+    assert sink.pages == []
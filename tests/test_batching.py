@@ -0,0 +1,284 @@
+"""Asynchronous Python client for Withings."""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import UTC, datetime
+import json
+from typing import Any
+
+from aioresponses import CallbackResult, aioresponses
+import pytest
+
+from aiowithings import (
+    MeasurementBatcher,
+    MeasurementType,
+    RequestPriority,
+    WithingsClient,
+    WithingsErrorOccurredError,
+    deadline,
+    priority,
+)
+
+from .const import WITHINGS_URL
+
+WEIGHT = [MeasurementType.WEIGHT]
+BLOOD_PRESSURE = [
+    MeasurementType.DIASTOLIC_BLOOD_PRESSURE,
+    MeasurementType.SYSTOLIC_BLOOD_PRESSURE,
+]
+
+
+def _group(group_id: int, timestamp: int, types: list[int]) -> dict[str, Any]:
+    return {
+        "grpid": group_id,
+        "attrib": 0,
+        "date": timestamp,
+        "created": timestamp,
+        "modified": timestamp,
+        "category": 1,
+        "deviceid": "f998be4b9ccc9e136fd8cd8e8e344c31ec3b271d",
+        "hash_deviceid": "f998be4b9ccc9e136fd8cd8e8e344c31ec3b271d",
+        "measures": [
+            {"value": 80, "type": measurement_type, "unit": 0, "algo": 3, "fm": 3}
+            for measurement_type in types
+        ],
+        "modelid": 5,
+        "model": "Body+",
+        "comment": None,
+    }
+
+
+@pytest.fixture(name="requests")
+def requests_fixture(responses: aioresponses) -> list[dict[str, Any]]:
+    """Answer measurement requests and record the request data."""
+    requests: list[dict[str, Any]] = []
+    body = {
+        "status": 0,
+        "body": {
+            "updatetime": 2000,
+            "timezone": "Europe/Amsterdam",
+            "measuregrps": [
+                _group(1, 1000, [1]),
+                _group(2, 2000, [9, 10]),
+                _group(3, 3000, [1, 9, 10]),
+            ],
+        },
+    }
+
+    def respond(_: Any, **kwargs: Any) -> CallbackResult:
+        requests.append(kwargs["data"])
+        return CallbackResult(body=json.dumps(body))
+
+    responses.post(f"{WITHINGS_URL}/measure", callback=respond, repeat=True)
+    return requests
+
+
+def _at(timestamp: int) -> datetime:
+    return datetime.fromtimestamp(timestamp, tz=UTC)
+
+
+def _summary(groups: list[Any]) -> list[tuple[int, list[int]]]:
+    return [
+        (
+            group.group_id,
+            [measurement.measurement_type for measurement in group.measurements],
+        )
+        for group in groups
+    ]
+
+
+async def test_merge_since_queries(
+    requests: list[dict[str, Any]],
+    authenticated_client: WithingsClient,
+) -> None:
+    """Test concurrent since queries are sent as one request and split."""
+    batcher = MeasurementBatcher(authenticated_client)
+
+    weight, blood_pressure = await asyncio.gather(
+        batcher.get_measurement_since(_at(500), WEIGHT),
+        batcher.get_measurement_since(_at(1500), BLOOD_PRESSURE),
+    )
+
+    assert requests == [{"action": "getmeas", "lastupdate": 500, "meastypes": "1,9,10"}]
+    assert _summary(weight) == [(1, [1]), (3, [1])]
+    assert _summary(blood_pressure) == [(2, [9, 10]), (3, [9, 10])]
+
+
+async def test_merge_period_queries(
+    requests: list[dict[str, Any]],
+    authenticated_client: WithingsClient,
+) -> None:
+    """Test period queries are merged into the widest window."""
+    batcher = MeasurementBatcher(authenticated_client)
+
+    everything, early, late = await asyncio.gather(
+        batcher.get_measurement_in_period(_at(1000), _at(2000)),
+        batcher.get_measurement_in_period(_at(500), _at(1500), WEIGHT),
+        batcher.get_measurement_in_period(_at(2500), _at(3500), WEIGHT),
+    )
+
+    assert requests == [{"action": "getmeas", "startdate": 500, "enddate": 3500}]
+    assert _summary(everything) == [(1, [1]), (2, [9, 10])]
+    assert _summary(early) == [(1, [1])]
+    assert _summary(late) == [(3, [1])]
+
+
+async def test_single_query(
+    requests: list[dict[str, Any]],
+    authenticated_client: WithingsClient,
+) -> None:
+    """Test a query on its own gets the response unchanged."""
+    batcher = MeasurementBatcher(authenticated_client)
+
+    since, period = await asyncio.gather(
+        batcher.get_measurement_since(_at(500), BLOOD_PRESSURE),
+        batcher.get_measurement_in_period(_at(500), _at(2500), BLOOD_PRESSURE),
+    )
+
+    assert len(requests) == 2
+    assert _summary(since) == [(1, [1]), (2, [9, 10]), (3, [1, 9, 10])]
+    assert _summary(period) == _summary(since)
+
+
+async def test_errors_and_cancelled_queries(
+    responses: aioresponses,
+    authenticated_client: WithingsClient,
+) -> None:
+    """Test errors reach every waiting query and cancelled queries are skipped."""
+    responses.post(
+        f"{WITHINGS_URL}/measure",
+        status=200,
+        body='{"status": 215, "body": {}}',
+    )
+    batcher = MeasurementBatcher(authenticated_client)
+
+    cancelled = asyncio.create_task(batcher.get_measurement_since(_at(500)))
+    waiting = asyncio.create_task(batcher.get_measurement_since(_at(500)))
+    await asyncio.sleep(0)
+    cancelled.cancel()
+
+    with pytest.raises(WithingsErrorOccurredError):
+        await waiting
+    with pytest.raises(asyncio.CancelledError):
+        await cancelled
+
+
+async def test_cancelled_queries(
+    requests: list[dict[str, Any]],
+    authenticated_client: WithingsClient,
+) -> None:
+    """Test the other queries of a batch get results if one is cancelled."""
+    batcher = MeasurementBatcher(authenticated_client)
+
+    cancelled = asyncio.create_task(batcher.get_measurement_since(_at(500)))
+    waiting = asyncio.create_task(batcher.get_measurement_since(_at(500)))
+    await asyncio.sleep(0)
+    cancelled.cancel()
+
+    assert len(await waiting) == 3
+    assert len(requests) == 1
+
+
+async def test_queries_of_other_contexts(
+    requests: list[dict[str, Any]],
+    authenticated_client: WithingsClient,
+) -> None:
+    """Test only queries with the same deadline and priority are merged."""
+    batcher = MeasurementBatcher(authenticated_client)
+
+    async def backfill() -> list[Any]:
+        with priority(RequestPriority.BACKFILL):
+            return await batcher.get_measurement_since(_at(500))
+
+    async def within_deadline() -> list[Any]:
+        with deadline(10):
+            return await batcher.get_measurement_since(_at(500))
+
+    results = await asyncio.gather(
+        batcher.get_measurement_since(_at(500), WEIGHT),
+        backfill(),
+        within_deadline(),
+        batcher.get_measurement_since(_at(1500), BLOOD_PRESSURE),
+    )
+
+    assert len(requests) == 3
+    assert [len(groups) for groups in results] == [2, 3, 3, 2]
+
+
+@pytest.mark.parametrize("delay", [0.005, 1])
+async def test_cancelled_batch(
+    responses: aioresponses,
+    authenticated_client: WithingsClient,
+    delay: float,
+) -> None:
+    """Test cancelling a batch, while waiting or in flight, cancels its queries."""
+
+    async def respond(*_: Any, **__: Any) -> None:
+        await asyncio.sleep(10)
+
+    responses.post(f"{WITHINGS_URL}/measure", callback=respond)
+    batcher = MeasurementBatcher(authenticated_client, delay=delay)
+
+    waiting = asyncio.create_task(batcher.get_measurement_since(_at(500)))
+    await asyncio.sleep(0.05)
+    (task,) = batcher._tasks
+    task.cancel()
+
+    with pytest.raises(asyncio.CancelledError):
+        await waiting
+    assert task.cancelled()
+    assert batcher._batches == {}
+
+
+async def test_merged_query_follows_pages(
+    responses: aioresponses,
+    authenticated_client: WithingsClient,
+) -> None:
+    """Test a merged request gets every page of the widest window."""
+    requests: list[dict[str, Any]] = []
+    pages: list[dict[str, Any]] = [
+        {"measuregrps": [_group(1, 1000, [1])], "more": 1, "offset": 1},
+        {"measuregrps": [_group(2, 2000, [9, 10]), _group(3, 3000, [1, 9, 10])]},
+    ]
+
+    def respond(_: Any, **kwargs: Any) -> CallbackResult:
+        requests.append(kwargs["data"])
+        body = {"updatetime": 2000, "timezone": "Europe/Amsterdam"}
+        return CallbackResult(
+            body=json.dumps({"status": 0, "body": {**body, **pages[len(requests) - 1]}})
+        )
+
+    responses.post(f"{WITHINGS_URL}/measure", callback=respond, repeat=True)
+    batcher = MeasurementBatcher(authenticated_client)
+
+    weight, blood_pressure = await asyncio.gather(
+        batcher.get_measurement_in_period(_at(500), _at(3500), WEIGHT),
+        batcher.get_measurement_in_period(_at(1500), _at(3500), BLOOD_PRESSURE),
+    )
+
+    assert [request.get("offset") for request in requests] == [None, 1]
+    assert _summary(weight) == [(1, [1]), (3, [1])]
+    assert _summary(blood_pressure) == [(2, [9, 10]), (3, [9, 10])]
+
+
+async def test_bounds_truncated_to_seconds(
+    requests: list[dict[str, Any]],
+    authenticated_client: WithingsClient,
+) -> None:
+    """Test the bounds of a query select as the whole seconds the API receives."""
+    batcher = MeasurementBatcher(authenticated_client)
+
+    since, _, period, _ = await asyncio.gather(
+        batcher.get_measurement_since(datetime.fromtimestamp(2000.5, tz=UTC)),
+        batcher.get_measurement_since(_at(500)),
+        batcher.get_measurement_in_period(
+            datetime.fromtimestamp(1000.5, tz=UTC),
+            datetime.fromtimestamp(2000.5, tz=UTC),
+        ),
+        batcher.get_measurement_in_period(_at(500), _at(3500)),
+    )
+
+    assert len(requests) == 2
+    assert _summary(since) == [(2, [9, 10]), (3, [1, 9, 10])]
+    assert _summary(period) == [(1, [1]), (2, [9, 10])]
@@ -0,0 +1,76 @@
+"""Asynchronous Python client for Withings."""
+
+from __future__ import annotations
+
+from benchmarks import import_time, throughput
+from benchmarks.parsing import AGGREGATE_BENCHMARKS, format_results, run
+from benchmarks.payloads import PAYLOAD_GENERATORS, generate_records
+from benchmarks.server import build_responses
+import pytest
+
+
+@pytest.mark.parametrize("name", list(PAYLOAD_GENERATORS))
+def test_synthetic_payloads_parse(name: str) -> None:
+    """Test the synthetic payloads are accepted by the models."""
+    model, generator = PAYLOAD_GENERATORS[name]
+
+    records = generate_records(generator, 25, seed=1)
+
+    assert records == generate_records(generator, 25, seed=1)
+    assert all(isinstance(model.from_api(record), model) for record in records)
+
+
+def test_parsing_benchmark() -> None:
+    """Test the parsing benchmarks run and report every benchmark."""
+    names = [*PAYLOAD_GENERATORS, *AGGREGATE_BENCHMARKS]
+
+    results = run(names, [10])
+
+    assert len(results) == len(names)
+    assert all(result.records == 10 for result in results)
+    assert all(result.throughput > 0 for result in results)
+    assert "records/s" in format_results(results)
+
+
+def test_codec_benchmark() -> None:
+    """Test decoding cached models is benchmarked next to every model."""
+    results = run(["sleep_summary", "aggregate_measurements"], [10], codec=True)
+
+    assert [result.name for result in results] == [
+        "SleepSummary.from_api",
+        "SleepSummary decode_models",
+        "aggregate_measurements",
+    ]
+
+
+async def test_throughput_benchmark() -> None:
+    """Test the throughput benchmark drives the client against the stub."""
+    results = await throughput.run(
+        list(throughput.OPERATIONS),
+        requests=3,
+        concurrency=2,
+        records=2,
+    )
+
+    assert [result.name for result in results] == list(throughput.OPERATIONS)
+    assert all(len(result.latencies) == 3 for result in results)
+    assert "p99 ms" in throughput.format_results(results)
+
+
+def test_throughput_breakdown() -> None:
+    """Test the phase breakdown covers every stubbed endpoint."""
+    phases = throughput.breakdown(records=2, iterations=1)
+
+    assert set(phases) == set(build_responses(2, seed=0))
+    assert all(phase["parse"] > 0 for phase in phases.values())
+    assert "decode us" in throughput.format_breakdown(phases)
+
+
+def test_import_time_benchmark() -> None:
+    """Test importing the package does not load the client or the models."""
+    package, client = import_time.run(["package", "client"], runs=1)
+
+    assert package.loaded == []
+    assert "aiohttp" in client.loaded
+    assert "aiowithings.withings" in client.loaded
+    assert "median ms" in import_time.format_results([package, client])
@@ -0,0 +1,279 @@
+"""Asynchronous Python client for Withings."""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import UTC, datetime
+import json
+from typing import Any
+
+import aiohttp
+from aioresponses import CallbackResult, aioresponses
+import pytest
+
+from aiowithings import (
+    CircuitBreaker,
+    CircuitState,
+    CircuitStateChange,
+    WithingsCircuitOpenError,
+    WithingsClient,
+    WithingsConnectionError,
+    WithingsError,
+    WithingsErrorOccurredError,
+    WithingsInvalidParamsError,
+)
+from aiowithings.tracing import TraceEvent, TraceEventType
+
+from . import load_fixture
+from .const import WITHINGS_URL
+
+HOST = "wbsapi.withings.net"
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture(name="clock")
+def clock_fixture() -> _Clock:
+    """Return a clock that only moves when told to."""
+    return _Clock()
+
+
+@pytest.fixture(name="changes")
+def changes_fixture() -> list[CircuitStateChange]:
+    """Return the list the state changes are recorded in."""
+    return []
+
+
+@pytest.fixture(name="breaker")
+def breaker_fixture(
+    clock: _Clock,
+    changes: list[CircuitStateChange],
+) -> CircuitBreaker:
+    """Return a breaker that opens after two failures."""
+    return CircuitBreaker(
+        failure_threshold=2,
+        reset_timeout=10,
+        half_open_probes=2,
+        on_state_change=changes.append,
+        clock=clock,
+    )
+
+
+def _fail(breaker: CircuitBreaker, times: int = 1) -> None:
+    for _ in range(times):
+        breaker.before_request(HOST, "measure")
+        breaker.record_failure(HOST, "measure")
+
+
+def test_circuit_opens_after_consecutive_failures(
+    breaker: CircuitBreaker,
+    changes: list[CircuitStateChange],
+) -> None:
+    """Test only consecutive failures open the circuit."""
+    _fail(breaker)
+    breaker.before_request(HOST, "measure")
+    breaker.record_success(HOST, "measure")
+    _fail(breaker)
+    assert breaker.get_state(HOST, "measure") is CircuitState.CLOSED
+
+    _fail(breaker)
+
+    assert breaker.get_state(HOST, "measure") is CircuitState.OPEN
+    assert breaker.get_state(HOST, "v2/sleep") is CircuitState.CLOSED
+    assert changes == [
+        CircuitStateChange(HOST, "measure", CircuitState.CLOSED, CircuitState.OPEN, 2)
+    ]
+    with pytest.raises(WithingsCircuitOpenError, match="measure"):
+        breaker.before_request(HOST, "measure")
+
+
+def test_half_open_probes_close_circuit(
+    breaker: CircuitBreaker,
+    clock: _Clock,
+    changes: list[CircuitStateChange],
+) -> None:
+    """Test the circuit closes once all probes succeeded."""
+    _fail(breaker, 2)
+    clock.now = 10
+
+    breaker.before_request(HOST, "measure")
+    breaker.before_request(HOST, "measure")
+    with pytest.raises(WithingsCircuitOpenError):
+        breaker.before_request(HOST, "measure")
+    breaker.record_success(HOST, "measure")
+    assert breaker.get_state(HOST, "measure") is CircuitState.HALF_OPEN
+    breaker.record_success(HOST, "measure")
+
+    assert breaker.get_state(HOST, "measure") is CircuitState.CLOSED
+    assert [change.state for change in changes] == [
+        CircuitState.OPEN,
+        CircuitState.HALF_OPEN,
+        CircuitState.CLOSED,
+    ]
+
+
+def test_failed_probe_opens_circuit(
+    breaker: CircuitBreaker,
+    clock: _Clock,
+) -> None:
+    """Test a failing probe opens the circuit for another reset timeout."""
+    _fail(breaker, 2)
+    clock.now = 10
+
+    _fail(breaker)
+
+    assert breaker.get_state(HOST, "measure") is CircuitState.OPEN
+    clock.now = 19
+    with pytest.raises(WithingsCircuitOpenError):
+        breaker.before_request(HOST, "measure")
+
+
+def test_released_probe(breaker: CircuitBreaker, clock: _Clock) -> None:
+    """Test a probe without outcome frees its slot."""
+    _fail(breaker, 2)
+    clock.now = 10
+    breaker.before_request(HOST, "measure")
+    breaker.before_request(HOST, "measure")
+
+    breaker.release(HOST, "measure")
+    breaker.before_request(HOST, "measure")
+    breaker.release(HOST, "measure")
+    breaker.release(HOST, "measure")
+    breaker.release(HOST, "measure")
+
+    assert breaker.get_state(HOST, "measure") is CircuitState.HALF_OPEN
+
+
+async def test_client_fails_fast(
+    responses: aioresponses,
+    authenticated_client: WithingsClient,
+    breaker: CircuitBreaker,
+) -> None:
+    """Test the client stops sending requests while the circuit is open."""
+    response_data = json.loads(load_fixture("device.json"))
+    responses.post(
+        f"{WITHINGS_URL}/v2/user",
+        status=200,
+        body=json.dumps({**response_data, "status": 215}),
+    )
+    responses.post(
+        f"{WITHINGS_URL}/v2/user",
+        exception=aiohttp.ClientConnectionError(),
+    )
+    authenticated_client.circuit_breaker = breaker
+    events: list[TraceEvent] = []
+    authenticated_client.tracers.append(events.append)
+
+    with pytest.raises(WithingsErrorOccurredError):
+        await authenticated_client.get_devices()
+    with pytest.raises(aiohttp.ClientConnectionError):
+        await authenticated_client.get_devices()
+    with pytest.raises(WithingsCircuitOpenError):
+        await authenticated_client.get_devices()
+
+    assert len(responses.requests[next(iter(responses.requests))]) == 2
+    assert events[-1].event_type is TraceEventType.REQUEST_FAILED
+    assert isinstance(events[-1].error, WithingsCircuitOpenError)
+
+
+@pytest.mark.parametrize("stream", [True, False])
+async def test_client_records_outcomes(
+    responses: aioresponses,
+    authenticated_client: WithingsClient,
+    breaker: CircuitBreaker,
+    stream: bool,  # noqa: FBT001
+) -> None:
+    """Test timeouts count as failures and other errors as reaching the API."""
+    calls = 0
+
+    async def respond(_: str, **_kwargs: Any) -> CallbackResult:
+        nonlocal calls
+        calls += 1
+        if calls % 2:
+            await asyncio.sleep(10)
+        return CallbackResult(body='{"status": 201, "body": {}}')
+
+    responses.post(f"{WITHINGS_URL}/v2/sleep", callback=respond, repeat=True)
+    authenticated_client.circuit_breaker = breaker
+    authenticated_client.request_timeout = 0.05
+
+    async def get_sleep() -> None:
+        if stream:
+            async for _ in authenticated_client.iter_sleep(start, end):
+                pass  # pragma: no cover
+        else:
+            await authenticated_client.get_sleep(start, end)
+
+    start = end = datetime.fromtimestamp(0, tz=UTC)
+    with pytest.raises(WithingsConnectionError):
+        await get_sleep()
+    with pytest.raises(WithingsInvalidParamsError):
+        await get_sleep()
+    with pytest.raises(WithingsConnectionError):
+        await get_sleep()
+
+    assert breaker.get_state(HOST, "v2/sleep") is CircuitState.CLOSED
+
+
+async def test_client_success(
+    responses: aioresponses,
+    authenticated_client: WithingsClient,
+) -> None:
+    """Test successful requests reset the failures of the circuit."""
+    responses.post(
+        f"{WITHINGS_URL}/v2/user",
+        status=200,
+        body=load_fixture("device.json"),
+    )
+    responses.post(
+        f"{WITHINGS_URL}/v2/user",
+        exception=aiohttp.ClientConnectionError(),
+    )
+    breaker = CircuitBreaker(failure_threshold=1)
+    authenticated_client.circuit_breaker = breaker
+
+    await authenticated_client.get_devices()
+    assert breaker.get_state(HOST, "v2/user") is CircuitState.CLOSED
+    with pytest.raises(aiohttp.ClientConnectionError):
+        await authenticated_client.get_devices()
+
+    assert breaker.get_state(HOST, "v2/user") is CircuitState.OPEN
+
+
+async def test_client_counts_error_pages(
+    responses: aioresponses,
+    authenticated_client: WithingsClient,
+) -> None:
+    """Test error pages of the edge count as failures and other pages do not."""
+    responses.post(
+        f"{WITHINGS_URL}/v2/user",
+        status=404,
+        body="<html>Not Found</html>",
+        headers={"Content-Type": "text/html"},
+    )
+    responses.post(
+        f"{WITHINGS_URL}/v2/user",
+        status=503,
+        body="<html>Service Unavailable</html>",
+        headers={"Content-Type": "text/html"},
+        repeat=True,
+    )
+    breaker = CircuitBreaker(failure_threshold=3)
+    authenticated_client.circuit_breaker = breaker
+
+    with pytest.raises(WithingsError) as error:
+        await authenticated_client.get_devices()
+    assert not isinstance(error.value, WithingsConnectionError)
+    for _ in range(3):
+        with pytest.raises(WithingsConnectionError):
+            await authenticated_client.get_devices()
+
+    assert breaker.get_state(HOST, "v2/user") is CircuitState.OPEN
+    with pytest.raises(WithingsCircuitOpenError):
+        await authenticated_client.get_devices()
@@ -0,0 +1,45 @@
+"""Asynchronous Python client for Withings."""
+
+from __future__ import annotations
+
+import gzip
+import zlib
+
+import brotli
+import pytest
+
+from aiowithings import WithingsError
+from aiowithings.compression import ACCEPT_ENCODING, Decompressor, decompress
+
+from . import load_fixture
+
+RAW = load_fixture("sleep.json").encode()
+
+
+def test_accept_encoding() -> None:
+    """Test brotli is negotiated when it is installed."""
+    assert ACCEPT_ENCODING == "br, gzip, deflate"
+
+
+@pytest.mark.parametrize(
+    ("encoding", "body"),
+    [
+        ("identity", RAW),
+        ("gzip", gzip.compress(RAW)),
+        ("deflate", zlib.compress(RAW)),
+        ("br", brotli.compress(RAW)),
+    ],
+)
+def test_decompress(encoding: str, body: bytes) -> None:
+    """Test decompressing a body at once and in chunks."""
+    decompressor = Decompressor(encoding)
+    chunks = [body[start : start + 100] for start in range(0, len(body), 100)]
+
+    assert b"".join(decompressor.decompress(chunk) for chunk in chunks) == RAW
+    assert decompress(body, encoding) == RAW
+
+
+def test_unsupported_encoding() -> None:
+    """Test an unknown content encoding is rejected."""
+    with pytest.raises(WithingsError, match="Unsupported content encoding zstd"):
+        Decompressor("zstd")
@@ -0,0 +1,127 @@
+"""Asynchronous Python client for Withings."""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import UTC, datetime
+import json
+from typing import Any
+
+from aioresponses import CallbackResult, aioresponses
+import pytest
+
+from aiowithings import (
+    TraceEvent,
+    TraceEventType,
+    WithingsClient,
+    WithingsConnectionError,
+    deadline,
+)
+from aiowithings.deadlines import get_deadline
+
+from . import load_fixture
+from .const import WITHINGS_URL
+
+
+async def _stall(_: str, **_kwargs: Any) -> CallbackResult:
+    await asyncio.sleep(10)
+    return CallbackResult(body="{}")  # pragma: no cover
+
+
+async def test_nested_deadlines() -> None:
+    """Test a nested deadline can only shorten the budget."""
+    loop = asyncio.get_running_loop()
+    assert get_deadline() is None
+
+    with deadline(1) as outer:
+        assert outer == pytest.approx(loop.time() + 1, abs=0.1)
+        with deadline(10) as inner:
+            assert inner == outer
+        with deadline(0.5) as inner:
+            assert inner < outer
+            assert get_deadline() == inner
+        assert get_deadline() == outer
+
+    assert get_deadline() is None
+
+
+async def test_deadline_limits_request(
+    responses: aioresponses,
+    authenticated_client: WithingsClient,
+) -> None:
+    """Test a deadline shorter than the request timeout stops the request."""
+    responses.post(f"{WITHINGS_URL}/v2/user", callback=_stall)
+    events: list[TraceEvent] = []
+    authenticated_client.tracers.append(events.append)
+
+    with deadline(0.05), pytest.raises(WithingsConnectionError):
+        await authenticated_client.get_devices()
+
+    assert events[-1].event_type is TraceEventType.REQUEST_FAILED
+    assert events[-1].elapsed < 1
+
+
+async def test_deadline_covers_token_refresh(
+    responses: aioresponses,
+    authenticated_client: WithingsClient,
+) -> None:
+    """Test the budget includes refreshing the token."""
+
+    async def refresh_token() -> str:
+        await asyncio.sleep(10)
+        return "test"  # pragma: no cover
+
+    authenticated_client.refresh_token_function = refresh_token
+    authenticated_client.request_timeout = 0.05
+
+    with pytest.raises(WithingsConnectionError):
+        await authenticated_client.get_devices()
+
+    assert not responses.requests
+
+
+async def test_deadline_spans_pages(
+    responses: aioresponses,
+    authenticated_client: WithingsClient,
+) -> None:
+    """Test the deadline applies to every page of a page iterator."""
+    response_data = json.loads(load_fixture("sleep_summary.json"))
+    response_data["body"]["more"] = True
+    response_data["body"]["offset"] = 300
+    responses.post(
+        f"{WITHINGS_URL}/v2/sleep",
+        status=200,
+        body=json.dumps(response_data),
+    )
+    responses.post(f"{WITHINGS_URL}/v2/sleep", callback=_stall)
+    pages = authenticated_client.iter_sleep_summary_pages(
+        since=datetime.fromtimestamp(0, tz=UTC),
+    )
+
+    with deadline(0.05):
+        assert await anext(pages)
+        with pytest.raises(WithingsConnectionError):
+            await anext(pages)
+
+
+async def test_deadline_cancels_fan_out(
+    responses: aioresponses,
+    authenticated_client: WithingsClient,
+) -> None:
+    """Test tasks started within a deadline share its budget."""
+    responses.post(
+        f"{WITHINGS_URL}/v2/user",
+        status=200,
+        body=load_fixture("device.json"),
+    )
+    responses.post(f"{WITHINGS_URL}/v2/user", callback=_stall, repeat=True)
+    loop = asyncio.get_running_loop()
+    started_at = loop.time()
+
+    with deadline(0.05), pytest.raises(ExceptionGroup) as error:  # noqa: PT012
+        async with asyncio.TaskGroup() as group:
+            for _ in range(3):
+                group.create_task(authenticated_client.get_devices())
+
+    assert error.group_contains(WithingsConnectionError)
+    assert loop.time() - started_at < 1
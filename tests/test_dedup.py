@@ -0,0 +1,104 @@
+"""Asynchronous Python client for Withings."""
+
+from __future__ import annotations
+
+from dataclasses import replace
+from datetime import timedelta
+import json
+import marshal
+from typing import Any
+
+import pytest
+
+from aiowithings import (
+    Activity,
+    ChangeDetector,
+    ChangeKind,
+    Device,
+    MeasurementGroup,
+    SleepSummary,
+    Workout,
+)
+from aiowithings.dedup import INDEX_VERSION, _fingerprint
+
+from . import load_fixture
+
+
+def _load(model: type[Any], fixture: str, key: str) -> list[Any]:
+    return [
+        model.from_api(item) for item in json.loads(load_fixture(fixture))["body"][key]
+    ]
+
+
+@pytest.mark.parametrize(
+    ("model", "fixture", "key"),
+    [
+        (MeasurementGroup, "measurement.json", "measuregrps"),
+        (SleepSummary, "sleep_summary.json", "series"),
+        (Activity, "activity.json", "activities"),
+        (Workout, "workouts.json", "series"),
+    ],
+)
+def test_overlapping_fetches(model: type[Any], fixture: str, key: str) -> None:
+    """Test records fetched again, also within a response, are unchanged."""
+    records = _load(model, fixture, key)
+    unique = [
+        record for index, record in enumerate(records) if record not in records[:index]
+    ]
+    detector = ChangeDetector()
+
+    assert detector.changed(records) == unique
+    assert len(detector) == len(unique)
+    assert detector.changed(_load(model, fixture, key)) == []
+
+
+def test_updated_records() -> None:
+    """Test records with a new version or content are updated."""
+    group = _load(MeasurementGroup, "measurement.json", "measuregrps")[0]
+    workout = _load(Workout, "workouts.json", "series")[0]
+    detector = ChangeDetector()
+    detector.changed([group, workout])
+
+    assert detector.classify(replace(group, taken_at=group.stored_at)) is (
+        ChangeKind.UNCHANGED
+    )
+    updated_at = group.updated_at + timedelta(minutes=1)
+    assert detector.classify(replace(group, updated_at=updated_at)) is (
+        ChangeKind.UPDATED
+    )
+    assert detector.classify(replace(workout, steps=1)) is ChangeKind.UPDATED
+    assert detector.classify(replace(workout, workout_id=1)) is ChangeKind.NEW
+    assert detector.classify(replace(workout, steps=1)) is ChangeKind.UNCHANGED
+
+
+def test_dump() -> None:
+    """Test the index survives a dump and load."""
+    records = _load(Activity, "activity.json", "activities")
+    detector = ChangeDetector()
+    detector.changed(records)
+
+    loaded = ChangeDetector.load(detector.dump())
+
+    assert len(loaded) == len(records)
+    assert loaded.changed(records) == []
+
+
+def test_stable_digests() -> None:
+    """Test digests do not depend on the interpreter that takes them."""
+    workout = _load(Workout, "workouts.json", "series")[0]
+    summary = _load(SleepSummary, "sleep_summary.json", "series")[0]
+
+    assert _fingerprint(workout) == 3310375231769869290
+    assert _fingerprint(summary) == 1215299903762385076
+
+
+def test_unsupported() -> None:
+    """Test unsupported data is rejected."""
+    device = _load(Device, "device.json", "devices")[0]
+
+    with pytest.raises(TypeError, match="not supported for Device"):
+        ChangeDetector().classify(device)
+    with pytest.raises(ValueError, match=r"Unsupported index version \(1, 0\)"):
+        ChangeDetector.load(marshal.dumps(((1, 0), [])))
+    with pytest.raises(ValueError, match="dumped by cpython-00"):
+        ChangeDetector.load(marshal.dumps((INDEX_VERSION, "cpython-00", [])))
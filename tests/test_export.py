@@ -0,0 +1,199 @@
+"""Asynchronous Python client for Withings."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, fields
+from datetime import UTC, date, datetime
+from enum import Enum
+import json
+from typing import TYPE_CHECKING, Any
+
+from aioresponses import aioresponses
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from aiowithings import (
+    Activity,
+    Device,
+    MeasurementGroup,
+    SleepSeries,
+    SleepSummary,
+    WithingsClient,
+    Workout,
+)
+from aiowithings.export import ParquetExporter, get_arrow_schema, to_record_batch
+
+from . import load_fixture
+from .const import WITHINGS_URL
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from syrupy import SnapshotAssertion
+
+
+@pytest.mark.parametrize(
+    "model",
+    [Activity, Device, MeasurementGroup, SleepSeries, SleepSummary, Workout],
+)
+def test_arrow_schema(model: type[Any], snapshot: SnapshotAssertion) -> None:
+    """Test the Arrow schema is derived from the model fields."""
+    assert get_arrow_schema(model).to_string() == snapshot
+
+
+def test_record_batch() -> None:
+    """Test converting models to a record batch."""
+    groups = [
+        MeasurementGroup.from_api(group)
+        for group in json.loads(load_fixture("measurement.json"))["body"]["measuregrps"]
+    ]
+
+    batch = to_record_batch(MeasurementGroup, groups)
+
+    assert batch.num_rows == len(groups)
+    first = batch.to_pylist()[0]
+    assert first["attribution"] == groups[0].attribution.value
+    assert first["taken_at"] == groups[0].taken_at
+    assert first["measurements"][0] == {
+        "measurement_type": groups[0].measurements[0].measurement_type.value,
+        "value": groups[0].measurements[0].value,
+        "position": None,
+    }
+
+
+def test_parquet_exporter(tmp_path: Path) -> None:
+    """Test models are written in row groups of a bounded size."""
+    summaries = [
+        SleepSummary.from_api(summary)
+        for summary in json.loads(load_fixture("sleep_summary.json"))["body"]["series"]
+    ]
+    path = tmp_path / "sleep_summary.parquet"
+
+    with ParquetExporter(path, SleepSummary, row_group_size=2) as exporter:
+        exporter.write(summaries[:3])
+        assert exporter.rows_written == 2
+        exporter.write(summaries[3:])
+
+    parquet_file = pq.ParquetFile(path)
+    assert parquet_file.metadata.num_rows == len(summaries)
+    assert parquet_file.metadata.num_row_groups == (len(summaries) + 1) // 2
+    assert parquet_file.schema_arrow == get_arrow_schema(SleepSummary)
+    rows = parquet_file.read().to_pylist()
+    assert rows[0]["date"] == summaries[0].date
+    assert rows[0]["start_date"] == summaries[0].start_date
+
+
+@pytest.mark.parametrize(
+    ("model", "fixture", "key"),
+    [
+        (SleepSummary, "sleep_summary.json", "series"),
+        (Activity, "activity.json", "activities"),
+        (Workout, "workouts.json", "series"),
+    ],
+)
+def test_parquet_round_trip(
+    tmp_path: Path,
+    model: type[Any],
+    fixture: str,
+    key: str,
+) -> None:
+    """Test the values read back from Parquet equal those of the models."""
+    items = [
+        model.from_api(item) for item in json.loads(load_fixture(fixture))["body"][key]
+    ]
+    path = tmp_path / "export.parquet"
+
+    with ParquetExporter(path, model) as exporter:
+        exporter.write(items)
+
+    assert pq.read_table(path).to_pylist() == [
+        {
+            model_field.name: value.value if isinstance(value, Enum) else value
+            for model_field in fields(item)
+            for value in (getattr(item, model_field.name),)
+        }
+        for item in items
+    ]
+
+
+def test_truncation_raises() -> None:
+    """Test values that do not fit the type of their field are not truncated."""
+    with pytest.raises(pa.ArrowInvalid, match="truncated"):
+        to_record_batch(_Values, [_Values([1, 0.86])])  # type: ignore[list-item]
+
+
+def test_parquet_exporter_without_rows(tmp_path: Path) -> None:
+    """Test an export without models still has the schema."""
+    path = tmp_path / "workouts.parquet"
+
+    with ParquetExporter(path, Workout):
+        pass
+
+    table = pq.read_table(path)
+    assert table.num_rows == 0
+    assert table.schema == get_arrow_schema(Workout)
+
+
+async def test_export_pages(
+    responses: aioresponses,
+    authenticated_client: WithingsClient,
+    tmp_path: Path,
+) -> None:
+    """Test exporting every page of the client."""
+    for more in (True, False):
+        response_data = json.loads(load_fixture("sleep_summary.json"))
+        response_data["body"]["more"] = more
+        responses.post(
+            f"{WITHINGS_URL}/v2/sleep",
+            status=200,
+            body=json.dumps(response_data),
+        )
+    path = tmp_path / "sleep_summary.parquet"
+
+    with ParquetExporter(path, SleepSummary) as exporter:
+        rows = await exporter.write_pages(
+            authenticated_client.iter_sleep_summary_pages(
+                date(2023, 1, 1),
+                datetime.now(tz=UTC).date(),
+            )
+        )
+
+    page_size = len(json.loads(load_fixture("sleep_summary.json"))["body"]["series"])
+    assert rows == 2 * page_size
+    assert pq.read_metadata(path).num_rows == rows
+
+
+@dataclass(slots=True)
+class _Values:
+    """Model with a list of plain values."""
+
+    values: list[int]
+
+
+@dataclass(slots=True)
+class _Mapping:
+    """Model with a field that cannot be exported."""
+
+    values: dict[str, int]
+
+
+@dataclass(slots=True)
+class _Complex:
+    """Model with a field that cannot be exported."""
+
+    value: complex
+
+
+def test_plain_list() -> None:
+    """Test lists of plain values are kept as is."""
+    batch = to_record_batch(_Values, [_Values([1, 2])])
+
+    assert batch.to_pylist() == [{"values": [1, 2]}]
+
+
+@pytest.mark.parametrize("model", [_Mapping, _Complex])
+def test_unsupported_type(model: type[Any]) -> None:
+    """Test models with unsupported fields are rejected."""
+    with pytest.raises(TypeError, match="Unsupported type"):
+        get_arrow_schema(model)
@@ -2,10 +2,32 @@
 
 from __future__ import annotations
 
+from dataclasses import replace
+from datetime import UTC, date, datetime, timedelta
 import json
 from typing import TYPE_CHECKING, Any
+from zoneinfo import ZoneInfo
 
-from aiowithings import MeasurementGroup, SleepSummary, aggregate_measurements
+import pytest
+
+from aiowithings import (
+    Activity,
+    AggregationPeriod,
+    Device,
+    DeviceBattery,
+    DeviceTracker,
+    LatestMeasurementAggregator,
+    MeasurementGroup,
+    MeasurementPosition,
+    MeasurementType,
+    ResampledSeries,
+    SleepSummary,
+    aggregate_measurements,
+    resample,
+    resample_activities,
+    resample_measurements,
+    rollup_sleep_summaries,
+)
 from aiowithings.helpers import aggregate_sleep_summary
 
 from . import load_fixture
@@ -63,3 +85,253 @@ def test_aggregate_single_sleep_summary(snapshot: SnapshotAssertion) -> None:
 def test_aggregate_no_sleep_summary(snapshot: SnapshotAssertion) -> None:
     """Test aggregation."""
     assert aggregate_sleep_summary([]) == snapshot
+
+
+def test_incremental_measurement_aggregation() -> None:
+    """Test incremental aggregation matches aggregating the full history."""
+    json_file: list[dict[str, Any]] = json.loads(
+        load_fixture("measurement_positions.json")
+    )
+    measurements = [MeasurementGroup.from_api(measurement) for measurement in json_file]
+    expected = aggregate_measurements(
+        [MeasurementGroup.from_api(measurement) for measurement in json_file]
+    )
+
+    aggregator = LatestMeasurementAggregator()
+    for measurement_group in reversed(measurements):
+        aggregator.add([measurement_group])
+
+    assert aggregator.latest == expected
+    for (measurement_type, position), value in expected.items():
+        assert aggregator.get(measurement_type, position) == value
+
+
+def _devices() -> list[Device]:
+    json_file = json.loads(load_fixture("device.json"))
+    return [
+        replace(Device.from_api(device), hashed_device_id=str(index))
+        for index, device in enumerate(json_file["body"]["devices"])
+    ]
+
+
+def test_device_tracker() -> None:
+    """Test the tracker reports only the devices that changed."""
+    first, second, third = _devices()[:3]
+    tracker = DeviceTracker([first, second])
+
+    assert second.first_session_date is not None
+    later = second.first_session_date + timedelta(days=1)
+    changes = tracker.update(
+        [
+            replace(first, battery=DeviceBattery.LOW),
+            replace(second, last_session_date=later),
+            third,
+        ]
+    )
+
+    assert changes
+    assert [device.hashed_device_id for device in changes.added] == ["2"]
+    assert changes.removed == []
+    assert [device.battery for device in changes.battery_changed] == [DeviceBattery.LOW]
+    assert [device.last_session_date for device in changes.session_advanced] == [later]
+    assert list(tracker.devices) == ["0", "1", "2"]
+
+
+def test_device_tracker_unchanged_devices() -> None:
+    """Test unchanged devices keep their instance and removals are reported."""
+    first, second = _devices()[:2]
+    tracker = DeviceTracker([first, second])
+
+    changes = tracker.update([replace(first), replace(second)])
+
+    assert not changes
+    assert tracker.devices["0"] is first
+    changes = tracker.update([replace(first, last_session_date=None)])
+    assert changes.removed == [second]
+    assert changes.session_advanced == []
+    assert changes.battery_changed == []
+
+
+def test_device_tracker_dump() -> None:
+    """Test the tracker state survives a dump and load."""
+    tracker = DeviceTracker(_devices())
+
+    loaded = DeviceTracker.load(tracker.dump())
+
+    assert loaded.devices == tracker.devices
+    assert not loaded.update(tracker.devices.values())
+
+
+def test_aggregation_does_not_mutate_measurements() -> None:
+    """Test aggregation leaves the measurement positions untouched."""
+    json_file: list[dict[str, Any]] = json.loads(
+        load_fixture("measurement_positions.json")
+    )
+    measurements = [MeasurementGroup.from_api(measurement) for measurement in json_file]
+    positions = [
+        data_point.position
+        for measurement_group in measurements
+        for data_point in measurement_group.measurements
+    ]
+
+    aggregator = LatestMeasurementAggregator()
+    aggregator.add(measurements)
+
+    assert positions == [
+        data_point.position
+        for measurement_group in measurements
+        for data_point in measurement_group.measurements
+    ]
+    assert MeasurementPosition.WHOLE_BODY in positions
+    assert aggregator.get(MeasurementType.WEIGHT) is not None
+
+
+def test_rollup_sleep_summaries(snapshot: SnapshotAssertion) -> None:
+    """Test rolling up sleep summaries per month."""
+    json_file: list[dict[str, Any]] = json.loads(load_fixture("sleep_summary.json"))[
+        "body"
+    ]["series"]
+
+    sleep_summaries = [
+        SleepSummary.from_api(sleep_summary) for sleep_summary in json_file
+    ]
+
+    rollup = rollup_sleep_summaries(sleep_summaries, AggregationPeriod.MONTH)
+    assert sum(rollup.night_count) == len(sleep_summaries)
+    assert rollup == snapshot
+
+
+@pytest.mark.parametrize(
+    ("period", "expected_start"),
+    [
+        (AggregationPeriod.DAY, [date(2024, 1, 31), date(2024, 2, 1)]),
+        (AggregationPeriod.WEEK, [date(2024, 1, 29), date(2024, 1, 29)]),
+        (AggregationPeriod.MONTH, [date(2024, 1, 1), date(2024, 2, 1)]),
+    ],
+)
+def test_rollup_sleep_summaries_by_device(
+    period: AggregationPeriod,
+    expected_start: list[date],
+) -> None:
+    """Test rolling up sleep summaries per period and device."""
+    json_file: dict[str, Any] = json.loads(load_fixture("sleep_summary.json"))["body"][
+        "series"
+    ][0]
+    first = SleepSummary.from_api(json_file)
+    first.date = date(2024, 2, 1)
+    first.deep_sleep_duration = 100
+    second = SleepSummary.from_api(json_file)
+    second.date = date(2024, 1, 31)
+    second.hashed_device_id = "other"
+    second.deep_sleep_duration = None
+
+    rollup = rollup_sleep_summaries([first, second], period, by_device=True)
+
+    assert rollup.period_start == expected_start
+    assert rollup.night_count == [1, 1]
+    assert rollup.hashed_device_id.count("other") == 1
+    deep_sleep = rollup.fields["deep_sleep_duration"]
+    assert sorted(deep_sleep.count) == [0, 1]
+    assert None in deep_sleep.mean
+    assert 100 in deep_sleep.maximum
+
+
+def test_resample_respects_time_zone() -> None:
+    """Test day boundaries are determined in the given time zone."""
+    timestamps = [
+        datetime(2024, 1, 1, 22, 30, tzinfo=UTC),
+        datetime(2024, 1, 1, 23, 30, tzinfo=UTC),
+        datetime(2024, 1, 1, 12, 0, tzinfo=UTC),
+    ]
+    values = [1.0, 5.0, 3.0]
+
+    in_utc = resample(timestamps, values, AggregationPeriod.DAY)
+    assert in_utc == ResampledSeries(
+        period_start=[date(2024, 1, 1)],
+        count=[3],
+        mean=[3.0],
+        last=[5.0],
+        minimum=[1.0],
+        maximum=[5.0],
+    )
+
+    in_amsterdam = resample(
+        timestamps,
+        values,
+        AggregationPeriod.DAY,
+        time_zone=ZoneInfo("Europe/Amsterdam"),
+    )
+    assert in_amsterdam == ResampledSeries(
+        period_start=[date(2024, 1, 1), date(2024, 1, 2)],
+        count=[2, 1],
+        mean=[2.0, 5.0],
+        last=[1.0, 5.0],
+        minimum=[1.0, 5.0],
+        maximum=[3.0, 5.0],
+    )
+
+
+def test_resample_measurements(snapshot: SnapshotAssertion) -> None:
+    """Test resampling measurements per month."""
+    json_file: list[dict[str, Any]] = json.loads(load_fixture("measurement_list.json"))
+    measurements = [MeasurementGroup.from_api(measurement) for measurement in json_file]
+
+    resampled = resample_measurements(
+        measurements,
+        MeasurementType.WEIGHT,
+        AggregationPeriod.MONTH,
+    )
+
+    assert (
+        resampled.last[-1]
+        == aggregate_measurements(measurements)[(MeasurementType.WEIGHT, None)]
+    )
+    assert resampled == snapshot
+
+
+def test_resample_positional_measurements() -> None:
+    """Test resampling measurements taken at a position."""
+    json_file: list[dict[str, Any]] = json.loads(
+        load_fixture("measurement_positions.json")
+    )
+    measurements = [MeasurementGroup.from_api(measurement) for measurement in json_file]
+
+    whole_body = resample_measurements(
+        measurements,
+        MeasurementType.FAT_MASS_WEIGHT,
+        AggregationPeriod.MONTH,
+    )
+    assert sum(whole_body.count) == 4
+
+    left_leg = resample_measurements(
+        measurements,
+        MeasurementType(173),
+        AggregationPeriod.MONTH,
+        position=MeasurementPosition(12),
+    )
+    assert sum(left_leg.count) == 2
+
+
+def test_resample_activities() -> None:
+    """Test resampling activities per month."""
+    json_file: list[dict[str, Any]] = json.loads(load_fixture("activity.json"))["body"][
+        "activities"
+    ]
+    activities = [Activity.from_api(activity) for activity in json_file]
+    activities[1].average_heart_rate = None
+
+    steps = resample_activities(activities, "steps", AggregationPeriod.MONTH)
+    assert steps == ResampledSeries(
+        period_start=[date(2023, 10, 1)],
+        count=[2],
+        mean=[1182.0],
+        last=[1155],
+        minimum=[1155],
+        maximum=[1209],
+    )
+    heart_rate = resample_activities(
+        activities,
+        "average_heart_rate",
+        AggregationPeriod.MONTH,
+    )
+    assert heart_rate.count == [1]
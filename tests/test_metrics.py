@@ -0,0 +1,171 @@
+"""Asynchronous Python client for Withings."""
+
+from __future__ import annotations
+
+from datetime import UTC, datetime
+import json
+from typing import TYPE_CHECKING
+
+from aiohttp import ClientConnectionError
+from aioresponses import aioresponses
+import pytest
+
+from aiowithings import (
+    MetricsCollector,
+    StatusCategory,
+    TraceEvent,
+    TraceEventType,
+    WithingsClient,
+    WithingsError,
+    WithingsTooManyRequestsError,
+)
+from aiowithings.metrics import get_status_category
+
+from . import load_fixture
+from .const import WITHINGS_URL
+
+if TYPE_CHECKING:
+    from syrupy import SnapshotAssertion
+
+
+def _event(
+    event_type: TraceEventType,
+    endpoint: str,
+    elapsed: float,
+    *,
+    response_bytes: int | None = None,
+    status: int | None = None,
+    model_count: int | None = None,
+) -> TraceEvent:
+    return TraceEvent(
+        event_type=event_type,
+        request_id=1,
+        endpoint=endpoint,
+        action="get",
+        context=None,
+        started_at=0.0,
+        timestamp=elapsed,
+        response_bytes=response_bytes,
+        status=status,
+        model_count=model_count,
+    )
+
+
+@pytest.fixture(name="collector")
+def collector_fixture() -> MetricsCollector:
+    """Return a collector with a set of recorded requests."""
+    collector = MetricsCollector(latency_buckets=(0.1, 1.0))
+    for event in (
+        _event(TraceEventType.BODY_READ, "v2/sleep", 0.04, response_bytes=128),
+        _event(TraceEventType.BODY_DECODED, "v2/sleep", 0.05, response_bytes=512),
+        _event(TraceEventType.STATUS_DISPATCHED, "v2/sleep", 0.05, status=0),
+        _event(TraceEventType.BODY_DECODED, "v2/sleep", 0.5, response_bytes=64),
+        _event(TraceEventType.STATUS_DISPATCHED, "v2/sleep", 0.5, status=601),
+        _event(TraceEventType.REQUEST_FAILED, "v2/sleep", 0.5),
+        _event(TraceEventType.STATUS_DISPATCHED, "measure", 1.0, status=401),
+        _event(TraceEventType.REQUEST_FAILED, "measure", 2.0),
+        _event(TraceEventType.MODELS_PARSED, "v2/sleep", 0.75, model_count=1),
+        _event(TraceEventType.REQUEST_COMPLETED, "v2/sleep", 0.75),
+    ):
+        collector(event)
+    collector.record_retry("measure")
+    collector.record_cache_hit("v2/sleep")
+    return collector
+
+
+@pytest.mark.parametrize(
+    ("status", "category"),
+    [
+        (0, StatusCategory.SUCCESS),
+        (100, StatusCategory.AUTH_FAILED),
+        (201, StatusCategory.INVALID_PARAMS),
+        (214, StatusCategory.UNAUTHORIZED),
+        (215, StatusCategory.ERROR_OCCURRED),
+        (522, StatusCategory.TIMEOUT),
+        (524, StatusCategory.BAD_STATE),
+        (601, StatusCategory.TOO_MANY_REQUESTS),
+        (1, StatusCategory.UNKNOWN),
+        (None, StatusCategory.UNKNOWN),
+    ],
+)
+def test_status_category(status: int | None, category: StatusCategory) -> None:
+    """Test statuses are mapped to their status set."""
+    assert get_status_category(status) is category
+
+
+def test_metrics_snapshot(
+    collector: MetricsCollector,
+    snapshot: SnapshotAssertion,
+) -> None:
+    """Test exporting the collected metrics as plain data."""
+    assert collector.snapshot() == snapshot
+
+
+def test_metrics_prometheus(
+    collector: MetricsCollector,
+    snapshot: SnapshotAssertion,
+) -> None:
+    """Test exporting the collected metrics in the Prometheus text format."""
+    assert collector.to_prometheus() == snapshot
+
+
+def test_metrics_reset(collector: MetricsCollector) -> None:
+    """Test clearing the collected metrics."""
+    collector.reset()
+
+    assert collector.snapshot() == {
+        "latency": [],
+        "statuses": [],
+        "failures": {},
+        "retries": {},
+        "cache_hits": {},
+        "response_bytes": {},
+        "transferred_bytes": {},
+    }
+
+
+async def test_metrics_from_client(
+    responses: aioresponses,
+    authenticated_client: WithingsClient,
+) -> None:
+    """Test collecting metrics from client requests."""
+    body = load_fixture("sleep.json")
+    response_data = json.loads(body)
+    response_data["status"] = 601
+    responses.post(f"{WITHINGS_URL}/v2/sleep", status=200, body=body)
+    responses.post(
+        f"{WITHINGS_URL}/v2/sleep",
+        status=200,
+        body=json.dumps(response_data),
+    )
+    responses.post(
+        f"{WITHINGS_URL}/v2/user",
+        status=200,
+        headers={"Content-Type": "plain/text"},
+        body="Yes",
+    )
+    responses.post(f"{WITHINGS_URL}/v2/user", exception=ClientConnectionError())
+    collector = MetricsCollector()
+    authenticated_client.tracers.append(collector)
+
+    start = datetime.fromtimestamp(0, tz=UTC)
+    end = datetime.fromtimestamp(1609559200, tz=UTC)
+    await authenticated_client.get_sleep(start, end)
+    with pytest.raises(WithingsTooManyRequestsError):
+        await authenticated_client.get_sleep(start, end)
+    with pytest.raises(WithingsError):
+        await authenticated_client.get_devices()
+    with pytest.raises(ClientConnectionError):
+        await authenticated_client.get_devices()
+
+    snapshot = collector.snapshot()
+    assert snapshot["statuses"] == [
+        {"endpoint": "v2/sleep", "category": "success", "count": 1},
+        {"endpoint": "v2/sleep", "category": "too_many_requests", "count": 1},
+    ]
+    assert snapshot["failures"] == {"v2/sleep": 1, "v2/user": 2}
+    assert snapshot["response_bytes"]["v2/sleep"] > len(body)
+    assert [
+        (latency["endpoint"], latency["action"], latency["count"])
+        for latency in snapshot["latency"]
+    ] == [("v2/sleep", "get", 2), ("v2/user", "getdevice", 2)]
@@ -0,0 +1,260 @@
+"""Asynchronous Python client for Withings."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING, Any
+
+import aiohttp
+from aiohttp import ClientError
+from aioresponses import CallbackResult, aioresponses
+import pytest
+
+from aiowithings import (
+    TOKEN_URL,
+    JsonTokenStore,
+    OAuthToken,
+    TokenManager,
+    TokenStore,
+    WithingsConnectionError,
+    WithingsError,
+    WithingsInvalidParamsError,
+    WithingsUnknownUserError,
+)
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def _token_response(index: int) -> dict[str, Any]:
+    return {
+        "status": 0,
+        "body": {
+            "userid": 363,
+            "access_token": f"access_{index}",
+            "refresh_token": f"refresh_{index}",
+            "expires_in": 10800,
+            "scope": "user.info,user.metrics",
+            "token_type": "Bearer",
+        },
+    }
+
+
+@pytest.fixture(name="token_requests")
+def token_requests_fixture(responses: aioresponses) -> list[dict[str, Any]]:
+    """Answer token requests with a new token and record the request data."""
+    requests: list[dict[str, Any]] = []
+
+    async def respond(_: Any, **kwargs: Any) -> CallbackResult:
+        requests.append(kwargs["data"])
+        await asyncio.sleep(0)
+        return CallbackResult(payload=_token_response(len(requests)))
+
+    responses.post(TOKEN_URL, callback=respond, repeat=True)
+    return requests
+
+
+def _manager(**kwargs: Any) -> TokenManager:
+    return TokenManager("client", "secret", **kwargs)
+
+
+async def test_exchange_code(
+    token_requests: list[dict[str, Any]],
+    tmp_path: Path,
+) -> None:
+    """Test an authorization code is exchanged and the tokens are stored."""
+    store = JsonTokenStore(tmp_path / "tokens.json")
+    async with _manager(redirect_uri="https://example.com", store=store) as manager:
+        token = await manager.exchange_code("code")
+
+    assert token_requests == [
+        {
+            "action": "requesttoken",
+            "client_id": "client",
+            "client_secret": "secret",
+            "grant_type": "authorization_code",
+            "code": "code",
+            "redirect_uri": "https://example.com",
+        }
+    ]
+    assert token.user_id == "363"
+    assert token.refresh_token == "refresh_1"
+    assert manager.get_token("363") == token
+    assert await JsonTokenStore(store.path).load_all() == [token]
+
+
+async def test_load_tokens(tmp_path: Path) -> None:
+    """Test stored tokens are used without requesting new ones."""
+    store = JsonTokenStore(tmp_path / "tokens.json")
+    token = OAuthToken("1", "access", "refresh", 2e9, "user.info")
+    await store.save(token)
+    manager = _manager(store=store, clock=lambda: 1e9)
+
+    await manager.load()
+
+    assert await manager.token_function("1")() == "access"
+    assert manager.get_token("2") is None
+    with pytest.raises(WithingsUnknownUserError):
+        await manager.get_access_token("2")
+    with pytest.raises(WithingsUnknownUserError):
+        await manager.refresh("2")
+
+
+async def test_save_tokens_in_order(tmp_path: Path) -> None:
+    """Test concurrent saves keep every user and stale writes are skipped."""
+    store = JsonTokenStore(tmp_path / "tokens.json")
+    tokens = [
+        OAuthToken(str(user_id), "access", "refresh", 2e9, "user.info")
+        for user_id in range(5)
+    ]
+
+    await asyncio.gather(*(store.save(token) for token in tokens))
+    store._write(1, {"tokens": []})
+
+    assert await JsonTokenStore(store.path).load_all() == tokens
+    assert isinstance(store, TokenStore)
+
+
+async def test_refresh(token_requests: list[dict[str, Any]]) -> None:
+    """Test concurrent refreshes of a user share one request."""
+    manager = _manager()
+    await manager.exchange_code("code")
+
+    first, second = await asyncio.gather(manager.refresh("363"), manager.refresh("363"))
+
+    assert first is second
+    assert token_requests[1]["grant_type"] == "refresh_token"
+    assert token_requests[1]["refresh_token"] == "refresh_1"
+    assert len(token_requests) == 2
+    await manager.close()
+
+
+async def test_refresh_expired_token(token_requests: list[dict[str, Any]]) -> None:
+    """Test an expired access token is refreshed when it is requested."""
+    async with aiohttp.ClientSession() as session:
+        manager = _manager(session=session)
+        await manager.exchange_code("code")
+        manager.clock = lambda: 3e9
+
+        assert await manager.get_access_token("363") == "access_2"
+        await manager.close()
+        assert not session.closed
+    assert len(token_requests) == 2
+
+
+async def test_background_refresh(token_requests: list[dict[str, Any]]) -> None:
+    """Test tokens are refreshed ahead of expiry in the background."""
+    async with _manager(refresh_margin=10800 - 0.1) as manager:
+        manager.start()
+        await asyncio.sleep(0)
+        await manager.exchange_code("code")
+        await manager.refresh("363")
+        await asyncio.sleep(0.15)
+        token = manager.get_token("363")
+
+    assert token is not None
+    assert token.access_token == "access_3"
+    assert [request["grant_type"] for request in token_requests] == [
+        "authorization_code",
+        "refresh_token",
+        "refresh_token",
+    ]
+    await manager.stop()
+
+
+@pytest.mark.parametrize(
+    ("status", "requests", "report"),
+    [(215, 3, True), (503, 2, True), (503, 2, False)],
+)
+async def test_background_refresh_errors(
+    responses: aioresponses,
+    status: int,
+    requests: int,
+    *,
+    report: bool,
+) -> None:
+    """Test failed background refreshes are retried unless the token is invalid."""
+    calls = 0
+
+    def respond(*_: Any, **__: Any) -> CallbackResult:
+        nonlocal calls
+        calls += 1
+        if calls == 2:
+            return CallbackResult(payload={"status": status, "error": "Failed"})
+        return CallbackResult(payload=_token_response(calls))
+
+    responses.post(TOKEN_URL, callback=respond, repeat=True)
+    errors: list[tuple[str, WithingsError]] = []
+    async with _manager(
+        refresh_margin=10800 - 0.01,
+        retry_interval=0.01,
+        on_refresh_error=(
+            (lambda user_id, error: errors.append((user_id, error))) if report else None
+        ),
+    ) as manager:
+        await manager.exchange_code("code")
+        manager.refresh_margin = 0
+        await asyncio.sleep(0.1)
+
+    assert calls == requests
+    assert [user_id for user_id, _ in errors] == (["363"] if report else [])
+
+
+class _FailingStore(JsonTokenStore):
+    """Token store that fails to save the second token."""
+
+    saves = 0
+
+    async def save(self, token: OAuthToken) -> None:
+        self.saves += 1
+        if self.saves == 2:
+            msg = "Disk is full"
+            raise OSError(msg)
+        await JsonTokenStore.save(self, token)
+
+
+async def test_background_refresh_unexpected_errors(
+    token_requests: list[dict[str, Any]],
+    tmp_path: Path,
+) -> None:
+    """Test unexpected errors of background refreshes are reported and retried."""
+    errors: list[tuple[str, Exception]] = []
+    async with _manager(
+        store=_FailingStore(tmp_path / "tokens.json"),
+        refresh_margin=10800 - 0.01,
+        retry_interval=0.01,
+        on_refresh_error=lambda user_id, error: errors.append((user_id, error)),
+    ) as manager:
+        await manager.exchange_code("code")
+        manager.refresh_margin = 0
+        await asyncio.sleep(0.1)
+        token = manager.get_token("363")
+
+    assert [(user_id, type(error)) for user_id, error in errors] == [("363", OSError)]
+    assert len(token_requests) == 3
+    assert token is not None
+    assert token.access_token == "access_3"
+
+
+@pytest.mark.parametrize(
+    ("response", "error"),
+    [
+        ({"payload": {"status": 503, "error": "Invalid"}}, WithingsInvalidParamsError),
+        ({"body": "not json"}, WithingsConnectionError),
+        ({"payload": []}, WithingsConnectionError),
+        ({"payload": {"status": 0}}, WithingsConnectionError),
+        ({"exception": ClientError()}, WithingsConnectionError),
+        ({"exception": TimeoutError()}, WithingsConnectionError),
+    ],
+)
+async def test_exchange_code_errors(
+    responses: aioresponses,
+    response: dict[str, Any],
+    error: type[WithingsError],
+) -> None:
+    """Test failed token requests raise."""
+    responses.post(TOKEN_URL, **response)
+
+    async with _manager() as manager:
+        with pytest.raises(error):
+            await manager.exchange_code("code")
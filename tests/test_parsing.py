@@ -0,0 +1,60 @@
+"""Asynchronous Python client for Withings."""
+
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import sys
+
+import pytest
+
+from aiowithings import SleepSeries, encode_models
+from aiowithings.parsing import ParsedResponse, create_parse_executor, parse_response
+
+from . import load_fixture
+
+
+def test_parse_response() -> None:
+    """Test parsing a raw response into models."""
+    raw = load_fixture("sleep.json").encode()
+
+    parsed = parse_response(raw, SleepSeries, "series")
+
+    assert parsed.status == 0
+    assert isinstance(parsed.data, bytes)
+    assert parsed.next_offset is None
+    models = parsed.decode(SleepSeries)
+    assert len(models) == 613
+    assert all(isinstance(series, SleepSeries) for series in models)
+
+
+def test_parse_unsuccessful_response() -> None:
+    """Test the status of an unsuccessful response is returned."""
+    raw = b'{"status": 601, "error": "Too many requests"}'
+
+    parsed = parse_response(raw, SleepSeries, "series")
+
+    assert parsed == ParsedResponse(
+        601, "Too many requests", encode_models(SleepSeries, [])
+    )
+    assert parsed.decode(SleepSeries) == []
+
+
+@pytest.mark.parametrize(
+    ("gil_enabled", "executor_type"),
+    [
+        (True, ProcessPoolExecutor),
+        (False, ThreadPoolExecutor),
+    ],
+)
+def test_create_parse_executor(
+    monkeypatch: pytest.MonkeyPatch,
+    gil_enabled: bool,  # noqa: FBT001
+    executor_type: type,
+) -> None:
+    """Test the executor matches the interpreter build."""
+    monkeypatch.setattr(sys, "_is_gil_enabled", lambda: gil_enabled, raising=False)
+
+    executor = create_parse_executor(max_workers=1)
+
+    assert isinstance(executor, executor_type)
+    executor.shutdown()
@@ -0,0 +1,237 @@
+"""Asynchronous Python client for Withings."""
+
+from __future__ import annotations
+
+from datetime import UTC, datetime
+import json
+import tracemalloc
+
+from aiohttp import ClientConnectionError
+from aioresponses import aioresponses
+import pytest
+
+from aiowithings import (
+    PhaseSummary,
+    ProfilePhase,
+    RequestProfiler,
+    TraceEvent,
+    TraceEventType,
+    WithingsClient,
+    WithingsError,
+    WithingsTooManyRequestsError,
+)
+
+from . import load_fixture
+from .const import WITHINGS_URL
+
+
+def _event(
+    event_type: TraceEventType,
+    request_id: int,
+    timestamp: float,
+    *,
+    response_bytes: int | None = None,
+    status: int | None = None,
+    model_count: int | None = None,
+) -> TraceEvent:
+    return TraceEvent(
+        event_type=event_type,
+        request_id=request_id,
+        endpoint="v2/sleep",
+        action="get",
+        context=None,
+        started_at=0.0,
+        timestamp=timestamp,
+        response_bytes=response_bytes,
+        status=status,
+        model_count=model_count,
+    )
+
+
+def test_profiler_phases() -> None:
+    """Test phase timings are derived from the trace events."""
+    profiler = RequestProfiler()
+    for event in (
+        _event(TraceEventType.REQUEST_START, 1, 0.0),
+        _event(TraceEventType.REQUEST_START, 2, 0.0),
+        _event(TraceEventType.BODY_READ, 1, 0.5, response_bytes=100),
+        _event(TraceEventType.BODY_DECODED, 1, 0.75),
+        _event(TraceEventType.STATUS_DISPATCHED, 1, 1.0, status=0),
+        _event(TraceEventType.MODELS_PARSED, 1, 1.5, model_count=3),
+        _event(TraceEventType.REQUEST_COMPLETED, 1, 1.5),
+        _event(TraceEventType.BODY_READ, 2, 1.5, response_bytes=10),
+        _event(TraceEventType.BODY_DECODED, 2, 2.0),
+        _event(TraceEventType.STATUS_DISPATCHED, 2, 2.0, status=601),
+        _event(TraceEventType.REQUEST_FAILED, 2, 2.0),
+        _event(TraceEventType.REQUEST_COMPLETED, 3, 2.0),
+    ):
+        profiler(event)
+
+    first, second = profiler.profiles
+    assert first.durations == {
+        ProfilePhase.FETCH: 0.5,
+        ProfilePhase.DECODE: 0.25,
+        ProfilePhase.PARSE: 0.5,
+    }
+    assert first.total == 1.25
+    assert first.memory == {}
+    assert (first.response_bytes, first.status, first.model_count) == (100, 0, 3)
+    assert not first.failed
+    assert second.durations == {
+        ProfilePhase.FETCH: 1.5,
+        ProfilePhase.DECODE: 0.5,
+    }
+    assert second.status == 601
+    assert second.failed
+    assert profiler.summary() == {
+        "v2/sleep": {
+            ProfilePhase.DECODE: PhaseSummary(2, 0.375, 0.5),
+            ProfilePhase.FETCH: PhaseSummary(2, 1.0, 1.5),
+            ProfilePhase.PARSE: PhaseSummary(1, 0.5, 0.5),
+        },
+    }
+
+    profiler.clear()
+
+    assert not profiler.profiles
+    assert profiler.summary() == {}
+
+
+async def test_profiling_mode(
+    responses: aioresponses,
+    authenticated_client: WithingsClient,
+) -> None:
+    """Test recording phase timings and memory from client requests."""
+    responses.post(
+        f"{WITHINGS_URL}/v2/sleep",
+        status=200,
+        body=load_fixture("sleep.json"),
+    )
+    responses.post(
+        f"{WITHINGS_URL}/v2/user",
+        status=200,
+        body=load_fixture("device.json"),
+    )
+    profiler = authenticated_client.enable_profiling(trace_memory=True)
+
+    assert authenticated_client.profiler is profiler
+    assert len(authenticated_client.tracers) == 1
+    assert tracemalloc.is_tracing()
+
+    await authenticated_client.get_sleep(
+        datetime.fromtimestamp(0, tz=UTC),
+        datetime.fromtimestamp(1609559200, tz=UTC),
+    )
+    await authenticated_client.get_devices()
+
+    sleep, devices = profiler.profiles
+    assert sleep.endpoint == "v2/sleep"
+    assert set(sleep.durations) == set(ProfilePhase)
+    assert set(sleep.memory) == set(ProfilePhase)
+    assert sleep.memory[ProfilePhase.PARSE] > 0
+    assert sleep.model_count == 613
+    assert devices.endpoint == "v2/user"
+    assert set(devices.durations) == {ProfilePhase.FETCH, ProfilePhase.DECODE}
+
+    authenticated_client.disable_profiling()
+    authenticated_client.disable_profiling()
+
+    assert authenticated_client.profiler is None
+    assert authenticated_client.tracers == []
+    assert not tracemalloc.is_tracing()
+
+
+def test_detach_only_affects_that_client() -> None:
+    """Test detaching a client keeps profiling the other clients."""
+    profiler = RequestProfiler(trace_memory=True)
+    first, second = WithingsClient(), WithingsClient()
+    profiler.attach(first)
+    profiler.attach(first)
+    profiler.attach(second)
+    for request_id, client in ((1, first), (2, second)):
+        (tracer,) = client.tracers
+        tracer(_event(TraceEventType.REQUEST_START, request_id, 0.0))
+
+    profiler.detach(first)
+    profiler.detach(first)
+
+    assert first.tracers == []
+    assert list(profiler._pending) == [2]
+    assert tracemalloc.is_tracing()
+    second.tracers[0](_event(TraceEventType.REQUEST_COMPLETED, 2, 1.0))
+    assert [profile.request_id for profile in profiler.profiles] == [2]
+
+    profiler.detach(second)
+
+    assert not tracemalloc.is_tracing()
+
+
+async def test_profiling_sampling_and_failures(
+    responses: aioresponses,
+    authenticated_client: WithingsClient,
+) -> None:
+    """Test only sampled requests are profiled, including failed ones."""
+    response_data = json.loads(load_fixture("sleep.json"))
+    response_data["status"] = 601
+    responses.post(
+        f"{WITHINGS_URL}/v2/sleep",
+        status=200,
+        body=json.dumps(response_data),
+        repeat=True,
+    )
+    responses.post(
+        f"{WITHINGS_URL}/v2/user",
+        status=200,
+        headers={"Content-Type": "plain/text"},
+        body="Yes",
+        repeat=True,
+    )
+    profiler = RequestProfiler(sample_every=2)
+    profiler.attach(authenticated_client)
+
+    for _ in range(3):
+        with pytest.raises(WithingsTooManyRequestsError):
+            await authenticated_client.get_sleep(
+                datetime.fromtimestamp(0, tz=UTC),
+                datetime.fromtimestamp(1609559200, tz=UTC),
+            )
+    with pytest.raises(WithingsError):
+        await authenticated_client.get_devices()
+
+    assert [
+        (profile.endpoint, profile.status, profile.failed)
+        for profile in profiler.profiles
+    ] == [("v2/sleep", 601, True), ("v2/sleep", 601, True)]
+
+    with pytest.raises(WithingsError):
+        await authenticated_client.get_devices()
+
+    assert profiler.profiles[-1].endpoint == "v2/user"
+    assert profiler.profiles[-1].failed
+    assert profiler.profiles[-1].durations == {}
+
+
+async def test_profiling_connection_errors(
+    responses: aioresponses,
+    authenticated_client: WithingsClient,
+) -> None:
+    """Test requests that fail before a response are profiled and released."""
+    responses.post(
+        f"{WITHINGS_URL}/v2/user",
+        exception=ClientConnectionError(),
+        repeat=True,
+    )
+    profiler = RequestProfiler()
+    profiler.attach(authenticated_client)
+
+    for _ in range(3):
+        with pytest.raises(ClientConnectionError):
+            await authenticated_client.get_devices()
+
+    assert not profiler._pending
+    assert [profile.failed for profile in profiler.profiles] == [True] * 3
+    assert all(profile.durations == {} for profile in profiler.profiles)
+
+    profiler.detach(authenticated_client)
+
+    assert authenticated_client.tracers == []
@@ -0,0 +1,203 @@
+"""Asynchronous Python client for Withings."""
+
+from __future__ import annotations
+
+import asyncio
+from contextlib import closing
+from datetime import UTC, datetime
+import sqlite3
+import threading
+import time
+from typing import TYPE_CHECKING
+
+from aioresponses import aioresponses
+import pytest
+
+from aiowithings import (
+    CircuitBreaker,
+    CircuitState,
+    QuotaLedger,
+    RequestScheduler,
+    WithingsCircuitOpenError,
+    WithingsClient,
+    WithingsConnectionError,
+    deadline,
+)
+
+from . import load_fixture
+from .const import WITHINGS_URL
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+async def test_sliding_window(tmp_path: Path) -> None:
+    """Test requests free up a period after they were sent."""
+    clock = _Clock()
+    ledger = QuotaLedger(tmp_path / "quota.db", limit=2, period=10, clock=clock)
+
+    assert ledger.try_acquire() == 0
+    clock.now += 4
+    assert ledger.try_acquire() == 0
+    assert ledger.try_acquire() == 6
+    clock.now += 6
+    assert await ledger.used() == 1
+    assert ledger.try_acquire() == 0
+    assert ledger.try_acquire() == 4
+
+    ledger.close()
+    ledger.close()
+
+
+async def test_shared_between_ledgers(tmp_path: Path) -> None:
+    """Test ledgers on the same file share the quota."""
+    clock = _Clock()
+    with (
+        closing(QuotaLedger(tmp_path / "quota.db", limit=1, clock=clock)) as first,
+        closing(QuotaLedger(tmp_path / "quota.db", limit=1, clock=clock)) as second,
+    ):
+        assert first.try_acquire() == 0
+        assert second.try_acquire() == 60
+        assert await second.used() == 1
+
+
+def test_failed_transaction(tmp_path: Path) -> None:
+    """Test a failed transaction is rolled back and the ledger stays usable."""
+    with closing(QuotaLedger(tmp_path / "quota.db", limit=1)) as ledger:
+        ledger._connect().execute("DROP TABLE requests")
+
+        with pytest.raises(sqlite3.OperationalError):
+            ledger.try_acquire()
+
+        assert not ledger._connect().in_transaction
+        ledger.close()
+        assert ledger.try_acquire() == 0
+
+
+async def test_acquire_waits(tmp_path: Path) -> None:
+    """Test acquire waits until the quota frees up."""
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+
+    with closing(QuotaLedger(tmp_path / "quota.db", limit=1, period=0.05)) as ledger:
+        await ledger.acquire()
+        await ledger.acquire()
+
+        assert loop.time() - started >= 0.04
+        assert await ledger.used() == 1
+
+
+class _BlockingClock:
+    """Clock that blocks its first call until it is released."""
+
+    def __init__(self, *, fail: bool) -> None:
+        self.fail = fail
+        self.called = threading.Event()
+        self.released = threading.Event()
+
+    def __call__(self) -> float:
+        if not self.called.is_set():
+            self.called.set()
+            self.released.wait()
+            if self.fail:
+                msg = "Clock failed"
+                raise RuntimeError(msg)
+        return time.time()
+
+
+@pytest.mark.parametrize(
+    ("taken", "fail", "expected"), [(0, False, 0), (1, False, 1), (0, True, 0)]
+)
+async def test_cancelled_acquire(
+    tmp_path: Path,
+    taken: int,
+    fail: bool,  # noqa: FBT001
+    expected: int,
+) -> None:
+    """Test a request taken by a cancelled acquire is given back."""
+    clock = _BlockingClock(fail=fail)
+    with closing(QuotaLedger(tmp_path / "quota.db", limit=1, clock=clock)) as ledger:
+        for _ in range(taken):
+            clock.called.set()
+            ledger.try_acquire()
+        clock.called.clear()
+        task = asyncio.create_task(ledger.acquire())
+        await asyncio.to_thread(clock.called.wait)
+        task.cancel()
+
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        clock.released.set()
+        # Counting waits for the thread of the cancelled acquire to finish.
+        await ledger.used()
+        await asyncio.sleep(0.01)
+        await asyncio.gather(*ledger._releases)
+
+        assert await ledger.used() == expected
+
+
+@pytest.mark.parametrize("scheduler", [None, RequestScheduler()])
+async def test_client_quota(
+    responses: aioresponses,
+    authenticated_client: WithingsClient,
+    tmp_path: Path,
+    scheduler: RequestScheduler | None,
+) -> None:
+    """Test client requests take the quota and wait for it within the deadline."""
+    responses.post(
+        f"{WITHINGS_URL}/v2/user",
+        status=200,
+        body=load_fixture("device.json"),
+    )
+    authenticated_client.scheduler = scheduler
+    with closing(QuotaLedger(tmp_path / "quota.db", limit=1)) as ledger:
+        authenticated_client.quota = ledger
+
+        await authenticated_client.get_devices()
+        with deadline(0.01), pytest.raises(WithingsConnectionError):
+            await authenticated_client.get_devices()
+
+        assert await ledger.used() == 1
+    assert scheduler is None or scheduler.active == 0
+
+
+async def test_open_circuit_keeps_quota(
+    responses: aioresponses,
+    authenticated_client: WithingsClient,
+    tmp_path: Path,
+) -> None:
+    """Test an open circuit keeps the quota and waiting for it is no failure."""
+    responses.post(
+        f"{WITHINGS_URL}/v2/user",
+        status=200,
+        body=load_fixture("device.json"),
+    )
+    responses.post(
+        f"{WITHINGS_URL}/measure",
+        status=200,
+        body=load_fixture("measurement.json"),
+    )
+    breaker = CircuitBreaker(failure_threshold=1)
+    breaker.before_request("wbsapi.withings.net", "v2/user")
+    breaker.record_failure("wbsapi.withings.net", "v2/user")
+    authenticated_client.circuit_breaker = breaker
+    with closing(QuotaLedger(tmp_path / "quota.db", limit=1)) as ledger:
+        authenticated_client.quota = ledger
+
+        with pytest.raises(WithingsCircuitOpenError):
+            await authenticated_client.get_devices()
+        assert await ledger.used() == 0
+
+        await authenticated_client.get_measurement_since(datetime.now(tz=UTC))
+        with deadline(0.01), pytest.raises(WithingsConnectionError):
+            await authenticated_client.get_measurement_since(datetime.now(tz=UTC))
+
+    assert breaker.get_state("wbsapi.withings.net", "measure") is CircuitState.CLOSED
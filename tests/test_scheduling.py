@@ -0,0 +1,147 @@
+"""Asynchronous Python client for Withings."""
+
+from __future__ import annotations
+
+import asyncio
+
+from aioresponses import aioresponses
+import pytest
+
+from aiowithings import (
+    RequestPriority,
+    RequestScheduler,
+    WithingsClient,
+    WithingsConnectionError,
+    deadline,
+    priority,
+)
+from aiowithings.scheduling import get_priority
+
+from . import load_fixture
+from .const import WITHINGS_URL
+
+
+async def _queue(
+    scheduler: RequestScheduler,
+    order: list[str],
+    name: str,
+    request_priority: RequestPriority | None = None,
+) -> None:
+    await scheduler.acquire(request_priority)
+    order.append(name)
+    scheduler.release()
+
+
+async def test_priority_order() -> None:
+    """Test the highest priority request gets the next free slot."""
+    scheduler = RequestScheduler(max_concurrency=1, aging_interval=60)
+    order: list[str] = []
+    await scheduler.acquire()
+
+    tasks = [
+        asyncio.create_task(
+            _queue(scheduler, order, "backfill", RequestPriority.BACKFILL)
+        ),
+        asyncio.create_task(
+            _queue(scheduler, order, "webhook", RequestPriority.WEBHOOK)
+        ),
+    ]
+    with priority(RequestPriority.INTERACTIVE):
+        tasks.append(asyncio.create_task(_queue(scheduler, order, "interactive")))
+    await asyncio.sleep(0)
+    assert scheduler.queued == 3
+    scheduler.release()
+    await asyncio.gather(*tasks)
+
+    assert order == ["interactive", "webhook", "backfill"]
+    assert scheduler.active == 0
+    assert list(scheduler.wait_times()) == list(RequestPriority)
+
+
+async def test_aging_prevents_starvation() -> None:
+    """Test a request that waited long enough overtakes higher classes."""
+    scheduler = RequestScheduler(max_concurrency=1, aging_interval=0.01)
+    order: list[str] = []
+    await scheduler.acquire()
+
+    backfill = asyncio.create_task(
+        _queue(scheduler, order, "backfill", RequestPriority.BACKFILL)
+    )
+    await asyncio.sleep(0.05)
+    interactive = asyncio.create_task(
+        _queue(scheduler, order, "interactive", RequestPriority.INTERACTIVE)
+    )
+    await asyncio.sleep(0)
+    scheduler.release()
+    await asyncio.gather(backfill, interactive)
+
+    assert order == ["backfill", "interactive"]
+    waits = scheduler.wait_times()
+    assert waits[RequestPriority.BACKFILL].maximum >= 0.05
+    assert waits[RequestPriority.INTERACTIVE].count == 2
+
+
+async def test_cancelled_waiters() -> None:
+    """Test cancelled requests give up their place and their slot."""
+    scheduler = RequestScheduler(max_concurrency=1)
+    await scheduler.acquire()
+    waiting = asyncio.create_task(scheduler.acquire())
+    handed_over = asyncio.create_task(scheduler.acquire())
+    await asyncio.sleep(0)
+
+    waiting.cancel()
+    await asyncio.sleep(0)
+
+    assert scheduler.queued == 1
+
+    scheduler.release()
+    handed_over.cancel()
+    for task in (waiting, handed_over):
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    assert scheduler.active == 0
+    assert scheduler.queued == 0
+    assert get_priority() is None
+
+
+async def test_client_scheduler(
+    responses: aioresponses,
+    authenticated_client: WithingsClient,
+) -> None:
+    """Test client requests wait for a slot of the scheduler."""
+    responses.post(
+        f"{WITHINGS_URL}/v2/user",
+        status=200,
+        body=load_fixture("device.json"),
+        repeat=True,
+    )
+    scheduler = RequestScheduler(max_concurrency=1)
+    authenticated_client.scheduler = scheduler
+
+    with priority(RequestPriority.WEBHOOK):
+        await asyncio.gather(
+            authenticated_client.get_devices(),
+            authenticated_client.get_devices(),
+        )
+
+    assert scheduler.active == 0
+    (summary,) = scheduler.wait_times().values()
+    assert summary.count == 2
+    assert summary.maximum >= summary.mean >= 0
+    assert list(scheduler.wait_times()) == [RequestPriority.WEBHOOK]
+
+
+async def test_client_deadline_while_queued(
+    authenticated_client: WithingsClient,
+) -> None:
+    """Test the deadline of the context applies while waiting for a slot."""
+    scheduler = RequestScheduler(max_concurrency=1)
+    authenticated_client.scheduler = scheduler
+    await scheduler.acquire()
+
+    with deadline(0.01), pytest.raises(WithingsConnectionError):
+        await authenticated_client.get_devices()
+
+    scheduler.release()
+    assert scheduler.active == 0
@@ -0,0 +1,103 @@
+"""Asynchronous Python client for Withings."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import UTC, datetime
+import json
+import marshal
+import sys
+from typing import Any
+
+import pytest
+
+from aiowithings import (
+    Activity,
+    Device,
+    Goals,
+    MeasurementGroup,
+    SleepSeries,
+    SleepSeriesTimeData,
+    SleepSummary,
+    Workout,
+    decode_model,
+    decode_models,
+    encode_model,
+    encode_models,
+)
+from aiowithings.serialization import CODEC_VERSION
+
+from . import load_fixture
+
+
+@pytest.mark.parametrize(
+    ("model", "fixture", "key"),
+    [
+        (Device, "device.json", "devices"),
+        (MeasurementGroup, "measurement.json", "measuregrps"),
+        (SleepSeries, "sleep.json", "series"),
+        (SleepSummary, "sleep_summary.json", "series"),
+        (Activity, "activity.json", "activities"),
+        (Workout, "workouts.json", "series"),
+    ],
+)
+def test_round_trip(model: type[Any], fixture: str, key: str) -> None:
+    """Test models are equal after encoding and decoding."""
+    models = [
+        model.from_api(item) for item in json.loads(load_fixture(fixture))["body"][key]
+    ]
+
+    data = encode_models(model, models)
+
+    assert decode_models(model, data) == models
+    assert len(data) < len(load_fixture(fixture))
+
+
+def test_encoded_values() -> None:
+    """Test enums and datetimes are stored as plain values."""
+    goals = Goals(steps=10000, sleep=None, weight=70.3)
+    series = SleepSeriesTimeData(
+        time=datetime(2024, 1, 1, 12, 0, 0, 500000, tzinfo=UTC),
+        value=60,
+    )
+
+    assert decode_model(Goals, encode_model(Goals, goals)) == goals
+    assert (
+        decode_model(
+            SleepSeriesTimeData,
+            encode_model(SleepSeriesTimeData, series),
+        )
+        == series
+    )
+    assert marshal.loads(encode_model(SleepSeriesTimeData, series)) == (  # noqa: S302
+        CODEC_VERSION,
+        sys.implementation.cache_tag,
+        "SleepSeriesTimeData",
+        [[1704110400.5, 60]],
+    )
+
+
+@dataclass(slots=True)
+class _Single:
+    """Model with a single field."""
+
+    values: dict[str, Any]
+
+
+def test_single_field_model() -> None:
+    """Test models with a single field."""
+    assert decode_models(_Single, encode_models(_Single, [_Single({"a": 1})])) == [
+        _Single({"a": 1})
+    ]
+
+
+def test_decode_mismatch() -> None:
+    """Test data of another model, version or interpreter is rejected."""
+    data = encode_models(Goals, [Goals(steps=1, sleep=2, weight=None)])
+
+    with pytest.raises(ValueError, match="not Device"):
+        decode_models(Device, data)
+    with pytest.raises(ValueError, match="Unsupported codec version"):
+        decode_models(Goals, marshal.dumps((0, "Goals", [])))
+    with pytest.raises(ValueError, match="Data was encoded by cpython-00"):
+        decode_models(Goals, marshal.dumps((CODEC_VERSION, "cpython-00", "Goals", [])))
@@ -0,0 +1,143 @@
+"""Asynchronous Python client for Withings."""
+
+from __future__ import annotations
+
+from datetime import UTC, date, datetime
+
+import aiohttp
+from benchmarks.simulator import SimulatorConfig, WithingsSimulator
+import pytest
+
+from aiowithings import (
+    MeasurementType,
+    NotificationCategory,
+    WithingsAuthenticationFailedError,
+    WithingsConnectionError,
+    WithingsError,
+    WithingsTooManyRequestsError,
+)
+
+
+async def test_simulated_endpoints() -> None:
+    """Test the client against every simulated endpoint."""
+    async with (
+        WithingsSimulator(SimulatorConfig(days=30)) as simulator,
+        aiohttp.ClientSession() as session,
+    ):
+        client = simulator.client(1, session)
+        start = datetime(2023, 12, 10, tzinfo=UTC)
+        end = datetime(2024, 1, 1, tzinfo=UTC)
+
+        assert len(await client.get_devices()) == 2
+        assert (await client.get_goals()).steps is not None
+        assert len(await client.get_measurement_in_period(start, end)) == 22
+        assert len(await client.get_measurement_since(start)) == 22
+        weights = await client.get_measurement_since(start, [MeasurementType.WEIGHT])
+        assert all(
+            measurement.measurement_type is MeasurementType.WEIGHT
+            for group in weights
+            for measurement in group.measurements
+        )
+        assert len(await client.get_sleep(start, end)) == 21
+        assert (
+            len(await client.get_sleep_summary_in_period(start.date(), end.date()))
+            == 22
+        )
+        assert len(await client.get_activities_since(start)) == 22
+        assert len(await client.get_workouts_in_period(start, end)) == 7
+
+        await client.subscribe_notification(
+            "https://example.com", NotificationCategory.WEIGHT
+        )
+        assert len(await client.list_notification_configurations()) == 1
+        assert not await client.list_notification_configurations(
+            NotificationCategory.SLEEP
+        )
+        await client.revoke_notification_configurations(
+            "https://example.com", NotificationCategory.WEIGHT
+        )
+        assert not await client.list_notification_configurations()
+        assert simulator.stats.per_endpoint["notify list"] == 3
+
+
+async def test_simulated_pagination() -> None:
+    """Test the simulator pages through a large history."""
+    async with (
+        WithingsSimulator(SimulatorConfig(days=250, page_size=100)) as simulator,
+        aiohttp.ClientSession() as session,
+    ):
+        client = simulator.client(2, session)
+        offsets = []
+        group_ids: set[int] = set()
+        data = {"action": "getmeas", "offset": 0}
+        while True:
+            body = await client._request("measure", data=data)
+            group_ids.update(group["grpid"] for group in body["measuregrps"])
+            if not body["more"]:
+                break
+            offsets.append(body["offset"])
+            data["offset"] = body["offset"]
+
+        assert offsets == [100, 200]
+        assert len(group_ids) == 250
+        assert simulator.user(2).activities[0]["date"] == str(date(2023, 4, 26))
+
+
+async def test_simulated_quota() -> None:
+    """Test the simulator throttles above the quota per minute."""
+    now = 0.0
+    simulator = WithingsSimulator(
+        SimulatorConfig(days=1, requests_per_minute=2),
+        clock=lambda: now,
+    )
+    async with simulator, aiohttp.ClientSession() as session:
+        client = simulator.client(1, session)
+        await client.get_goals()
+        await client.get_goals()
+        with pytest.raises(WithingsTooManyRequestsError):
+            await client.get_goals()
+        now = 61.0
+        await client.get_goals()
+        assert simulator.stats.throttled == 1
+
+
+@pytest.mark.parametrize(
+    ("config", "error"),
+    [
+        (SimulatorConfig(days=1, error_rate=1), WithingsError),
+        (SimulatorConfig(days=1, html_error_rate=1), WithingsError),
+        (
+            SimulatorConfig(days=1, timeout_rate=1, timeout_delay=2),
+            WithingsConnectionError,
+        ),
+    ],
+)
+async def test_simulated_faults(
+    config: SimulatorConfig,
+    error: type[Exception],
+) -> None:
+    """Test the simulator injects faults."""
+    async with (
+        WithingsSimulator(config, seed=1) as simulator,
+        aiohttp.ClientSession() as session,
+    ):
+        client = simulator.client(1, session)
+        client.request_timeout = 1
+        with pytest.raises(error):
+            await client.get_devices()
+
+
+async def test_simulated_authentication() -> None:
+    """Test the simulator rejects unknown tokens and actions."""
+    simulator = WithingsSimulator(SimulatorConfig(days=1, latency=0.01))
+    async with aiohttp.ClientSession() as session:
+        with pytest.raises(RuntimeError):
+            simulator.client(1, session)
+        async with simulator:
+            client = simulator.client(1, session)
+            client.authenticate("unknown")
+            with pytest.raises(WithingsAuthenticationFailedError):
+                await client.get_devices()
+            client.authenticate(simulator.token_for(1))
+            with pytest.raises(WithingsError):
+                await client._request("v2/user", data={"action": "unknown"})
@@ -0,0 +1,78 @@
+"""Asynchronous Python client for Withings."""
+
+from __future__ import annotations
+
+import json
+from typing import Any
+
+import pytest
+
+from aiowithings.streaming import ArrayItemScanner
+
+from . import load_fixture
+
+
+def _scan(raw: bytes, chunk_size: int) -> tuple[list[Any], dict[str, Any]]:
+    scanner = ArrayItemScanner(("body", "series"))
+    items: list[Any] = []
+    for start in range(0, len(raw), chunk_size):
+        items.extend(scanner.feed(raw[start : start + chunk_size]))
+    return items, scanner.close()
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 4096, 1 << 30])
+def test_scan_sleep_response(chunk_size: int) -> None:
+    """Test the series are extracted regardless of how the body is split."""
+    raw = load_fixture("sleep.json").encode()
+    expected = json.loads(raw)
+
+    items, rest = _scan(raw, chunk_size)
+
+    assert items == expected["body"]["series"]
+    assert rest == {**expected, "body": {**expected["body"], "series": []}}
+
+
+def test_scan_strings_and_nesting() -> None:
+    """Test structural characters in strings and nested items are skipped."""
+    document: dict[str, Any] = {
+        "series": [{"ignored": True}],
+        "body": {
+            "other": [[1, 2], {"series": [3]}],
+            "series": [
+                {"name": 'quote " and [{,', "values": [1, {"nested": "é\\"}]},
+                [4, 5],
+            ],
+            "more": False,
+        },
+        "status": 0,
+    }
+    raw = json.dumps(document, indent=2, ensure_ascii=False).encode()
+
+    items, rest = _scan(raw, 3)
+
+    assert items == document["body"]["series"]
+    assert rest == {**document, "body": {**document["body"], "series": []}}
+
+
+def test_scan_error_response() -> None:
+    """Test a response without the array is returned as is."""
+    items, rest = _scan(b'{"status": 601, "error": "Too many requests"}', 5)
+
+    assert items == []
+    assert rest == {"status": 601, "error": "Too many requests"}
+
+
+@pytest.mark.parametrize(
+    "raw",
+    [
+        b'{"status": 0, "body": {"series": [{"startdate": 1',
+        b'{"status": 0, "body": {"series": []',
+    ],
+)
+def test_scan_incomplete_document(raw: bytes) -> None:
+    """Test an incomplete document is rejected."""
+    scanner = ArrayItemScanner(("body", "series"))
+    scanner.feed(raw)
+
+    with pytest.raises(ValueError, match="Incomplete JSON document"):
+        scanner.close()
@@ -0,0 +1,237 @@
+"""Asynchronous Python client for Withings."""
+
+from __future__ import annotations
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from datetime import UTC, datetime
+from itertools import pairwise
+import json
+from typing import Any
+
+from aiohttp import ClientConnectionError
+from aioresponses import CallbackResult, aioresponses
+import pytest
+
+from aiowithings import (
+    TraceEvent,
+    TraceEventType,
+    WithingsClient,
+    WithingsConnectionError,
+    WithingsError,
+    WithingsTooManyRequestsError,
+)
+
+from . import load_fixture
+from .const import WITHINGS_URL
+
+
+async def test_tracing_request_lifecycle(
+    responses: aioresponses,
+    authenticated_client: WithingsClient,
+) -> None:
+    """Test the events fired during a successful request."""
+    responses.post(
+        f"{WITHINGS_URL}/v2/sleep",
+        status=200,
+        body=load_fixture("sleep.json"),
+    )
+    events: list[TraceEvent] = []
+
+    async def _get_token() -> str:
+        return "test"
+
+    authenticated_client.refresh_token_function = _get_token
+    authenticated_client.tracers.append(events.append)
+    authenticated_client.trace_context = {"user_id": 1}
+
+    await authenticated_client.get_sleep(
+        datetime.fromtimestamp(0, tz=UTC),
+        datetime.fromtimestamp(1609559200, tz=UTC),
+    )
+
+    assert [event.event_type for event in events] == [
+        TraceEventType.REQUEST_START,
+        TraceEventType.TOKEN_REFRESHED,
+        TraceEventType.RESPONSE_HEADERS,
+        TraceEventType.BODY_READ,
+        TraceEventType.BODY_DECODED,
+        TraceEventType.STATUS_DISPATCHED,
+        TraceEventType.MODELS_PARSED,
+        TraceEventType.REQUEST_COMPLETED,
+    ]
+    assert all(event.endpoint == "v2/sleep" for event in events)
+    assert all(event.action == "get" for event in events)
+    assert all(event.context == {"user_id": 1} for event in events)
+    assert events[2].http_status == 200
+    assert events[3].response_bytes == len(load_fixture("sleep.json").encode())
+    assert events[4].response_bytes == events[3].response_bytes
+    assert events[5].status == 0
+    assert events[6].model_count == 613
+    assert len({event.request_id for event in events}) == 1
+    assert all(
+        earlier.timestamp <= later.timestamp for earlier, later in pairwise(events)
+    )
+    assert events[-1].elapsed >= 0
+
+
+@pytest.mark.parametrize("offload", [True, False])
+async def test_tracing_status_errors(
+    responses: aioresponses,
+    authenticated_client: WithingsClient,
+    offload: bool,  # noqa: FBT001
+) -> None:
+    """Test the status is dispatched before the request fails with its error."""
+    response_data = json.loads(load_fixture("sleep.json"))
+    response_data["status"] = 601
+    responses.post(
+        f"{WITHINGS_URL}/v2/sleep",
+        status=200,
+        body=json.dumps(response_data),
+    )
+    events: list[TraceEvent] = []
+    authenticated_client.tracers.append(events.append)
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        if offload:
+            authenticated_client.parse_executor = executor
+            authenticated_client.parse_offload_threshold = 0
+        with pytest.raises(WithingsTooManyRequestsError):
+            await authenticated_client.get_sleep(
+                datetime.fromtimestamp(0, tz=UTC),
+                datetime.fromtimestamp(1609559200, tz=UTC),
+            )
+
+    assert events[-2].event_type is TraceEventType.STATUS_DISPATCHED
+    assert events[-2].status == 601
+    assert events[-1].event_type is TraceEventType.REQUEST_FAILED
+    assert isinstance(events[-1].error, WithingsTooManyRequestsError)
+
+
+async def test_tracing_offloaded_parsing(
+    responses: aioresponses,
+    authenticated_client: WithingsClient,
+) -> None:
+    """Test offloaded parsing fires the same events."""
+    responses.post(
+        f"{WITHINGS_URL}/v2/measure",
+        status=200,
+        body=load_fixture("workouts.json"),
+    )
+    events: list[TraceEvent] = []
+    authenticated_client.tracers.append(events.append)
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        authenticated_client.parse_executor = executor
+        authenticated_client.parse_offload_threshold = 0
+        workouts = await authenticated_client.get_workouts_since(
+            datetime.fromtimestamp(0, tz=UTC),
+        )
+
+    assert [event.event_type for event in events][-4:] == [
+        TraceEventType.BODY_DECODED,
+        TraceEventType.STATUS_DISPATCHED,
+        TraceEventType.MODELS_PARSED,
+        TraceEventType.REQUEST_COMPLETED,
+    ]
+    assert events[-2].model_count == len(workouts)
+
+
+async def test_tracing_unexpected_response(
+    responses: aioresponses,
+    authenticated_client: WithingsClient,
+) -> None:
+    """Test a failed event is fired for an unexpected response."""
+    responses.post(
+        f"{WITHINGS_URL}/v2/user",
+        status=200,
+        headers={"Content-Type": "plain/text"},
+        body="Yes",
+    )
+    events: list[TraceEvent] = []
+    authenticated_client.tracers.append(events.append)
+
+    with pytest.raises(WithingsError) as exception:
+        await authenticated_client.get_devices()
+
+    assert events[-1].event_type is TraceEventType.REQUEST_FAILED
+    assert events[-1].error is exception.value
+
+
+async def test_tracing_timeout(
+    responses: aioresponses,
+) -> None:
+    """Test a failed event is fired for a timeout."""
+
+    async def response_handler(_: str, **_kwargs: Any) -> CallbackResult:
+        await asyncio.sleep(2)
+        return CallbackResult(body="Goodmorning!")
+
+    responses.post(
+        f"{WITHINGS_URL}/v2/user",
+        callback=response_handler,
+    )
+    events: list[TraceEvent] = []
+    async with WithingsClient(request_timeout=1, tracers=[events.append]) as client:
+        with pytest.raises(WithingsConnectionError):
+            await client.get_devices()
+
+    assert [event.event_type for event in events] == [
+        TraceEventType.REQUEST_START,
+        TraceEventType.REQUEST_FAILED,
+    ]
+
+
+@pytest.mark.parametrize(
+    ("response", "error"),
+    [
+        ({"exception": ClientConnectionError()}, ClientConnectionError),
+        ({"status": 200, "body": "{"}, json.JSONDecodeError),
+    ],
+)
+async def test_tracing_failed_request(
+    responses: aioresponses,
+    authenticated_client: WithingsClient,
+    response: dict[str, Any],
+    error: type[Exception],
+) -> None:
+    """Test a failed event is fired for errors raised while handling a request."""
+    responses.post(f"{WITHINGS_URL}/v2/user", **response)
+    events: list[TraceEvent] = []
+    authenticated_client.tracers.append(events.append)
+
+    with pytest.raises(error) as exception:
+        await authenticated_client.get_devices()
+
+    assert events[0].event_type is TraceEventType.REQUEST_START
+    assert events[-1].event_type is TraceEventType.REQUEST_FAILED
+    assert events[-1].error is exception.value
+
+
+async def test_tracing_cancelled_request(
+    responses: aioresponses,
+    authenticated_client: WithingsClient,
+) -> None:
+    """Test a failed event is fired for a cancelled request."""
+    started = asyncio.Event()
+
+    async def response_handler(_: str, **_kwargs: Any) -> CallbackResult:
+        started.set()
+        await asyncio.sleep(10)
+        return CallbackResult(body="{}")  # pragma: no cover
+
+    responses.post(f"{WITHINGS_URL}/v2/user", callback=response_handler)
+    events: list[TraceEvent] = []
+    authenticated_client.tracers.append(events.append)
+
+    task = asyncio.create_task(authenticated_client.get_devices())
+    await started.wait()
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    assert [event.event_type for event in events] == [
+        TraceEventType.REQUEST_START,
+        TraceEventType.REQUEST_FAILED,
+    ]
+    assert isinstance(events[-1].error, asyncio.CancelledError)
@@ -11,3 +11,10 @@ def test_measurement() -> None:
 def test_measurement_from_dict() -> None:
     """Test measurement."""
     assert get_measurement_from_dict({"value": 20, "unit": -1}) == 2
+
+
+def test_measurement_is_exact() -> None:
+    """Test negative units do not introduce rounding errors."""
+    assert get_measurement(703, -1) == 70.3
+    assert get_measurement(56300, -3) == 56.3
+    assert get_measurement(7, 2) == 700
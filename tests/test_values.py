@@ -0,0 +1,114 @@
+"""Asynchronous Python client for Withings."""
+
+from __future__ import annotations
+
+from decimal import Decimal
+import json
+
+import pytest
+
+from aiowithings import (
+    MeasurementColumn,
+    MeasurementPosition,
+    MeasurementType,
+    MeasurementValue,
+)
+
+from . import load_fixture
+
+
+def test_measurement_value() -> None:
+    """Test converting an exact measurement value."""
+    value = MeasurementValue.from_api({"value": 703, "unit": -1, "type": 1})
+
+    assert value.to_float() == 70.3
+    assert value.to_decimal() == Decimal("70.3")
+    assert value.normalized() == (703, -1)
+    assert MeasurementValue(7, 2).to_float() == 700.0
+    assert MeasurementValue(0, -3).normalized() == (0, 0)
+
+
+def test_measurement_value_equality() -> None:
+    """Test values compare and hash by the quantity they represent."""
+    assert MeasurementValue(703, -1) == MeasurementValue(70300, -3)
+    assert MeasurementValue(703, -1) != MeasurementValue(704, -1)
+    assert MeasurementValue(0, 0) == MeasurementValue(0, -2)
+    assert MeasurementValue(703, -1) != (703, -1)
+    assert len({MeasurementValue(703, -1), MeasurementValue(70300, -3)}) == 1
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"),
+    [
+        (70.3, MeasurementValue(703, -1)),
+        (-4.77, MeasurementValue(-477, -2)),
+        (700, MeasurementValue(700, 0)),
+        (0.0016, MeasurementValue(16, -4)),
+    ],
+)
+def test_measurement_value_from_float(
+    value: float,
+    expected: MeasurementValue,
+) -> None:
+    """Test restoring the exact value from a parsed float."""
+    assert MeasurementValue.from_float(value) == expected
+
+
+def test_measurement_column() -> None:
+    """Test storing and converting a column of exact values."""
+    column = MeasurementColumn.from_api(
+        [
+            {"value": 703, "unit": -1},
+            {"value": 70300, "unit": -3},
+            {"value": 5, "unit": 1},
+            {"value": -477, "unit": -2},
+        ]
+    )
+
+    assert len(column) == 4
+    assert column.values.itemsize == 8
+    assert column.units.itemsize == 1
+    assert column[0] == MeasurementValue(703, -1)
+    assert list(column)[2] == MeasurementValue(5, 1)
+    assert column.to_floats() == [70.3, 70.3, 50.0, -4.77]
+    assert column.to_decimals() == [
+        Decimal("70.3"),
+        Decimal("70.3"),
+        Decimal(50),
+        Decimal("-4.77"),
+    ]
+    unique = column.unique()
+    assert list(unique.values) == [703, 5, -477]
+    assert list(unique.units) == [-1, 1, -2]
+    unique.append_value(MeasurementValue(12, 0))
+    assert unique[3] == MeasurementValue(12, 0)
+
+
+def test_measurement_column_unit_range() -> None:
+    """Test units outside of a signed byte are rejected."""
+    column = MeasurementColumn()
+
+    with pytest.raises(OverflowError):
+        column.append(1, 128)
+
+
+def test_measurement_column_from_api_groups() -> None:
+    """Test building a column from measurement groups of the API."""
+    raw_groups = json.loads(load_fixture("measurement_list.json"))
+
+    column = MeasurementColumn.from_api_groups(raw_groups, MeasurementType.WEIGHT)
+
+    expected = MeasurementColumn.from_api(
+        measure
+        for group in raw_groups
+        for measure in group["measures"]
+        if measure["type"] == MeasurementType.WEIGHT and measure.get("position") is None
+    )
+    assert len(column) == len(expected) > 0
+    assert list(column) == list(expected)
+    assert column.to_floats() == expected.to_floats()
+    assert not MeasurementColumn.from_api_groups(
+        raw_groups,
+        MeasurementType.WEIGHT,
+        MeasurementPosition.LEFT_ARM,
+    )
@@ -3,7 +3,9 @@
 from __future__ import annotations
 
 import asyncio
-from datetime import UTC, datetime
+from concurrent.futures import ThreadPoolExecutor
+from datetime import UTC, date, datetime
+import gzip
 import json
 from typing import TYPE_CHECKING, Any
 
@@ -11,12 +13,16 @@ import aiohttp
 from aiohttp.hdrs import METH_POST
 from aioresponses import CallbackResult, aioresponses
 import pytest
+from yarl import URL
 
+import aiowithings
 from aiowithings import (
     ActivityDataFields,
     MeasurementType,
+    MeasurementValue,
     NotificationCategory,
     SleepDataFields,
+    SleepSeries,
     SleepSummaryDataFields,
     WebhookCall,
     WithingsAuthenticationFailedError,
@@ -31,10 +37,11 @@ from aiowithings import (
     WithingsUnknownStatusError,
     WorkoutDataFields,
     get_measurement_type_from_notification_category,
+    withings,
 )
 
 from . import load_fixture
-from .const import HEADERS, WITHINGS_URL
+from .const import HEADERS, WITHINGS_URL, version
 
 if TYPE_CHECKING:
     from syrupy import SnapshotAssertion
@@ -182,6 +189,7 @@ async def test_get_activities_since(
         f"{WITHINGS_URL}/v2/measure",
         METH_POST,
         headers=HEADERS,
+        auto_decompress=False,
         data={
             "lastupdate": 1609559200,
             "action": "getactivity",
@@ -210,6 +218,7 @@ async def test_get_activities_period(
         f"{WITHINGS_URL}/v2/measure",
         METH_POST,
         headers=HEADERS,
+        auto_decompress=False,
         data={
             "action": "getactivity",
             "startdateymd": "2021-01-01 00:00:00+00:00",
@@ -235,6 +244,7 @@ async def test_get_devices(
         f"{WITHINGS_URL}/v2/user",
         METH_POST,
         headers=HEADERS,
+        auto_decompress=False,
         data={"action": "getdevice"},
     )
 
@@ -291,6 +301,7 @@ async def test_get_goals(
         f"{WITHINGS_URL}/v2/user",
         METH_POST,
         headers=HEADERS,
+        auto_decompress=False,
         data={"action": "getgoals"},
     )
 
@@ -315,6 +326,7 @@ async def test_get_measurement_since(
         f"{WITHINGS_URL}/measure",
         METH_POST,
         headers=HEADERS,
+        auto_decompress=False,
         data={"action": "getmeas", "lastupdate": 1609459200, "meastypes": "1"},
     )
 
@@ -339,6 +351,7 @@ async def test_get_measurement_period(
         f"{WITHINGS_URL}/measure",
         METH_POST,
         headers=HEADERS,
+        auto_decompress=False,
         data={"action": "getmeas", "startdate": 1609459200, "enddate": 1609559200},
     )
 
@@ -361,6 +374,7 @@ async def test_subscribing(
         f"{WITHINGS_URL}/notify",
         METH_POST,
         headers=HEADERS,
+        auto_decompress=False,
         data={
             "action": "subscribe",
             "callbackurl": "https://test.com/callback",
@@ -387,6 +401,7 @@ async def test_revoking(
         f"{WITHINGS_URL}/notify",
         METH_POST,
         headers=HEADERS,
+        auto_decompress=False,
         data={
             "action": "revoke",
             "callbackurl": "https://test.com/callback",
@@ -414,6 +429,7 @@ async def test_list_subscriptions(
         f"{WITHINGS_URL}/notify",
         METH_POST,
         headers=HEADERS,
+        auto_decompress=False,
         data={"action": "list", "appli": 1},
     )
 
@@ -434,6 +450,7 @@ async def test_list_all_subscriptions(
         f"{WITHINGS_URL}/notify",
         METH_POST,
         headers=HEADERS,
+        auto_decompress=False,
         data={"action": "list"},
     )
 
@@ -493,6 +510,7 @@ async def test_get_sleep(
         f"{WITHINGS_URL}/v2/sleep",
         METH_POST,
         headers=HEADERS,
+        auto_decompress=False,
         data={
             "action": "get",
             "startdate": 0,
@@ -522,6 +540,7 @@ async def test_get_sleep_without_data_fields(
         f"{WITHINGS_URL}/v2/sleep",
         METH_POST,
         headers=HEADERS,
+        auto_decompress=False,
         data={"action": "get", "startdate": 0, "enddate": 1609559200},
     )
 
@@ -577,6 +596,7 @@ async def test_get_sleep_summary_in_period(
         f"{WITHINGS_URL}/v2/sleep",
         METH_POST,
         headers=HEADERS,
+        auto_decompress=False,
         data={
             "action": "getsummary",
             "startdateymd": "1970-01-01",
@@ -612,6 +632,7 @@ async def test_get_sleep_summary_in_period_without_data_fields(
         f"{WITHINGS_URL}/v2/sleep",
         METH_POST,
         headers=HEADERS,
+        auto_decompress=False,
         data={
             "action": "getsummary",
             "startdateymd": "1970-01-01",
@@ -669,6 +690,7 @@ async def test_get_sleep_summary_since(
         f"{WITHINGS_URL}/v2/sleep",
         METH_POST,
         headers=HEADERS,
+        auto_decompress=False,
         data={
             "action": "getsummary",
             "lastupdate": 0,
@@ -701,6 +723,7 @@ async def test_get_sleep_summary_since_without_data_fields(
         f"{WITHINGS_URL}/v2/sleep",
         METH_POST,
         headers=HEADERS,
+        auto_decompress=False,
         data={
             "action": "getsummary",
             "lastupdate": 0,
@@ -728,6 +751,7 @@ async def test_get_workouts_since(
         f"{WITHINGS_URL}/v2/measure",
         METH_POST,
         headers=HEADERS,
+        auto_decompress=False,
         data={"action": "getworkouts", "lastupdate": 0, "data_fields": "calories"},
     )
 
@@ -752,9 +776,445 @@ async def test_get_workouts_period(
         f"{WITHINGS_URL}/v2/measure",
         METH_POST,
         headers=HEADERS,
+        auto_decompress=False,
         data={
             "action": "getworkouts",
             "startdateymd": "1970-01-01 00:00:00+00:00",
             "enddateymd": "2021-01-02 03:46:40+00:00",
         },
     )
+
+
+async def test_offloading_parsing_to_executor(
+    responses: aioresponses,
+    authenticated_client: WithingsClient,
+) -> None:
+    """Test parsing large responses in an executor."""
+    responses.post(
+        f"{WITHINGS_URL}/v2/sleep",
+        status=200,
+        body=load_fixture("sleep.json"),
+    )
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        authenticated_client.parse_executor = executor
+        authenticated_client.parse_offload_threshold = 0
+        response = await authenticated_client.get_sleep(
+            datetime.fromtimestamp(0, tz=UTC),
+            datetime.fromtimestamp(1609559200, tz=UTC),
+        )
+    assert response == [
+        SleepSeries.from_api(sleep)
+        for sleep in json.loads(load_fixture("sleep.json"))["body"]["series"]
+    ]
+
+
+async def test_offloaded_parsing_raises_status_errors(
+    responses: aioresponses,
+    authenticated_client: WithingsClient,
+) -> None:
+    """Test status errors are raised from offloaded parsing."""
+    response_data = json.loads(load_fixture("sleep.json"))
+    response_data["status"] = 601
+
+    responses.post(
+        f"{WITHINGS_URL}/v2/sleep",
+        status=200,
+        body=json.dumps(response_data),
+    )
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        authenticated_client.parse_executor = executor
+        authenticated_client.parse_offload_threshold = 0
+        with pytest.raises(WithingsTooManyRequestsError):
+            await authenticated_client.get_sleep(
+                datetime.fromtimestamp(0, tz=UTC),
+                datetime.fromtimestamp(1609559200, tz=UTC),
+            )
+
+
+def test_lazy_package_attributes() -> None:
+    """Test public names are imported from their submodule on first access."""
+    assert aiowithings.WithingsClient is WithingsClient
+    assert "WithingsClient" in dir(aiowithings)
+    with pytest.raises(AttributeError):
+        getattr(aiowithings, "DoesNotExist")  # noqa: B009
+
+
+def test_version() -> None:
+    """Test the version is resolved lazily."""
+    assert version == withings.VERSION
+    assert withings.get_version() == version
+    with pytest.raises(AttributeError):
+        getattr(withings, "DoesNotExist")  # noqa: B009
+
+
+def _sleep_summary_page(*, more: bool, offset: int) -> str:
+    response_data = json.loads(load_fixture("sleep_summary.json"))
+    response_data["body"]["more"] = more
+    response_data["body"]["offset"] = offset
+    return json.dumps(response_data)
+
+
+def _requested_data(responses: aioresponses, uri: str) -> list[dict[str, Any]]:
+    return [
+        call.kwargs["data"]
+        for call in responses.requests[(METH_POST, URL(f"{WITHINGS_URL}/{uri}"))]
+    ]
+
+
+@pytest.mark.parametrize("offload", [True, False])
+async def test_iter_sleep_summary_pages(
+    responses: aioresponses,
+    authenticated_client: WithingsClient,
+    offload: bool,  # noqa: FBT001
+) -> None:
+    """Test iterating over every page of sleep summaries."""
+    responses.post(
+        f"{WITHINGS_URL}/v2/sleep",
+        status=200,
+        body=_sleep_summary_page(more=True, offset=300),
+    )
+    responses.post(
+        f"{WITHINGS_URL}/v2/sleep",
+        status=200,
+        body=_sleep_summary_page(more=False, offset=0),
+    )
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        if offload:
+            authenticated_client.parse_executor = executor
+            authenticated_client.parse_offload_threshold = 0
+        pages = [
+            page
+            async for page in authenticated_client.iter_sleep_summary_pages(
+                date(2023, 1, 1),
+                date(2023, 12, 31),
+                sleep_summary_data_fields=[SleepSummaryDataFields.SNORING],
+            )
+        ]
+
+    assert len(pages) == 2
+    assert pages[0] == pages[1]
+    assert pages[0]
+    base_data = {
+        "action": "getsummary",
+        "startdateymd": "2023-01-01",
+        "enddateymd": "2023-12-31",
+        "data_fields": "snoring",
+    }
+    assert _requested_data(responses, "v2/sleep") == [
+        base_data,
+        {**base_data, "offset": 300},
+    ]
+
+
+async def test_iter_pages_stops_without_progress(
+    responses: aioresponses,
+    authenticated_client: WithingsClient,
+) -> None:
+    """Test iterating stops when the API repeats the offset."""
+    responses.post(
+        f"{WITHINGS_URL}/v2/sleep",
+        status=200,
+        body=_sleep_summary_page(more=True, offset=300),
+        repeat=True,
+    )
+
+    pages = [
+        page
+        async for page in authenticated_client.iter_sleep_summary_pages(
+            since=datetime.fromtimestamp(1609459200, tz=UTC),
+        )
+    ]
+
+    assert len(pages) == 2
+    assert _requested_data(responses, "v2/sleep") == [
+        {"action": "getsummary", "lastupdate": 1609459200},
+        {"action": "getsummary", "lastupdate": 1609459200, "offset": 300},
+    ]
+
+
+async def test_get_measurement_column(
+    responses: aioresponses,
+    authenticated_client: WithingsClient,
+) -> None:
+    """Test the exact values of every page are collected in one column."""
+    first = json.loads(load_fixture("measurement_list.json"))
+    second = json.loads(load_fixture("measurement.json"))["body"]["measuregrps"]
+    for groups, page in ((first, {"more": 1, "offset": 1}), (second, {})):
+        responses.post(
+            f"{WITHINGS_URL}/measure",
+            status=200,
+            body=json.dumps({"status": 0, "body": {"measuregrps": groups, **page}}),
+        )
+
+    column = await authenticated_client.get_measurement_column(
+        MeasurementType.WEIGHT,
+        datetime.fromtimestamp(1609459200, tz=UTC),
+        datetime.fromtimestamp(1609559200, tz=UTC),
+    )
+
+    assert list(column) == [
+        MeasurementValue.from_api(measure)
+        for group in first + second
+        for measure in group["measures"]
+        if measure["type"] == MeasurementType.WEIGHT and "position" not in measure
+    ]
+    assert len(column) > 1
+    assert _requested_data(responses, "measure") == [
+        {
+            "action": "getmeas",
+            "startdate": 1609459200,
+            "enddate": 1609559200,
+            "meastypes": "1",
+        },
+        {
+            "action": "getmeas",
+            "startdate": 1609459200,
+            "enddate": 1609559200,
+            "meastypes": "1",
+            "offset": 1,
+        },
+    ]
+
+
+async def test_iter_single_pages(
+    responses: aioresponses,
+    authenticated_client: WithingsClient,
+) -> None:
+    """Test iterating endpoints that return a single page."""
+    responses.post(
+        f"{WITHINGS_URL}/measure",
+        status=200,
+        body=load_fixture("measurement.json"),
+        repeat=True,
+    )
+    responses.post(
+        f"{WITHINGS_URL}/v2/measure",
+        status=200,
+        body=load_fixture("activity.json"),
+    )
+    responses.post(
+        f"{WITHINGS_URL}/v2/measure",
+        status=200,
+        body=load_fixture("workouts.json"),
+    )
+    start = datetime.fromtimestamp(1609459200, tz=UTC)
+    end = datetime.fromtimestamp(1609559200, tz=UTC)
+
+    measurements = [
+        page
+        async for page in authenticated_client.iter_measurement_pages(
+            since=start,
+            measurement_types=[MeasurementType.WEIGHT],
+        )
+    ]
+    measurements += [
+        page async for page in authenticated_client.iter_measurement_pages(start, end)
+    ]
+    activities = [
+        page
+        async for page in authenticated_client.iter_activity_pages(
+            start.date(),
+            end.date(),
+            activity_data_fields=[ActivityDataFields.STEPS],
+        )
+    ]
+    workouts = [
+        page
+        async for page in authenticated_client.iter_workout_pages(
+            start.date(),
+            end.date(),
+            workout_data_fields=[WorkoutDataFields.STEPS],
+        )
+    ]
+
+    assert len(measurements) == 2
+    assert len(activities) == len(workouts) == 1
+    assert _requested_data(responses, "measure") == [
+        {"action": "getmeas", "lastupdate": 1609459200, "meastypes": "1"},
+        {"action": "getmeas", "startdate": 1609459200, "enddate": 1609559200},
+    ]
+    assert _requested_data(responses, "v2/measure") == [
+        {
+            "action": "getactivity",
+            "startdateymd": "2021-01-01",
+            "enddateymd": "2021-01-02",
+            "data_fields": "steps",
+        },
+        {
+            "action": "getworkouts",
+            "startdateymd": "2021-01-01",
+            "enddateymd": "2021-01-02",
+            "data_fields": "steps",
+        },
+    ]
+
+
+async def test_iter_pages_requires_range(
+    authenticated_client: WithingsClient,
+) -> None:
+    """Test iterating requires either since or a full period."""
+    with pytest.raises(ValueError, match="start_date and end_date are required"):
+        authenticated_client.iter_measurement_pages(
+            datetime.fromtimestamp(0, tz=UTC),
+        )
+    with pytest.raises(ValueError, match="start_date and end_date are required"):
+        authenticated_client.iter_sleep_summary_pages()
+    with pytest.raises(ValueError, match="start_date and end_date are required"):
+        authenticated_client.iter_workout_pages(end_date=date(2024, 1, 1))
+
+
+async def test_iter_sleep(
+    responses: aioresponses,
+    authenticated_client: WithingsClient,
+) -> None:
+    """Test streaming sleep series while the response is received."""
+    responses.post(
+        f"{WITHINGS_URL}/v2/sleep",
+        status=200,
+        body=load_fixture("sleep.json"),
+    )
+    events: list[aiowithings.TraceEvent] = []
+    authenticated_client.tracers.append(events.append)
+    authenticated_client.stream_chunk_size = 1000
+
+    series = [
+        sleep
+        async for sleep in authenticated_client.iter_sleep(
+            datetime.fromtimestamp(0, tz=UTC),
+            datetime.fromtimestamp(1609559200, tz=UTC),
+            [SleepDataFields.HEART_RATE],
+        )
+    ]
+
+    assert series == [
+        SleepSeries.from_api(sleep)
+        for sleep in json.loads(load_fixture("sleep.json"))["body"]["series"]
+    ]
+    assert _requested_data(responses, "v2/sleep") == [
+        {
+            "action": "get",
+            "startdate": 0,
+            "enddate": 1609559200,
+            "data_fields": "hr",
+        },
+    ]
+    assert events[-2].model_count == len(series)
+    assert events[-1].event_type is aiowithings.TraceEventType.REQUEST_COMPLETED
+
+
+async def test_iter_sleep_stops_early(
+    responses: aioresponses,
+    authenticated_client: WithingsClient,
+) -> None:
+    """Test the response is released when iteration stops early."""
+    responses.post(
+        f"{WITHINGS_URL}/v2/sleep",
+        status=200,
+        body=load_fixture("sleep.json"),
+    )
+    series = authenticated_client.iter_sleep(
+        datetime.fromtimestamp(0, tz=UTC),
+        datetime.fromtimestamp(1609559200, tz=UTC),
+    )
+
+    first = await anext(series)
+    await series.aclose()
+
+    assert first.start_date == datetime.fromtimestamp(1618691453, tz=UTC)
+
+
+async def test_iter_sleep_raises_status_errors(
+    responses: aioresponses,
+    authenticated_client: WithingsClient,
+) -> None:
+    """Test the status is checked once the streamed response is complete."""
+    responses.post(
+        f"{WITHINGS_URL}/v2/sleep",
+        status=200,
+        body='{"status": 601, "body": {}}',
+    )
+
+    with pytest.raises(WithingsTooManyRequestsError):
+        async for _ in authenticated_client.iter_sleep(
+            datetime.fromtimestamp(0, tz=UTC),
+            datetime.fromtimestamp(1609559200, tz=UTC),
+        ):
+            pass  # pragma: no cover
+
+
+@pytest.mark.parametrize("stream", [True, False])
+async def test_compressed_response(
+    responses: aioresponses,
+    authenticated_client: WithingsClient,
+    stream: bool,  # noqa: FBT001
+) -> None:
+    """Test compressed responses are decompressed and their sizes traced."""
+    raw = load_fixture("sleep.json").encode()
+    body = gzip.compress(raw)
+    responses.post(
+        f"{WITHINGS_URL}/v2/sleep",
+        status=200,
+        body=body,
+        headers={"Content-Type": "application/json", "Content-Encoding": "GZIP"},
+    )
+    events: list[aiowithings.TraceEvent] = []
+    authenticated_client.tracers.append(events.append)
+    start = datetime.fromtimestamp(0, tz=UTC)
+    end = datetime.fromtimestamp(1609559200, tz=UTC)
+
+    if stream:
+        series = [sleep async for sleep in authenticated_client.iter_sleep(start, end)]
+    else:
+        series = await authenticated_client.get_sleep(start, end)
+
+    assert len(series) == 613
+    (body_read,) = (
+        event
+        for event in events
+        if event.event_type is aiowithings.TraceEventType.BODY_READ
+    )
+    assert body_read.content_encoding == "gzip"
+    assert body_read.response_bytes == len(body)
+    assert body_read.decompressed_bytes == len(raw)
+
+
+async def test_compression_disabled(
+    responses: aioresponses,
+    authenticated_client: WithingsClient,
+) -> None:
+    """Test only uncompressed responses are accepted without compression."""
+    responses.post(
+        f"{WITHINGS_URL}/v2/user",
+        status=200,
+        body=load_fixture("device.json"),
+    )
+    authenticated_client.compression = False
+
+    await authenticated_client.get_devices()
+
+    responses.assert_called_once_with(
+        f"{WITHINGS_URL}/v2/user",
+        METH_POST,
+        headers={**HEADERS, "Accept-Encoding": "identity"},
+        auto_decompress=False,
+        data={"action": "getdevice"},
+    )
+
+
+async def test_compressed_unexpected_response(
+    responses: aioresponses,
+    authenticated_client: WithingsClient,
+) -> None:
+    """Test unexpected compressed responses are decompressed for the error."""
+    responses.post(
+        f"{WITHINGS_URL}/v2/user",
+        status=200,
+        body=gzip.compress(b"Service unavailable"),
+        headers={"Content-Type": "text/plain", "Content-Encoding": "gzip"},
+    )
+
+    with pytest.raises(WithingsError) as error:
+        await authenticated_client.get_devices()
+
+    assert error.value.args[1]["response"] == "Service unavailable"
@@ -0,0 +1,48 @@
+"""Asynchronous Python client for Withings."""
+
+from __future__ import annotations
+
+import asyncio
+from contextlib import closing
+from typing import TYPE_CHECKING
+
+from aiowithings import QuotaLedger, get_shard, run_sharded
+from aiowithings.workers import _run_shard
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+async def _take_quota(users: list[int], ledger: QuotaLedger) -> list[int]:
+    for _ in users:
+        await ledger.acquire()
+    return users
+
+
+def test_get_shard() -> None:
+    """Test users are spread over the shards by a stable hash."""
+    shards = [get_shard(user_id, 4) for user_id in range(100)]
+
+    assert set(shards) == {0, 1, 2, 3}
+    assert get_shard(12345, 4) == get_shard("12345", 4) == 1
+
+
+def test_run_sharded(tmp_path: Path) -> None:
+    """Test every user is handled by one process and the quota is shared."""
+    with closing(QuotaLedger(tmp_path / "quota.db")) as ledger:
+        results = run_sharded(range(20), _take_quota, ledger, processes=2)
+
+        assert asyncio.run(ledger.used()) == 20
+    assert len(results) == 2
+    assert sorted(user for shard in results for user in shard) == list(range(20))
+    for index, shard in enumerate(results):
+        assert all(get_shard(user, 2) == index for user in shard)
+
+
+def test_run_shard(tmp_path: Path) -> None:
+    """Test a shard runs in an event loop with a ledger on the shared file."""
+    path = tmp_path / "quota.db"
+
+    assert _run_shard(_take_quota, [1, 2], path, 10, 60.0) == [1, 2]
+    with closing(QuotaLedger(path)) as ledger:
+        assert asyncio.run(ledger.used()) == 2